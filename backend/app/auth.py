@@ -1,7 +1,11 @@
 """Authentication utilities for JWT and password hashing."""
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional
 from jose import JWTError, jwt
+import hashlib
+import threading
+import time
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2PasswordBearer
@@ -10,6 +14,7 @@ import os
 
 from .db import get_db
 from .models import User
+from .cache import TTLCache
 
 # Password hashing (rounds=10 for better performance while maintaining security)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=10)
@@ -19,10 +24,65 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
+# Authenticated-user cache: user_id -> CachedUser, so authenticating a request
+# does not need a DB round-trip. Entries are dropped by invalidate_user() when
+# an admin edits/deletes the user and otherwise expire after the TTL.
+USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
+
+user_cache = TTLCache("auth_user", maxsize=USER_CACHE_MAX_ENTRIES, ttl=USER_CACHE_TTL_SECONDS)
+
+# Verified-token cache: sha256(token) -> (payload, generation), valid until the
+# token's exp. Bumping the revocation generation (logout, password change)
+# invalidates every cached entry, forcing a full signature check again.
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+
+token_cache = TTLCache("auth_token", maxsize=TOKEN_CACHE_MAX_ENTRIES, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+_token_generation = 0
+_token_generation_lock = threading.Lock()
+
 security = HTTPBearer(auto_error=False)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 
+@dataclass(frozen=True)
+class CachedUser:
+    """Snapshot of the user fields needed to authorize a request."""
+    id: int
+    username: str
+    role: str
+    is_active: bool
+    permissions: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            role=user.role,
+            is_active=bool(user.is_active),
+            permissions=dict(user.permissions or {}),
+        )
+
+
+def load_cached_user(db: Session, user_id: int) -> Optional[CachedUser]:
+    """Return the user snapshot from the cache, loading it from the DB on a miss."""
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        return None
+    cached = CachedUser.from_user(user)
+    user_cache.set(user_id, cached)
+    return cached
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a user from the authenticated-user cache after it was changed."""
+    user_cache.pop(user_id)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
     return pwd_context.verify(plain_password, hashed_password)
@@ -45,8 +105,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT token."""
+def _verify_access_token(token: str) -> Optional[dict]:
+    """Fully verify a JWT token (signature and claims)."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
@@ -54,11 +114,42 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
+def bump_token_generation() -> None:
+    """Invalidate all cached token verifications (e.g. on logout or password change)."""
+    global _token_generation
+    with _token_generation_lock:
+        _token_generation += 1
+
+
+def decode_access_token(token: str) -> Optional[dict]:
+    """Decode and verify a JWT token, reusing a cached verification until the token expires."""
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    generation = _token_generation
+
+    cached = token_cache.get(digest)
+    if cached is not None and cached[1] == generation:
+        return dict(cached[0])
+
+    payload = _verify_access_token(token)
+    if payload is None:
+        return None
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        # exp is wall-clock; the cache runs on the monotonic clock
+        token_cache.set(digest, (payload, generation), expires_at=time.monotonic() + (exp - time.time()))
+    return dict(payload)
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user from JWT token."""
+) -> CachedUser:
+    """
+    Get the current authenticated user from JWT token.
+    Returns a cached snapshot (id, username, role, is_active, permissions);
+    load the full User row explicitly where more fields are needed.
+    """
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -94,7 +185,7 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = load_cached_user(db, user_id)
     if user is None or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -105,7 +196,33 @@ def get_current_user(
     return user
 
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
+def user_from_token(token: str) -> Optional[CachedUser]:
+    """
+    Resolve a bearer token to an active user outside of a request dependency
+    (middleware, streaming endpoints). Opens a session only on a cache miss.
+    """
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+    try:
+        user_id = int(payload.get("sub"))
+    except (ValueError, TypeError):
+        return None
+
+    user = user_cache.get(user_id)
+    if user is None:
+        from .db import SessionLocal
+        db = SessionLocal()
+        try:
+            user = load_cached_user(db, user_id)
+        finally:
+            db.close()
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+def get_current_admin_user(current_user: CachedUser = Depends(get_current_user)) -> CachedUser:
     """Verify that the current user is an admin."""
     if current_user.role != "admin":
         raise HTTPException(
@@ -119,7 +236,7 @@ def get_current_admin_user(current_user: User = Depends(get_current_user)) -> Us
 def get_optional_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: Session = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[CachedUser]:
     """Get user if authenticated, otherwise None."""
     if not credentials:
         return None
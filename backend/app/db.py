@@ -1,27 +1,72 @@
 import os
-from sqlalchemy import create_engine
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
 from dotenv import load_dotenv
 
 
 load_dotenv()
 
+from .db_pool import TimedQueuePool, instrument_engine, pool_kwargs
+
 DB_USER = os.getenv("DB_USER", "root")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "")
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "3310")
 DB_NAME = os.getenv("DB_NAME", "attendance_db")
 
-SQLALCHEMY_DATABASE_URL = (
+# DATABASE_URL overrides the MySQL settings above, e.g. sqlite:///./attendance.db
+# or sqlite:// (in-memory) to run without a MySQL server
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL") or (
     f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
 )
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    future=True,
-)
+
+def is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (url.split("://", 1)[-1] in ("", "/", "/:memory:") or "mode=memory" in url)
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """create_engine keyword arguments for ``url``."""
+    if is_memory_sqlite(url):
+        # A single shared connection, otherwise every connection is a new empty database
+        return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+    if url.startswith("sqlite"):
+        return {
+            "poolclass": TimedQueuePool,
+            "connect_args": {"check_same_thread": False, "timeout": 30},
+            **pool_kwargs(),
+        }
+    # Pool size/overflow/timeout/recycle come from DB_POOL_* (see db_pool.py)
+    return {"poolclass": TimedQueuePool, **pool_kwargs()}
+
+
+def configure_sqlite(engine: Engine):
+    """Enforce foreign keys (ON DELETE CASCADE) and let readers run alongside a writer."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+
+def is_mysql(bind: Optional[Any] = None) -> bool:
+    """True if ``bind`` (engine, connection or session; default: the app engine) is MySQL."""
+    if bind is not None and hasattr(bind, "get_bind"):
+        bind = bind.get_bind()
+    return (bind or engine).dialect.name == "mysql"
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, future=True, **engine_options(SQLALCHEMY_DATABASE_URL))
+configure_sqlite(engine)
+instrument_engine(engine, "sync")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
 
@@ -34,5 +79,3 @@ def get_db():
         yield db
     finally:
         db.close()
-
-
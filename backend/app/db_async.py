@@ -0,0 +1,146 @@
+"""Optional async database access for the read-only analytics endpoints.
+
+With ``DB_ASYNC=1`` the analytics routers read through an ``AsyncSession`` on an
+async driver (asyncmy or aiomysql for MySQL, aiosqlite as a local stand-in), so
+a request waiting on a long scan holds no thread. ``ASYNC_DATABASE_URL``
+overrides the URL derived from ``db.SQLALCHEMY_DATABASE_URL``. If the flag is
+off or no async driver is installed, ``get_read_db`` yields the regular sync
+session and queries run in Starlette's threadpool, exactly as before.
+
+Aggregation over the fetched rows is CPU-bound and always runs on a small
+dedicated executor (``CPU_WORKERS``) so it never blocks the event loop and never
+competes with the threadpool used for I/O.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .db import SQLALCHEMY_DATABASE_URL, SessionLocal, configure_sqlite, is_memory_sqlite
+from .db_pool import TimedAsyncQueuePool, instrument_engine, pool_kwargs
+from .metrics import record_fetch
+from .profiling import profile_call
+
+DB_ASYNC = os.getenv("DB_ASYNC", "0").lower() in ("1", "true", "yes")
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Preferred async driver per sync driver, in order of preference
+_ASYNC_DRIVERS = {
+    "mysql+pymysql": ("mysql+asyncmy", "mysql+aiomysql"),
+    "sqlite": ("sqlite+aiosqlite",),
+    "sqlite+pysqlite": ("sqlite+aiosqlite",),
+}
+
+ReadSession = Union[AsyncSession, Session]
+
+
+def _async_engine() -> Optional[AsyncEngine]:
+    if not DB_ASYNC:
+        return None
+
+    candidates = []
+    override = os.getenv("ASYNC_DATABASE_URL")
+    if override:
+        candidates.append(override)
+    elif is_memory_sqlite(SQLALCHEMY_DATABASE_URL):
+        # A second engine would open a different, empty in-memory database
+        print("DB_ASYNC ignored for an in-memory SQLite database; using the sync session")
+        return None
+    else:
+        scheme, _, rest = SQLALCHEMY_DATABASE_URL.partition("://")
+        candidates.extend(f"{driver}://{rest}" for driver in _ASYNC_DRIVERS.get(scheme, ()))
+
+    for url in candidates:
+        # Only the MySQL drivers get the sized, instrumented queue pool
+        options = dict(poolclass=TimedAsyncQueuePool, **pool_kwargs()) if url.startswith("mysql") else {}
+        try:
+            engine = create_async_engine(url, **options)
+        except ImportError as e:
+            print(f"Async driver unavailable for {url.split('://')[0]}: {e}")
+            continue
+        configure_sqlite(engine.sync_engine)
+        instrument_engine(engine.sync_engine, "async")
+        return engine
+    print("Warning: DB_ASYNC is set but no async driver is available; using the sync session")
+    return None
+
+
+async_engine = _async_engine()
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False) if async_engine else None
+)
+
+_cpu_executor = ThreadPoolExecutor(max_workers=max(1, CPU_WORKERS), thread_name_prefix="analytics-cpu")
+
+
+async def get_read_db():
+    """Session dependency for read-only endpoints: async when enabled, sync otherwise."""
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+        return
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def fetch_all(db: ReadSession, stmt) -> List[Any]:
+    """Execute a SELECT and return all result rows."""
+    start = time.perf_counter()
+    if isinstance(db, AsyncSession):
+        rows = (await db.execute(stmt)).all()
+    else:
+        rows = await run_in_threadpool(profile_call, lambda: db.execute(stmt).all())
+    record_fetch(time.perf_counter() - start)
+    return rows
+
+
+async def fetch_scalars(db: ReadSession, stmt) -> List[Any]:
+    """Execute a SELECT and return the first column of every row."""
+    start = time.perf_counter()
+    if isinstance(db, AsyncSession):
+        rows = (await db.execute(stmt)).scalars().all()
+    else:
+        rows = await run_in_threadpool(profile_call, lambda: db.execute(stmt).scalars().all())
+    record_fetch(time.perf_counter() - start)
+    return rows
+
+
+async def fetch_file_rows(db: ReadSession, row_model, file_ids: Iterable[int]) -> Dict[int, List[dict]]:
+    """Fetch the ``data`` of every row of the given uploaded files, grouped by file id."""
+    file_ids = list(file_ids)
+    rows_by_file: Dict[int, List[dict]] = defaultdict(list)
+    if not file_ids:
+        return rows_by_file
+    stmt = (
+        select(row_model.file_id, row_model.data)
+        .where(row_model.file_id.in_(file_ids))
+        .order_by(row_model.id)
+    )
+    for file_id, data in await fetch_all(db, stmt):
+        rows_by_file[file_id].append(data)
+    return rows_by_file
+
+
+async def run_cpu(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run CPU-bound aggregation on the analytics executor, keeping context variables."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_cpu_executor, functools.partial(context.run, profile_call, fn, *args))
+
+
+async def dispose_async_engine():
+    if async_engine is not None:
+        await async_engine.dispose()
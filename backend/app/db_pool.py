@@ -0,0 +1,235 @@
+"""Connection pool configuration and live pool metrics.
+
+Each process (uvicorn/gunicorn worker) owns its own pools, so MySQL sees at most
+``workers * (pool_size + max_overflow)`` connections per engine. Size
+``max_connections`` from the ``sizing`` block of ``GET /admin/db-pool`` (or
+``pool_sizing()``) and leave headroom for admin tools and migrations.
+
+Checkout wait is measured inside the pool (``TimedQueuePool``) and includes the
+time to open a new connection; checkouts, checkins, new connections and
+invalidations are counted from SQLAlchemy pool events. A sample of the pool
+state is appended to a bounded series at most every ``DB_POOL_SAMPLE_INTERVAL``
+seconds while the pool is in use.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+DB_POOL_SAMPLE_INTERVAL = float(os.getenv("DB_POOL_SAMPLE_INTERVAL", "5"))
+DB_POOL_SAMPLE_HISTORY = int(os.getenv("DB_POOL_SAMPLE_HISTORY", "720"))
+
+# Upper bounds (seconds) of the checkout-wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.01, 0.1, 1.0, 5.0, float("inf"))
+
+
+def pool_kwargs() -> Dict[str, Any]:
+    """Keyword arguments for create_engine/create_async_engine from the environment."""
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+class PoolStats:
+    """Counters and sampled history for one engine's pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+        self.peak_checked_out = 0
+        self.samples: deque = deque(maxlen=DB_POOL_SAMPLE_HISTORY)
+        self._next_sample = 0.0
+        self._interval = {"waits": 0, "wait_total": 0.0, "wait_max": 0.0, "timeouts": 0}
+
+    def record_wait(self, pool, seconds: float, timed_out: bool):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                self._interval["timeouts"] += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+            self._interval["waits"] += 1
+            self._interval["wait_total"] += seconds
+            self._interval["wait_max"] = max(self._interval["wait_max"], seconds)
+            self._maybe_sample(pool)
+
+    def record_checkout(self, pool):
+        with self._lock:
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, pool.checkedout())
+
+    def record_checkin(self, pool):
+        with self._lock:
+            self.checkins += 1
+            self._maybe_sample(pool)
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidate(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def _maybe_sample(self, pool):
+        now = time.time()
+        if now < self._next_sample:
+            return
+        self._next_sample = now + DB_POOL_SAMPLE_INTERVAL
+        interval = self._interval
+        self.samples.append({
+            "ts": round(now, 3),
+            "checked_out": pool.checkedout(),
+            "overflow": max(0, pool.overflow()),
+            "checked_in": pool.checkedin(),
+            "waits": interval["waits"],
+            "wait_avg_ms": round(interval["wait_total"] / interval["waits"] * 1000, 3) if interval["waits"] else 0.0,
+            "wait_max_ms": round(interval["wait_max"] * 1000, 3),
+            "timeouts": interval["timeouts"],
+        })
+        self._interval = {"waits": 0, "wait_total": 0.0, "wait_max": 0.0, "timeouts": 0}
+
+    def snapshot(self, pool, samples: int) -> Dict[str, Any]:
+        with self._lock:
+            waits = sum(self.wait_buckets)
+            return {
+                "name": self.name,
+                "config": {
+                    "pool_size": pool.size(),
+                    "max_overflow": pool._max_overflow,
+                    "timeout_seconds": pool._timeout,
+                    "recycle_seconds": pool._recycle,
+                },
+                "current": {
+                    "checked_out": pool.checkedout(),
+                    "checked_in": pool.checkedin(),
+                    "overflow": max(0, pool.overflow()),
+                    "peak_checked_out": self.peak_checked_out,
+                },
+                "totals": {
+                    "checkouts": self.checkouts,
+                    "checkins": self.checkins,
+                    "connects": self.connects,
+                    "invalidations": self.invalidations,
+                    "timeouts": self.timeouts,
+                    "wait_avg_ms": round(self.wait_total / waits * 1000, 3) if waits else 0.0,
+                    "wait_max_ms": round(self.wait_max * 1000, 3),
+                    "wait_histogram": {
+                        ("+Inf" if bound == float("inf") else f"le_{bound}s"): count
+                        for bound, count in zip(WAIT_BUCKETS, self.wait_buckets)
+                    },
+                },
+                "samples": list(self.samples)[-samples:] if samples > 0 else [],
+            }
+
+
+class _TimedCheckoutMixin:
+    """Times every checkout from the pool queue, including waits that time out."""
+
+    stats: Optional[PoolStats] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.stats is not None:
+                self.stats.record_wait(self, time.perf_counter() - start, timed_out=True)
+            raise
+        if self.stats is not None:
+            self.stats.record_wait(self, time.perf_counter() - start, timed_out=False)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep feeding the same stats
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# name -> (engine, stats)
+_instrumented: Dict[str, tuple] = {}
+
+
+def instrument_engine(engine: Engine, name: str) -> Optional[PoolStats]:
+    """Attach pool statistics to an engine created with a Timed*QueuePool."""
+    pool = engine.pool
+    if not isinstance(pool, _TimedCheckoutMixin):
+        return None
+    stats = PoolStats(name)
+    pool.stats = stats
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.record_checkout(engine.pool)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        stats.record_checkin(engine.pool)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        stats.record_connect()
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        stats.record_invalidate()
+
+    _instrumented[name] = (engine, stats)
+    return stats
+
+
+def pool_sizing() -> Dict[str, Any]:
+    """Worst-case MySQL connections needed by this deployment."""
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    per_worker = 0
+    for engine, _ in _instrumented.values():
+        pool = engine.pool
+        per_worker += pool.size() + max(0, pool._max_overflow)
+    return {
+        "workers": workers,
+        "per_worker_max_connections": per_worker,
+        "max_connections_required": workers * per_worker,
+    }
+
+
+def pool_metrics(samples: int = 60) -> Dict[str, Any]:
+    """Current state, totals and recent samples of every instrumented pool."""
+    return {
+        "pools": [stats.snapshot(engine.pool, samples) for engine, stats in _instrumented.values()],
+        "sizing": pool_sizing(),
+    }
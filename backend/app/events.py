@@ -0,0 +1,103 @@
+"""Data-change notifications for ``GET /events`` (server-sent events).
+
+Every write bumps its dataset's row in ``dataset_version``; once that
+transaction commits, the new version is published to the SSE subscribers of
+this process. Other workers learn about it from ``poll_versions``, which reads
+``dataset_version`` every few seconds while anyone is subscribed, so the
+stream works the same behind multiple workers (just a little later).
+
+Subscribers are asyncio queues. Publishing may happen on any thread (sync
+endpoints, background tasks), so events are handed to each subscriber's loop
+with ``call_soon_threadsafe``. A dataset's version only ever increases; each
+process publishes a given version once, whether it saw the commit or the poll.
+"""
+import asyncio
+import os
+import threading
+from typing import Dict, List, Tuple
+
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+
+from .db import SessionLocal
+from .models import DatasetVersion
+
+# Seconds between dataset_version reads (changes committed by other workers)
+POLL_SECONDS = float(os.getenv("EVENTS_POLL_SECONDS", "2"))
+
+# Events a slow subscriber may have queued before the oldest are dropped
+QUEUE_SIZE = 100
+
+Event = Tuple[str, int]
+
+
+def _put(queue: asyncio.Queue, event: Event):
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+class Broadcaster:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        self._versions: Dict[str, int] = {}
+
+    def subscribe(self) -> asyncio.Queue:
+        """New subscriber queue on the running loop, primed with the known versions."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+            for event in list(self._versions.items())[-QUEUE_SIZE:]:
+                queue.put_nowait(event)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def publish(self, dataset: str, version: int):
+        """Send ``(dataset, version)`` to every subscriber unless it is not newer. Thread-safe."""
+        with self._lock:
+            if version <= self._versions.get(dataset, 0):
+                return
+            self._versions[dataset] = version
+            targets: List[Tuple[asyncio.Queue, asyncio.AbstractEventLoop]] = list(self._subscribers.items())
+        for queue, loop in targets:
+            try:
+                loop.call_soon_threadsafe(_put, queue, (dataset, version))
+            except RuntimeError:
+                # Loop already closed (worker shutting down)
+                self.unsubscribe(queue)
+
+
+broadcaster = Broadcaster()
+
+
+def read_versions() -> Dict[str, int]:
+    db = SessionLocal()
+    try:
+        return dict(db.execute(select(DatasetVersion.name, DatasetVersion.version)).all())
+    finally:
+        db.close()
+
+
+async def publish_current():
+    """Publish the stored versions this process has not published yet."""
+    for dataset, version in (await run_in_threadpool(read_versions)).items():
+        broadcaster.publish(dataset, version)
+
+
+async def poll_versions():
+    """Pick up versions committed by other workers while anyone is subscribed (runs for the life of the worker)."""
+    while True:
+        if broadcaster.has_subscribers:
+            try:
+                await publish_current()
+            except Exception as e:
+                print(f"⚠ Error polling dataset versions: {e}")
+        await asyncio.sleep(POLL_SECONDS)
@@ -37,5 +37,30 @@ def init_db():
         db.close()
 
 
+def run_startup_tasks():
+    """
+    One-time startup work: create missing tables, seed the admin user and
+    backfill derived tables. Run once per deployment (prestart.py), not once
+    per worker.
+    """
+    from .db import Base, engine
+    # Import every model module so all tables are registered on Base.metadata
+    from . import models, models_kpi  # noqa: F401
+    from .services.attendance_fact import backfill_attendance_facts
+    from .services.employee_directory import backfill_directory
+    from .services.teams_activity import backfill_facts
+    from .services.teams_app_usage import backfill_app_facts
+
+    Base.metadata.create_all(bind=engine)
+    try:
+        init_db()
+    except Exception as e:
+        print(f"Warning: Failed to initialize admin user: {e}")
+    backfill_attendance_facts()
+    backfill_directory()
+    backfill_facts()
+    backfill_app_facts()
+
+
 if __name__ == "__main__":
     init_db()
@@ -1,7 +1,16 @@
-from fastapi import FastAPI
+import asyncio
+import os
+import time
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from .db import Base, engine
+from .db_async import dispose_async_engine
+from .events import poll_versions
+from .metrics import REGISTRY, MetricsMiddleware, instrument_database
+from .profiling import ProfilingMiddleware, wrap_sync_endpoints
 # Import KPI models to ensure tables are created
 from .models_kpi import OnTimeKPI, WorkHourKPI, WorkHourLostKPI, LeaveAnalysisKPI
 from .routers.upload import router as upload_router
@@ -9,6 +18,7 @@ from .routers.files import router as files_router
 from .routers.kpi import router as kpi_router
 from .routers.work_hour import router as work_hour_router
 from .routers.dashboard import router as dashboard_router
+from .routers.employees import router as employees_router
 from .routers.kpi_rebuild import router as kpi_rebuild_router
 from .routers.teams_upload import router as teams_upload_router
 from .routers.teams_files import router as teams_files_router
@@ -19,6 +29,8 @@ from .routers.teams_app_analytics import router as teams_app_analytics_router
 from .routers.employee_upload import router as employee_upload_router
 from .routers.employee_files import router as employee_files_router
 from .routers.cxo import router as cxo_router
+from .routers.admin import router as admin_router
+from .routers.events import router as events_router
 
 # Import auth routers with error handling
 try:
@@ -36,6 +48,9 @@ except Exception as e:
     users_router = None
 
 
+_IMPORT_STARTED_AT = time.time()
+
+
 def create_app() -> FastAPI:
     app = FastAPI(title="Attendance Monitoring Dashboard API", version="1.0.0")
 
@@ -49,8 +64,12 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    # Ensure tables exist
-    Base.metadata.create_all(bind=engine)
+    # Opt-in cProfile capture (X-Profile: 1 from an admin, or POST /admin/profiling)
+    app.add_middleware(ProfilingMiddleware)
+
+    # Request latency and DB/compute time per route, served at /metrics
+    instrument_database()
+    app.add_middleware(MetricsMiddleware)
 
     # Routers
     if auth_router:
@@ -66,6 +85,7 @@ def create_app() -> FastAPI:
         app.include_router(kpi_router, prefix="/kpi", tags=["kpi"])
         app.include_router(work_hour_router, prefix="/work_hour", tags=["work_hour"])
         app.include_router(dashboard_router, prefix="/dashboard", tags=["dashboard"])
+        app.include_router(employees_router, prefix="/employees", tags=["employees"])
         app.include_router(kpi_rebuild_router, prefix="/kpi", tags=["kpi"])
     
         # MS Teams module routers
@@ -83,10 +103,51 @@ def create_app() -> FastAPI:
         # CXO Management router
         app.include_router(cxo_router, prefix="/cxo", tags=["cxo"])
 
+        # Operational metrics (admin only)
+        app.include_router(admin_router, prefix="/admin", tags=["admin"])
+
+        # Data-version change notifications (server-sent events)
+        app.include_router(events_router, prefix="/events", tags=["events"])
+
+    @app.on_event("startup")
+    def report_worker_startup():
+        # Under gunicorn the clock starts at fork (see gunicorn.conf.py),
+        # otherwise at import of this module
+        forked_at = os.getenv("GUNICORN_WORKER_FORKED_AT")
+        started = float(forked_at) if forked_at else _IMPORT_STARTED_AT
+        app.state.worker = {
+            "pid": os.getpid(),
+            "started_at": started,
+            "startup_seconds": round(time.time() - started, 3),
+            "preloaded": bool(forked_at),
+        }
+        print(f"✓ Worker {os.getpid()} ready in {app.state.worker['startup_seconds'] * 1000:.0f} ms")
+
+    @app.on_event("startup")
+    async def start_version_polling():
+        # Changes committed by other workers reach this worker's /events subscribers
+        app.state.version_poller = asyncio.create_task(poll_versions())
+
+    @app.on_event("shutdown")
+    async def stop_version_polling():
+        app.state.version_poller.cancel()
+
+    @app.on_event("shutdown")
+    async def close_async_engine():
+        await dispose_async_engine()
+
     @app.get("/health")
     def health():
         return {"status": "ok"}
     
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def metrics(authorization: Optional[str] = Header(None)):
+        """Prometheus text format. Set METRICS_TOKEN to require `Authorization: Bearer <token>`."""
+        token = os.getenv("METRICS_TOKEN")
+        if token and authorization != f"Bearer {token}":
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
     @app.get("/debug/routes")
     def debug_routes():
         """List all registered routes for debugging."""
@@ -100,15 +161,19 @@ def create_app() -> FastAPI:
                 })
         return {"routes": routes, "auth_loaded": auth_router is not None, "users_loaded": users_router is not None}
 
+    # Sync endpoints run on threadpool threads; give them their own profiler when profiled
+    wrap_sync_endpoints(app)
+
     return app
 
 
+# Set RUN_STARTUP_TASKS=0 when a pre-start step (prestart.py) already ran
+# create_all and admin seeding, e.g. in front of multiple workers
+RUN_STARTUP_TASKS = os.getenv("RUN_STARTUP_TASKS", "1").lower() in ("1", "true", "yes")
+
 app = create_app()
 
-# Initialize default admin user after app creation
-from .init_db import init_db
-try:
-    init_db()
-except Exception as e:
-    print(f"Warning: Failed to initialize admin user: {e}")
+if RUN_STARTUP_TASKS:
+    from .init_db import run_startup_tasks
+    run_startup_tasks()
 
@@ -0,0 +1,369 @@
+"""In-process metrics, rendered in the Prometheus text format at ``GET /metrics``.
+
+No client library or collector is involved: counters and histograms live in the
+process and are rendered on demand. Each worker process keeps its own values;
+``process_info`` carries the pid so scrapes from different workers can be told
+apart.
+
+Per request the middleware records latency by route template, and the query
+count and time spent in ``cursor.execute`` (from SQLAlchemy engine events).
+The analytics fetch (execute plus fetching and JSON-decoding the rows) and the
+Python aggregation are timed too, so a slow route splits into MySQL
+(``db_seconds``), row decoding (``db_fetch_seconds - db_seconds``) and
+aggregation (``compute_seconds``).
+"""
+import contextvars
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+ROW_BUCKETS = (100, 1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+GROUP_BUCKETS = (1, 10, 50, 100, 500, 1_000, 5_000, 10_000)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: Any):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        # label key -> [per-bucket counts, sum, count]
+        self._values: Dict[LabelKey, list] = {}
+
+    def observe(self, value: float, **labels: Any):
+        key = _label_key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            entry[0][bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    le = ("le", _format_value(float(bound)))
+                    lines.append(f"{self.name}_bucket{_format_labels(key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(round(total, 6))}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    """Metrics plus collectors that report values owned by other modules at render time."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Iterable[Tuple[Dict[str, Any], float]]]]]] = []
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+
+    def add_collector(self, collector):
+        """``collector()`` yields ``(name, kind, help, [(labels, value), ...])``."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(_label_key(labels))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route template, method and status.")
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency by route template.")
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries executed per request.", buckets=COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram("http_request_db_seconds", "Time per request spent executing database queries.")
+REQUEST_FETCH_SECONDS = Histogram(
+    "http_request_db_fetch_seconds", "Time per request spent running analytics queries and decoding their rows."
+)
+REQUEST_COMPUTE_SECONDS = Histogram(
+    "http_request_compute_seconds", "Time per request spent in Python aggregation."
+)
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "Duration of individual database queries.")
+
+ANALYTICS_SECONDS = Histogram("analytics_compute_seconds", "Duration of one aggregation call.")
+ANALYTICS_ROWS = Histogram(
+    "analytics_rows_scanned", "Rows scanned per aggregation call.", buckets=ROW_BUCKETS
+)
+ANALYTICS_GROUPS = Histogram(
+    "analytics_groups_produced", "Result groups produced per aggregation call.", buckets=GROUP_BUCKETS
+)
+
+UPLOAD_BYTES = Counter("upload_bytes_total", "Bytes received in uploaded files.")
+UPLOAD_ROWS = Counter("upload_rows_total", "Rows stored from uploaded files.")
+UPLOAD_SECONDS = Histogram("upload_duration_seconds", "Time to parse and store one uploaded file.")
+UPLOAD_BYTES_PER_SECOND = Gauge("upload_last_bytes_per_second", "Throughput of the most recent upload in bytes/s.")
+UPLOAD_ROWS_PER_SECOND = Gauge("upload_last_rows_per_second", "Throughput of the most recent upload in rows/s.")
+
+
+class RequestStats:
+    """Per-request accumulators; shared by reference with threadpool/executor work."""
+
+    __slots__ = ("db_queries", "db_seconds", "fetch_seconds", "compute_seconds", "_lock")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.fetch_seconds = 0.0
+        self.compute_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, field: str, value: float):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + value)
+
+
+_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_stats", default=None)
+
+
+def record_fetch(seconds: float):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.add("fetch_seconds", seconds)
+
+
+# --- database instrumentation -------------------------------------------------
+
+_db_instrumented = False
+
+
+def instrument_database():
+    """Time every cursor execution on every engine (sync and async)."""
+    global _db_instrumented
+    if _db_instrumented:
+        return
+    _db_instrumented = True
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        _finish_query(conn)
+
+    @event.listens_for(Engine, "handle_error")
+    def _error(exception_context):
+        if exception_context.connection is not None:
+            _finish_query(exception_context.connection)
+
+
+def _finish_query(conn):
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    DB_QUERY_SECONDS.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.add("db_queries", 1)
+        stats.add("db_seconds", elapsed)
+
+
+# --- aggregation and upload instrumentation ------------------------------------
+
+def observe_aggregation(computation: str):
+    """Decorate ``fn(rows, ...)`` to record duration, rows scanned and groups produced."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(rows, *args, **kwargs):
+            start = time.perf_counter()
+            result = fn(rows, *args, **kwargs)
+            elapsed = time.perf_counter() - start
+            ANALYTICS_SECONDS.observe(elapsed, computation=computation)
+            ANALYTICS_ROWS.observe(len(rows), computation=computation)
+            ANALYTICS_GROUPS.observe(len(result), computation=computation)
+            stats = _request_stats.get()
+            if stats is not None:
+                stats.add("compute_seconds", elapsed)
+            return result
+        return wrapper
+    return decorator
+
+
+def record_upload(kind: str, nbytes: int, nrows: int, seconds: float):
+    UPLOAD_BYTES.inc(nbytes, kind=kind)
+    UPLOAD_ROWS.inc(nrows, kind=kind)
+    UPLOAD_SECONDS.observe(seconds, kind=kind)
+    if seconds > 0:
+        UPLOAD_BYTES_PER_SECOND.set(round(nbytes / seconds, 1), kind=kind)
+        UPLOAD_ROWS_PER_SECOND.set(round(nrows / seconds, 1), kind=kind)
+
+
+# --- collectors for state owned elsewhere --------------------------------------
+
+def _process_collector():
+    yield "process_info", "gauge", "Worker process serving this scrape.", [({"pid": os.getpid()}, 1)]
+
+
+def _cache_collector():
+    from .cache import all_caches
+    stats = [cache.stats() for cache in all_caches()]
+    for field, kind, documentation in (
+        ("hits", "counter", "Cache lookups that found a live entry."),
+        ("misses", "counter", "Cache lookups that found no live entry."),
+        ("evictions", "counter", "Entries evicted to stay within maxsize."),
+        ("size", "gauge", "Entries currently cached."),
+        ("hit_ratio", "gauge", "hits / (hits + misses) since start."),
+    ):
+        name = f"cache_{field}_total" if kind == "counter" else f"cache_{field}"
+        yield name, kind, documentation, [({"cache": s["name"]}, s[field]) for s in stats]
+
+
+def _pool_collector():
+    from .db_pool import pool_metrics
+    pools = pool_metrics(samples=0)["pools"]
+    for name, section, field, kind, documentation in (
+        ("db_pool_checked_out", "current", "checked_out", "gauge", "Connections checked out of the pool."),
+        ("db_pool_overflow", "current", "overflow", "gauge", "Connections open beyond pool_size."),
+        ("db_pool_checkouts_total", "totals", "checkouts", "counter", "Pool checkouts."),
+        ("db_pool_timeouts_total", "totals", "timeouts", "counter", "Checkouts that timed out waiting."),
+        ("db_pool_checkout_wait_max_ms", "totals", "wait_max_ms", "gauge", "Longest checkout wait since start."),
+    ):
+        yield name, kind, documentation, [({"pool": p["name"]}, p[section][field]) for p in pools]
+
+
+REGISTRY.add_collector(_process_collector)
+REGISTRY.add_collector(_cache_collector)
+REGISTRY.add_collector(_pool_collector)
+
+
+# --- ASGI middleware ---------------------------------------------------------
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency and DB/compute time per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+        finished: Optional[float] = None
+
+        async def send_wrapper(message):
+            nonlocal status, finished
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Background tasks run after this point; they are not request latency
+                finished = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = (finished or time.perf_counter()) - start
+            route = scope.get("route")
+            labels = {"method": scope["method"], "route": getattr(route, "path", None) or "unmatched"}
+            HTTP_REQUESTS.inc(status=status, **labels)
+            HTTP_REQUEST_SECONDS.observe(elapsed, **labels)
+            REQUEST_DB_QUERIES.observe(stats.db_queries, **labels)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, **labels)
+            REQUEST_FETCH_SECONDS.observe(stats.fetch_seconds, **labels)
+            REQUEST_COMPUTE_SECONDS.observe(stats.compute_seconds, **labels)
+            _request_stats.reset(token)
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
-from sqlalchemy.dialects.mysql import JSON as MySQLJSON
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, ForeignKey, Boolean, Index, JSON, LargeBinary
+from sqlalchemy.dialects.mysql import JSON as MySQLJSON, LONGBLOB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 from .db import Base
 
+# Native JSON on MySQL, the generic JSON type (e.g. TEXT on SQLite) elsewhere
+JSONType = JSON().with_variant(MySQLJSON(), "mysql")
+# BLOB is capped at 64 KB on MySQL
+BlobType = LargeBinary().with_variant(LONGBLOB(), "mysql")
+
 
 class UploadedFile(Base):
     __tablename__ = "uploaded_file"
@@ -12,7 +17,7 @@ class UploadedFile(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     filename = Column(String(255), nullable=False)
     uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    header_order = Column(MySQLJSON, nullable=False)
+    header_order = Column(JSONType, nullable=False)
 
     rows = relationship(
         "UploadedRow",
@@ -27,11 +32,30 @@ class UploadedRow(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     file_id = Column(Integer, ForeignKey("uploaded_file.id", ondelete="CASCADE"), nullable=False)
-    data = Column(MySQLJSON, nullable=False)
+    data = Column(JSONType, nullable=False)
 
     file = relationship("UploadedFile", back_populates="rows")
 
 
+class AttendanceFact(Base):
+    """
+    Employee code and parsed attendance date of every uploaded attendance row,
+    written at upload (see services.attendance_fact), so one employee's days
+    are an index range scan instead of a scan of the JSON rows.
+    """
+    __tablename__ = "attendance_fact"
+    __table_args__ = (
+        Index('idx_attendance_fact_file', 'file_id'),
+        Index('idx_attendance_fact_employee_date', 'employee_code', 'attendance_date', 'row_id'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    file_id = Column(Integer, ForeignKey("uploaded_file.id", ondelete="CASCADE"), nullable=False)
+    row_id = Column(Integer, ForeignKey("uploaded_row.id", ondelete="CASCADE"), nullable=False)
+    employee_code = Column(String(50), nullable=False)  # stripped "Employee Code"
+    attendance_date = Column(Date, nullable=True)  # NULL when "Attendance Date" could not be parsed
+
+
 class FunctionKPI(Base):
     __tablename__ = "function_kpi"
 
@@ -74,6 +98,32 @@ class LocationKPI(Base):
     computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
 
+class DatasetVersion(Base):
+    """
+    Change counter per dataset (e.g. "attendance"), bumped in the same
+    transaction as every upload, delete and rebuild of that dataset.
+    """
+    __tablename__ = "dataset_version"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class DashboardSnapshot(Base):
+    """
+    The /dashboard/summary payload for one group_by, as gzip-compressed JSON,
+    computed for the attendance dataset version it records.
+    """
+    __tablename__ = "dashboard_snapshot"
+
+    group_by = Column(String(20), primary_key=True)
+    version = Column(Integer, nullable=False)
+    payload = Column(BlobType, nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    compute_seconds = Column(Float, nullable=False, default=0)
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -87,7 +137,7 @@ class User(Base):
     phone = Column(String(20), nullable=True)
     department = Column(String(100), nullable=True)
     position = Column(String(100), nullable=True)
-    permissions = Column(MySQLJSON, nullable=True, default=dict)  # Module permissions
+    permissions = Column(JSONType, nullable=True, default=dict)  # Module permissions
     last_login = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -101,7 +151,7 @@ class TeamsUploadedFile(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     filename = Column(String(255), nullable=False)
     uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    header_order = Column(MySQLJSON, nullable=False)
+    header_order = Column(JSONType, nullable=False)
     from_month = Column(String(7), nullable=True)  # YYYY-MM format
     to_month = Column(String(7), nullable=True)    # YYYY-MM format
 
@@ -118,11 +168,41 @@ class TeamsUploadedRow(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     file_id = Column(Integer, ForeignKey("teams_uploaded_file.id", ondelete="CASCADE"), nullable=False)
-    data = Column(MySQLJSON, nullable=False)
+    data = Column(JSONType, nullable=False)
 
     file = relationship("TeamsUploadedFile", back_populates="rows")
 
 
+class TeamsActivityFact(Base):
+    """
+    Typed copy of a Teams user activity row: the normalized user email, the
+    file's period and the ten metric counts as integers, written at upload
+    (see services.teams_activity) so rollups are plain SUM ... GROUP BY.
+    """
+    __tablename__ = "teams_activity_fact"
+    __table_args__ = (
+        Index('idx_teams_fact_file', 'file_id'),
+        Index('idx_teams_fact_email_file', 'email', 'file_id'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    file_id = Column(Integer, ForeignKey("teams_uploaded_file.id", ondelete="CASCADE"), nullable=False)
+    user_principal_name = Column(String(255), nullable=True)  # as written in the file
+    email = Column(String(255), nullable=False)  # stripped, lowercase user principal name
+    from_month = Column(String(7), nullable=True)
+    to_month = Column(String(7), nullable=True)
+    team_chat = Column(Integer, nullable=False, default=0)
+    private_chat = Column(Integer, nullable=False, default=0)
+    calls = Column(Integer, nullable=False, default=0)
+    meetings_organized = Column(Integer, nullable=False, default=0)
+    meetings_attended = Column(Integer, nullable=False, default=0)
+    one_time_organized = Column(Integer, nullable=False, default=0)
+    one_time_attended = Column(Integer, nullable=False, default=0)
+    recurring_organized = Column(Integer, nullable=False, default=0)
+    recurring_attended = Column(Integer, nullable=False, default=0)
+    post_messages = Column(Integer, nullable=False, default=0)
+
+
 # ===== Employee List Models =====
 
 class EmployeeUploadedFile(Base):
@@ -131,7 +211,7 @@ class EmployeeUploadedFile(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     filename = Column(String(255), nullable=False)
     uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    header_order = Column(MySQLJSON, nullable=False)
+    header_order = Column(JSONType, nullable=False)
 
     rows = relationship(
         "EmployeeUploadedRow",
@@ -146,11 +226,27 @@ class EmployeeUploadedRow(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     file_id = Column(Integer, ForeignKey("employee_uploaded_file.id", ondelete="CASCADE"), nullable=False)
-    data = Column(MySQLJSON, nullable=False)
+    data = Column(JSONType, nullable=False)
 
     file = relationship("EmployeeUploadedFile", back_populates="rows")
 
 
+class EmployeeDirectory(Base):
+    """
+    One row per employee email (lowercase) across all Employee List uploads;
+    the latest upload wins. Maintained by services.employee_directory.
+    """
+    __tablename__ = "employee_directory"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    email = Column(String(255), unique=True, nullable=False, index=True)  # stripped, lowercase
+    display_email = Column(String(255), nullable=False)  # as written in the file
+    name = Column(String(255), nullable=True)
+    function = Column(String(255), nullable=True)
+    company = Column(String(255), nullable=True)
+    file_id = Column(Integer, ForeignKey("employee_uploaded_file.id", ondelete="CASCADE"), nullable=False, index=True)
+
+
 # ===== Teams App Usage Models =====
 
 class TeamsAppUploadedFile(Base):
@@ -159,7 +255,7 @@ class TeamsAppUploadedFile(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     filename = Column(String(255), nullable=False)
     uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    header_order = Column(MySQLJSON, nullable=False)
+    header_order = Column(JSONType, nullable=False)
     from_month = Column(String(50), nullable=True)
     to_month = Column(String(50), nullable=True)
 
@@ -176,11 +272,29 @@ class TeamsAppUploadedRow(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     file_id = Column(Integer, ForeignKey("teams_app_uploaded_file.id", ondelete="CASCADE"), nullable=False)
-    data = Column(MySQLJSON, nullable=False)
+    data = Column(JSONType, nullable=False)
 
     file = relationship("TeamsAppUploadedFile", back_populates="rows")
 
 
+class TeamsAppUsageFact(Base):
+    """
+    Typed copy of a Teams App Usage row (app name and the two counts as
+    integers), written at upload (see services.teams_app_usage) so app
+    rankings are a SQL GROUP BY.
+    """
+    __tablename__ = "teams_app_usage_fact"
+    __table_args__ = (
+        Index('idx_teams_app_fact_file_app', 'file_id', 'app_name'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    file_id = Column(Integer, ForeignKey("teams_app_uploaded_file.id", ondelete="CASCADE"), nullable=False)
+    app_name = Column(String(255), nullable=False)  # stripped 'App Name'
+    team_using_app = Column(Integer, nullable=False, default=0)
+    users_using_app = Column(Integer, nullable=False, default=0)
+
+
 # ===== CXO Users Model =====
 
 class CXOUser(Base):
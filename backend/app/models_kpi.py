@@ -107,3 +107,109 @@ class LeaveAnalysisKPI(Base):
         Index('idx_leave_group', 'group_by', 'month', 'group_value'),
     )
 
+
+
+class KPIMember(Base):
+    """Distinct members per file and KPI key, used to recount members incrementally."""
+    __tablename__ = "kpi_member"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    file_id = Column(Integer, ForeignKey("uploaded_file.id", ondelete="CASCADE"), nullable=False)
+    month = Column(String(10), nullable=False)
+    group_by = Column(String(20), nullable=False)
+    group_value = Column(String(255), nullable=False)
+    member_id = Column(String(255), nullable=False)
+    
+    __table_args__ = (
+        Index('idx_member_file', 'file_id'),
+        Index('idx_member_group', 'group_by', 'month', 'group_value', 'member_id'),
+    )
+
+
+# ===== Cross-file rollups (maintained incrementally on upload/delete) =====
+
+class OnTimeRollup(Base):
+    """On Time % aggregated across all files per month and group."""
+    __tablename__ = "on_time_rollup"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    month = Column(String(10), nullable=False)
+    group_by = Column(String(20), nullable=False)
+    group_value = Column(String(255), nullable=False)
+    members = Column(Integer, nullable=False, default=0)
+    present = Column(Integer, nullable=False, default=0)
+    late = Column(Integer, nullable=False, default=0)
+    on_time = Column(Integer, nullable=False, default=0)
+    on_time_pct = Column(Float, nullable=False, default=0.0)
+    
+    __table_args__ = (
+        Index('idx_ontime_rollup_key', 'group_by', 'month', 'group_value', unique=True),
+    )
+
+
+class WorkHourRollup(Base):
+    """Work Hour Completion aggregated across all files per month and group."""
+    __tablename__ = "work_hour_rollup"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    month = Column(String(10), nullable=False)
+    group_by = Column(String(20), nullable=False)
+    group_value = Column(String(255), nullable=False)
+    members = Column(Integer, nullable=False, default=0)
+    present = Column(Integer, nullable=False, default=0)
+    od = Column(Integer, nullable=False, default=0)
+    shift_hours = Column(Float, nullable=False, default=0.0)
+    work_hours = Column(Float, nullable=False, default=0.0)
+    completed = Column(Integer, nullable=False, default=0)
+    completion_pct = Column(Float, nullable=False, default=0.0)
+    
+    __table_args__ = (
+        Index('idx_workhour_rollup_key', 'group_by', 'month', 'group_value', unique=True),
+    )
+
+
+class WorkHourLostRollup(Base):
+    """Work Hour Lost aggregated across all files per month and group."""
+    __tablename__ = "work_hour_lost_rollup"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    month = Column(String(10), nullable=False)
+    group_by = Column(String(20), nullable=False)
+    group_value = Column(String(255), nullable=False)
+    members = Column(Integer, nullable=False, default=0)
+    present = Column(Integer, nullable=False, default=0)
+    od = Column(Integer, nullable=False, default=0)
+    shift_hours = Column(Float, nullable=False, default=0.0)
+    work_hours = Column(Float, nullable=False, default=0.0)
+    lost_hours = Column(Float, nullable=False, default=0.0)
+    lost_pct = Column(Float, nullable=False, default=0.0)
+    
+    __table_args__ = (
+        Index('idx_lost_rollup_key', 'group_by', 'month', 'group_value', unique=True),
+    )
+
+
+class LeaveAnalysisRollup(Base):
+    """Leave Analysis aggregated across all files per month and group."""
+    __tablename__ = "leave_analysis_rollup"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    month = Column(String(10), nullable=False)
+    group_by = Column(String(20), nullable=False)
+    group_value = Column(String(255), nullable=False)
+    members = Column(Integer, nullable=False, default=0)
+    total_sl = Column(Integer, nullable=False, default=0)
+    total_cl = Column(Integer, nullable=False, default=0)
+    workdays = Column(Integer, nullable=False, default=0)
+    total_a = Column(Integer, nullable=False, default=0)
+    sl_adjacent_w = Column(Integer, nullable=False, default=0)
+    cl_adjacent_w = Column(Integer, nullable=False, default=0)
+    sl_adjacent_h = Column(Integer, nullable=False, default=0)
+    cl_adjacent_h = Column(Integer, nullable=False, default=0)
+    sl_pct = Column(Float, nullable=False, default=0.0)
+    cl_pct = Column(Float, nullable=False, default=0.0)
+    a_pct = Column(Float, nullable=False, default=0.0)
+    
+    __table_args__ = (
+        Index('idx_leave_rollup_key', 'group_by', 'month', 'group_value', unique=True),
+    )
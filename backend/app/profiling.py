@@ -0,0 +1,334 @@
+"""Opt-in cProfile capture of individual requests.
+
+A request is profiled when an admin sends ``X-Profile: 1`` or while the admin
+toggle (``POST /admin/profiling``) is armed for the next N matching requests.
+Otherwise the middleware checks one counter and the request headers and calls
+straight through; no profiler is created.
+
+cProfile only sees the thread it runs on, so a profiled request gets one
+profiler for its event-loop part plus one per worker-thread segment: sync
+endpoints (``wrap_sync_endpoints``) and ``run_cpu`` aggregation
+(``profile_call``). The segments are merged into one ``.prof`` (pstats,
+snakeviz) and a ``.collapsed.txt`` in the folded-stack format read by
+flamegraph.pl and speedscope. Other requests running on the event loop at the
+same time can show up in the event-loop part.
+"""
+import asyncio
+import contextvars
+import cProfile
+import functools
+import itertools
+import json
+import os
+import pstats
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+PROFILE_DIR = os.getenv(
+    "PROFILE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "profiles"),
+)
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+
+_NAME_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+_sequence = itertools.count(1)
+
+
+class ProfileSession:
+    """Profilers collected for one request across the threads it ran on."""
+
+    def __init__(self):
+        self.profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def add(self, profiler: cProfile.Profile):
+        with self._lock:
+            self.profilers.append(profiler)
+
+
+_session: contextvars.ContextVar[Optional[ProfileSession]] = contextvars.ContextVar("profile_session", default=None)
+
+# Only one event-loop-level profiler may be active at a time
+_loop_profiler_active = False
+
+# Admin toggle: profile the next ``remaining`` requests under ``path_prefix``
+_toggle: Dict[str, Any] = {"remaining": 0, "path_prefix": None, "expires_at": 0.0}
+_toggle_lock = threading.Lock()
+
+
+def arm_toggle(count: int, path_prefix: Optional[str], minutes: float):
+    with _toggle_lock:
+        _toggle.update(remaining=max(0, count), path_prefix=path_prefix or None, expires_at=time.time() + minutes * 60)
+
+
+def disarm_toggle():
+    with _toggle_lock:
+        _toggle.update(remaining=0, path_prefix=None, expires_at=0.0)
+
+
+def toggle_state() -> Dict[str, Any]:
+    with _toggle_lock:
+        active = _toggle["remaining"] > 0 and time.time() < _toggle["expires_at"]
+        return {
+            "enabled": active,
+            "remaining": _toggle["remaining"] if active else 0,
+            "path_prefix": _toggle["path_prefix"],
+            "expires_at": _toggle["expires_at"] if active else None,
+        }
+
+
+def _claim_toggle(path: str) -> bool:
+    with _toggle_lock:
+        if _toggle["remaining"] <= 0:
+            return False
+        if time.time() >= _toggle["expires_at"]:
+            _toggle["remaining"] = 0
+            return False
+        prefix = _toggle["path_prefix"]
+        if prefix and not path.startswith(prefix):
+            return False
+        _toggle["remaining"] -= 1
+        return True
+
+
+def profile_call(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call ``fn``; if the current request is being profiled, profile this thread's part."""
+    session = _session.get()
+    if session is None:
+        return fn(*args, **kwargs)
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already active on this thread
+        return fn(*args, **kwargs)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        profiler.disable()
+        session.add(profiler)
+
+
+def wrap_sync_endpoints(app):
+    """Route sync endpoints through ``profile_call`` (they run on threadpool threads)."""
+    from fastapi.routing import APIRoute
+
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        call = route.dependant.call
+        if asyncio.iscoroutinefunction(call) or getattr(call, "_profiled", False):
+            continue
+
+        @functools.wraps(call)
+        def wrapper(*args, __call=call, **kwargs):
+            return profile_call(__call, *args, **kwargs)
+
+        wrapper._profiled = True
+        route.dependant.call = wrapper
+
+
+# --- output -----------------------------------------------------------------
+
+def _frame_label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name.replace(";", ":")
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ":")
+
+
+def collapsed_stacks(stats: pstats.Stats, max_depth: int = 64) -> List[str]:
+    """
+    Approximate folded stacks from cProfile's caller/callee edges: each edge's
+    cumulative time is split proportionally down the call graph.
+    """
+    entries = stats.stats
+    children: Dict[tuple, List[tuple]] = defaultdict(list)
+    for callee, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            children[caller].append((callee, edge[3]))
+    roots = [func for func, entry in entries.items() if not entry[4]]
+
+    folded: Dict[str, float] = defaultdict(float)
+
+    def walk(func, scale: float, path: List[tuple]):
+        _, _, self_time, _, _ = entries[func]
+        stack = ";".join(_frame_label(f) for f in path)
+        folded[stack] += self_time * scale
+        if len(path) >= max_depth:
+            return
+        for child, edge_cumulative in children.get(func, ()):
+            child_cumulative = entries[child][3]
+            if child in path or child_cumulative <= 0:
+                continue
+            child_scale = scale * edge_cumulative / child_cumulative
+            if child_scale * child_cumulative < 1e-6:
+                continue
+            walk(child, child_scale, path + [child])
+
+    for root in roots:
+        walk(root, 1.0, [root])
+
+    return [f"{stack} {int(seconds * 1_000_000)}" for stack, seconds in sorted(folded.items()) if seconds >= 1e-6]
+
+
+def _write_profile(name: str, session: ProfileSession, meta: Dict[str, Any]):
+    stats = None
+    for profiler in session.profilers:
+        try:
+            if stats is None:
+                stats = pstats.Stats(profiler)
+            else:
+                stats.add(profiler)
+        except TypeError:
+            # Profiler recorded no calls
+            continue
+    if stats is None:
+        return
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, name)
+    stats.dump_stats(base + ".prof")
+    with open(base + ".collapsed.txt", "w", encoding="utf-8") as f:
+        f.write("\n".join(collapsed_stacks(stats)) + "\n")
+    meta["segments"] = len(session.profilers)
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    _prune()
+
+
+def _prune():
+    metas = sorted(
+        (entry for entry in os.scandir(PROFILE_DIR) if entry.name.endswith(".json")),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in metas[PROFILE_KEEP:]:
+        stem = entry.name[:-len(".json")]
+        for suffix in (".json", ".prof", ".collapsed.txt"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, stem + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(limit: int = 50) -> List[Dict[str, Any]]:
+    """Most recent profiles first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    results = []
+    for entry in os.scandir(PROFILE_DIR):
+        if not entry.name.endswith(".json"):
+            continue
+        try:
+            with open(entry.path, encoding="utf-8") as f:
+                results.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    results.sort(key=lambda meta: meta.get("created_at", 0), reverse=True)
+    return results[:limit]
+
+
+def profile_path(name: str, fmt: str) -> Optional[str]:
+    """Path of a stored profile file, or None if the name is invalid or missing."""
+    if not _NAME_RE.match(name):
+        return None
+    suffix = ".prof" if fmt == "prof" else ".collapsed.txt"
+    path = os.path.join(PROFILE_DIR, name + suffix)
+    return path if os.path.isfile(path) else None
+
+
+# --- middleware -------------------------------------------------------------
+
+def _header(scope, key: bytes) -> Optional[bytes]:
+    for name, value in scope.get("headers", ()):
+        if name == key:
+            return value
+    return None
+
+
+def _admin_username(scope) -> Optional[str]:
+    from .auth import user_from_token
+
+    authorization = _header(scope, b"authorization")
+    if not authorization or not authorization.lower().startswith(b"bearer "):
+        return None
+    user = user_from_token(authorization[7:].decode("latin-1").strip())
+    return user.username if user is not None and user.role == "admin" else None
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware running opted-in requests under cProfile."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = _header(scope, b"x-profile") in (b"1", b"true")
+        if not requested and _toggle["remaining"] <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        requested_by = await run_in_threadpool(_admin_username, scope) if requested else None
+        if requested_by is None and not _claim_toggle(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        await self._profile(scope, receive, send, requested_by or "toggle")
+
+    async def _profile(self, scope, receive, send, requested_by: str):
+        global _loop_profiler_active
+
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_")[:60] or "root"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_sequence)}-{scope['method'].lower()}-{slug}"
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"x-profile-id", name.encode())])
+            await send(message)
+
+        session = ProfileSession()
+        token = _session.set(session)
+        loop_profiler = None
+        if not _loop_profiler_active:
+            loop_profiler = cProfile.Profile()
+            try:
+                loop_profiler.enable()
+                _loop_profiler_active = True
+            except ValueError:
+                loop_profiler = None
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if loop_profiler is not None:
+                loop_profiler.disable()
+                _loop_profiler_active = False
+                session.add(loop_profiler)
+            _session.reset(token)
+            route = scope.get("route")
+            meta = {
+                "name": name,
+                "created_at": time.time(),
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None),
+                "status": status,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "requested_by": requested_by,
+                "pid": os.getpid(),
+            }
+            await run_in_threadpool(_write_profile, name, session, meta)
@@ -0,0 +1,86 @@
+"""Operational endpoints for administrators."""
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+
+from ..auth import get_current_admin_user, CachedUser
+from ..db_pool import pool_metrics
+from ..profiling import arm_toggle, disarm_toggle, list_profiles, profile_path, toggle_state
+
+router = APIRouter()
+
+
+class ProfilingToggle(BaseModel):
+    enabled: bool
+    count: int = Field(10, ge=1, le=1000)
+    path_prefix: Optional[str] = None
+    minutes: float = Field(10, gt=0, le=24 * 60)
+
+
+@router.get("/db-pool")
+def get_db_pool_metrics(
+    samples: int = Query(60, ge=0, le=720),
+    current_user: CachedUser = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """
+    Connection pool state per engine (checked out, overflow, checkout waits,
+    timeouts), the most recent samples, and the MySQL connections required by
+    the configured pool size across WEB_CONCURRENCY workers (admin only).
+    """
+    return pool_metrics(samples)
+
+
+@router.get("/worker")
+def get_worker_info(
+    request: Request,
+    current_user: CachedUser = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Process id and measured startup time of the worker serving this request (admin only)."""
+    return getattr(request.app.state, "worker", {})
+
+
+@router.get("/profiling")
+def get_profiling_toggle(current_user: CachedUser = Depends(get_current_admin_user)) -> Dict[str, Any]:
+    """State of the request profiling toggle in this worker (admin only)."""
+    return toggle_state()
+
+
+@router.post("/profiling")
+def set_profiling_toggle(
+    toggle: ProfilingToggle,
+    current_user: CachedUser = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """
+    Profile the next ``count`` requests (optionally only under ``path_prefix``)
+    within ``minutes``, or switch profiling off. The toggle is per worker process.
+    """
+    if toggle.enabled:
+        arm_toggle(toggle.count, toggle.path_prefix, toggle.minutes)
+    else:
+        disarm_toggle()
+    return toggle_state()
+
+
+@router.get("/profiles")
+def get_profiles(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: CachedUser = Depends(get_current_admin_user)
+) -> List[Dict[str, Any]]:
+    """Recently captured request profiles, newest first (admin only)."""
+    return list_profiles(limit)
+
+
+@router.get("/profiles/{name}")
+def download_profile(
+    name: str,
+    format: str = Query("prof", pattern="^(prof|collapsed)$"),
+    current_user: CachedUser = Depends(get_current_admin_user)
+):
+    """Download a profile as cProfile ``.prof`` or collapsed stacks for flamegraph tools (admin only)."""
+    path = profile_path(name, format)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "prof":
+        return FileResponse(path, media_type="application/octet-stream", filename=f"{name}.prof")
+    return FileResponse(path, media_type="text/plain", filename=f"{name}.collapsed.txt")
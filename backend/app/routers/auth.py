@@ -11,6 +11,8 @@ from ..auth import (
     get_password_hash,
     create_access_token,
     get_current_user,
+    bump_token_generation,
+    CachedUser,
 )
 
 router = APIRouter()
@@ -91,13 +93,25 @@ def login(credentials: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(
+    current_user: CachedUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """Get current authenticated user information."""
-    return current_user
+    # Authentication uses a cached snapshot; the profile needs the full row
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
 
 
 @router.post("/logout")
-def logout(current_user: User = Depends(get_current_user)):
+def logout(current_user: CachedUser = Depends(get_current_user)):
     """Logout endpoint (client should delete token)."""
+    # Drop cached token verifications so the next request is fully re-verified
+    bump_token_generation()
     return {"message": "Successfully logged out"}
 
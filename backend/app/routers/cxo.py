@@ -1,11 +1,13 @@
 """CXO user management endpoints."""
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
 
 from ..db import get_db
-from ..models import CXOUser, EmployeeUploadedFile, EmployeeUploadedRow
+from ..db_async import ReadSession, get_read_db, fetch_all, fetch_scalars, run_cpu
+from ..models import CXOUser, EmployeeDirectory, EmployeeUploadedRow
 from ..auth import get_current_user, get_current_admin_user
 
 router = APIRouter()
@@ -33,55 +35,34 @@ class EmployeeWithCXOStatus(BaseModel):
 
 
 @router.get("/", response_model=List[CXOUserResponse])
-def list_cxo_users(
-    db: Session = Depends(get_db),
+async def list_cxo_users(
+    db: ReadSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """Get list of all CXO users."""
-    cxo_users = db.query(CXOUser).order_by(CXOUser.email).all()
+    cxo_users = await fetch_scalars(db, select(CXOUser).order_by(CXOUser.email))
     return cxo_users
 
 
-@router.get("/employees", response_model=List[EmployeeWithCXOStatus])
-def list_employees_with_cxo_status(
-    employee_file_id: Optional[int] = None,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
-):
-    """Get list of all employees from employee files with their CXO status."""
-    # Get CXO emails
-    cxo_users = db.query(CXOUser).all()
-    cxo_emails = {cxo.email.lower() for cxo in cxo_users}
-    
-    # Get employee files
-    if employee_file_id:
-        employee_files = db.query(EmployeeUploadedFile).filter(EmployeeUploadedFile.id == employee_file_id).all()
-    else:
-        employee_files = db.query(EmployeeUploadedFile).order_by(EmployeeUploadedFile.uploaded_at.desc()).all()
-    
-    if not employee_files:
-        return []
-    
+def _employees_from_file(employee_rows, cxo_emails) -> List[dict]:
+    """Unique employees of one Employee List file, flagged with their CXO status."""
     # Build unique employee list
     employees_map = {}
     
-    for emp_file in employee_files:
-        emp_rows = db.query(EmployeeUploadedRow).filter(EmployeeUploadedRow.file_id == emp_file.id).all()
-        for row in emp_rows:
-            data = row.data
-            email = data.get('Email (Offical)', '').strip()
-            if not email:
-                continue
-            
-            email_lower = email.lower()
-            if email_lower not in employees_map:
-                employees_map[email_lower] = {
-                    'email': email,
-                    'name': data.get('Employee Name', '') or data.get('Name', '') or '',
-                    'function': data.get('Function', '') or '',
-                    'company': data.get('Company', '') or '',
-                    'is_cxo': email_lower in cxo_emails
-                }
+    for data in employee_rows:
+        email = data.get('Email (Offical)', '').strip()
+        if not email:
+            continue
+        
+        email_lower = email.lower()
+        if email_lower not in employees_map:
+            employees_map[email_lower] = {
+                'email': email,
+                'name': data.get('Employee Name', '') or data.get('Name', '') or '',
+                'function': data.get('Function', '') or '',
+                'company': data.get('Company', '') or '',
+                'is_cxo': email_lower in cxo_emails
+            }
     
     # Convert to list and sort by email
     employees = list(employees_map.values())
@@ -90,6 +71,45 @@ def list_employees_with_cxo_status(
     return employees
 
 
+@router.get("/employees", response_model=List[EmployeeWithCXOStatus])
+async def list_employees_with_cxo_status(
+    employee_file_id: Optional[int] = None,
+    db: ReadSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """Get list of all employees from employee files with their CXO status."""
+    if employee_file_id:
+        cxo_emails = {email.lower() for email in await fetch_scalars(db, select(CXOUser.email))}
+        employee_rows = await fetch_scalars(
+            db, select(EmployeeUploadedRow.data).where(EmployeeUploadedRow.file_id == employee_file_id)
+            .order_by(EmployeeUploadedRow.id)
+        )
+        return await run_cpu(_employees_from_file, employee_rows, cxo_emails)
+
+    # All files: the employee directory (latest upload per email) joined to the CXO list
+    stmt = (
+        select(
+            EmployeeDirectory.display_email,
+            EmployeeDirectory.name,
+            EmployeeDirectory.function,
+            EmployeeDirectory.company,
+            CXOUser.id,
+        )
+        .outerjoin(CXOUser, CXOUser.email == EmployeeDirectory.email)
+        .order_by(EmployeeDirectory.email)
+    )
+    return [
+        {
+            'email': email,
+            'name': name or '',
+            'function': function or '',
+            'company': company or '',
+            'is_cxo': cxo_id is not None,
+        }
+        for email, name, function, company, cxo_id in await fetch_all(db, stmt)
+    ]
+
+
 class MarkCXORequest(BaseModel):
     email: str
 
@@ -1,23 +1,51 @@
 """Dashboard summary endpoints for optimized loading."""
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+import gzip
+from typing import Optional
 
-from ..db import get_db
-from ..services.dashboard_summary import get_dashboard_summary
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, Query
+from fastapi.responses import Response
+from sqlalchemy import select
+
+from ..db_async import ReadSession, get_read_db, fetch_all, fetch_scalars, run_cpu
+from ..models import DashboardSnapshot, UploadedRow
+from ..services.dashboard_summary import summarize_dashboard
+from ..services.dashboard_snapshot import refresh_snapshots
+from ..services.dataset_version import ATTENDANCE, version_stmt
 from ..auth import get_current_user
 
 router = APIRouter()
 
 
 @router.get("/summary")
-def get_dashboard_summary_endpoint(
+async def get_dashboard_summary_endpoint(
+    background_tasks: BackgroundTasks,
     group_by: str = Query("function", regex="^(function|company|location)$"),
-    db: Session = Depends(get_db),
+    accept_encoding: Optional[str] = Header(None),
+    db: ReadSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """
     Get pre-aggregated dashboard data for faster loading.
     Returns summary stats and organized data by group.
+    Served from the stored snapshot while it matches the current attendance
+    data; otherwise computed live and a snapshot refresh is scheduled.
     """
-    return get_dashboard_summary(db, group_by)
+    snapshot = await fetch_all(db, select(
+        DashboardSnapshot.version,
+        DashboardSnapshot.payload,
+        version_stmt(ATTENDANCE).scalar_subquery(),
+    ).where(DashboardSnapshot.group_by == group_by))
+    if snapshot:
+        version, payload, current = snapshot[0]
+        if version == (current or 0):
+            if accept_encoding and "gzip" in accept_encoding.lower():
+                return Response(
+                    payload, media_type="application/json",
+                    headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+                )
+            return Response(gzip.decompress(payload), media_type="application/json")
 
+    # Cold start or stale snapshot
+    background_tasks.add_task(refresh_snapshots, [group_by])
+    rows = await fetch_scalars(db, select(UploadedRow.data))
+    return await run_cpu(summarize_dashboard, rows, group_by)
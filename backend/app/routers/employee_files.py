@@ -6,6 +6,8 @@ from sqlalchemy import func
 
 from ..db import get_db
 from ..models import EmployeeUploadedFile, EmployeeUploadedRow
+from ..services.dataset_version import EMPLOYEE, bump_version
+from ..services.employee_directory import remove_files
 from ..schemas import UploadedFileListItem, UploadedFileDetail, DeleteRequest, DeleteResponse
 from ..auth import get_current_user
 
@@ -71,12 +73,17 @@ def delete_employee_files(
     current_user = Depends(get_current_user)
 ):
     """Delete one or more Employee List files."""
+    # Fall back to older uploads in the employee directory in the same transaction
+    remove_files(db, request.file_ids)
+
     deleted_count = 0
     for file_id in request.file_ids:
         file = db.query(EmployeeUploadedFile).filter(EmployeeUploadedFile.id == file_id).first()
         if file:
             db.delete(file)
             deleted_count += 1
+    if deleted_count:
+        bump_version(db, EMPLOYEE)
     db.commit()
     return {"deleted_count": deleted_count}
 
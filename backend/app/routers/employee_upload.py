@@ -1,11 +1,15 @@
 """Employee List file upload endpoint."""
+import time
 from typing import List
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from ..db import get_db
+from ..metrics import record_upload
 from ..models import EmployeeUploadedFile, EmployeeUploadedRow
 from ..schemas import UploadResponseItem
+from ..services.dataset_version import EMPLOYEE, bump_version
+from ..services.employee_directory import apply_file
 from ..services.parser import read_file_preserve_text
 from ..auth import get_current_user
 
@@ -22,6 +26,7 @@ async def upload_employee_files(
     results = []
     
     for uploaded_file in files:
+        started = time.perf_counter()
         try:
             # Read file content
             file_bytes = await uploaded_file.read()
@@ -44,9 +49,14 @@ async def upload_employee_files(
                     data=row_dict
                 )
                 db.add(db_row)
+
+            # The newest upload wins in the employee directory
+            apply_file(db, db_file.id, rows_data)
+            bump_version(db, EMPLOYEE)
             
             db.commit()
             db.refresh(db_file)
+            record_upload("employee", len(file_bytes), len(rows_data), time.perf_counter() - started)
             
             results.append(
                 UploadResponseItem(
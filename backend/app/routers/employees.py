@@ -0,0 +1,49 @@
+"""Per-employee attendance drilldown."""
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+
+from ..db_async import ReadSession, get_read_db, fetch_all, run_cpu
+from ..models import AttendanceFact, UploadedRow
+from ..services.employee_attendance import summarize_employee
+from ..auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/{employee_code}/attendance")
+async def get_employee_attendance(
+    employee_code: str,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    db: ReadSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    One employee's attendance day by day (flag, in/out, worked hours,
+    lateness) between ``from`` and ``to`` (YYYY-MM-DD, inclusive), and what
+    each month adds to the KPIs. Served from idx_attendance_fact_employee_date;
+    without a range, rows whose date could not be parsed are listed first.
+    """
+    if from_date and to_date and from_date > to_date:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+
+    code = employee_code.strip()
+    stmt = (
+        select(AttendanceFact.attendance_date, AttendanceFact.file_id, UploadedRow.data)
+        .join(UploadedRow, UploadedRow.id == AttendanceFact.row_id)
+        .where(AttendanceFact.employee_code == code)
+        .order_by(AttendanceFact.attendance_date, AttendanceFact.row_id)
+    )
+    if from_date:
+        stmt = stmt.where(AttendanceFact.attendance_date >= from_date)
+    if to_date:
+        stmt = stmt.where(AttendanceFact.attendance_date <= to_date)
+
+    rows = await fetch_all(db, stmt)
+    result = await run_cpu(summarize_employee, code, [tuple(row) for row in rows])
+    result["from"] = from_date
+    result["to"] = to_date
+    return result
@@ -0,0 +1,61 @@
+"""Server-sent events: data-version changes."""
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from ..auth import user_from_token
+from ..events import broadcaster, publish_current
+
+router = APIRouter()
+
+# Comment line sent when idle so proxies keep the connection open
+KEEPALIVE_SECONDS = 15
+
+
+async def _event_stream():
+    queue = broadcaster.subscribe()
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                dataset, version = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            data = json.dumps({"dataset": dataset, "version": version})
+            yield f"event: version\ndata: {data}\n\n"
+    finally:
+        broadcaster.unsubscribe(queue)
+
+
+@router.get("")
+async def stream_events(
+    token: Optional[str] = Query(None),
+    authorization: Optional[str] = Header(None),
+):
+    """
+    ``version`` events with ``{"dataset": ..., "version": ...}`` whenever
+    attendance, teams, teams_app or employee data or the KPI tables change.
+    The current version of every dataset is sent first, so a client can tell
+    what changed while it was disconnected.
+
+    EventSource cannot set headers: pass the access token as ``?token=``
+    (an ``Authorization: Bearer`` header works too).
+    """
+    if not token and authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    user = await run_in_threadpool(user_from_token, token) if token else None
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+
+    # Catch up on changes committed by other workers before the stream is primed
+    await publish_current()
+    return StreamingResponse(
+        _event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,11 +1,17 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, select, delete
 
-from ..db import get_db
+from ..auth import get_current_user
+from ..db import SessionLocal, get_db
 from ..models import UploadedFile, UploadedRow
 from ..schemas import UploadedFileListItem, UploadedFileDetail, DeleteRequest, DeleteResponse
+from ..services.columnar_export import ATTENDANCE_EXPORT_COLUMNS, CHUNK_ROWS, gzip_stream, iter_columnar_json
+from ..services.dashboard_snapshot import refresh_snapshots
+from ..services.dataset_version import ATTENDANCE, bump_version
+from ..services.kpi_incremental import remove_files
 
 
 router = APIRouter()
@@ -36,6 +42,41 @@ def list_files(db: Session = Depends(get_db)):
     ]
 
 
+def _attendance_export_rows():
+    """KPI-relevant columns of every uploaded attendance row, streamed from the database."""
+    # Own session: the response body is produced after the request's dependencies are closed
+    db = SessionLocal()
+    try:
+        stmt = (
+            select(*[UploadedRow.data[column].as_string() for column in ATTENDANCE_EXPORT_COLUMNS])
+            .order_by(UploadedRow.id)
+            .execution_options(yield_per=CHUNK_ROWS)
+        )
+        for row in db.execute(stmt):
+            yield tuple(row)
+    finally:
+        db.close()
+
+
+@router.get("/export/attendance")
+def export_attendance(
+    accept_encoding: Optional[str] = Header(None),
+    current_user = Depends(get_current_user)
+):
+    """
+    All uploaded attendance rows, only the columns the client-side KPI
+    fallback needs, as dictionary-encoded columnar JSON (see
+    services/columnar_export.py), gzip-compressed when the client accepts it.
+    """
+    body = iter_columnar_json(_attendance_export_rows(), ATTENDANCE_EXPORT_COLUMNS)
+    if accept_encoding and "gzip" in accept_encoding.lower():
+        return StreamingResponse(
+            gzip_stream(body), media_type="application/json",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+    return StreamingResponse((piece.encode("utf-8") for piece in body), media_type="application/json")
+
+
 @router.get("/{file_id}", response_model=UploadedFileDetail)
 def get_file_detail(file_id: int, db: Session = Depends(get_db)):
     file_rec: UploadedFile | None = db.get(UploadedFile, file_id)
@@ -54,7 +95,7 @@ def get_file_detail(file_id: int, db: Session = Depends(get_db)):
 
 
 @router.delete("/", response_model=DeleteResponse)
-def delete_files(payload: DeleteRequest, db: Session = Depends(get_db)):
+def delete_files(payload: DeleteRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     if not payload.file_ids:
         return DeleteResponse(deleted_count=0)
 
@@ -63,12 +104,17 @@ def delete_files(payload: DeleteRequest, db: Session = Depends(get_db)):
     if not existing:
         return DeleteResponse(deleted_count=0)
 
+    # Subtract the files from the KPI rollups in the same transaction
+    remove_files(db, existing)
+
     # Deleting via ORM will respect cascade
     for fid in existing:
         obj = db.get(UploadedFile, fid)
         if obj:
             db.delete(obj)
+    bump_version(db, ATTENDANCE)
     db.commit()
+    background_tasks.add_task(refresh_snapshots)
     return DeleteResponse(deleted_count=len(existing))
 
 
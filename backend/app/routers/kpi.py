@@ -1,10 +1,13 @@
 from typing import List, Literal, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from ..db import get_db
-from ..services.kpi import compute_on_time_stats, rebuild_kpi_tables
-from ..models import FunctionKPI, CompanyKPI, LocationKPI
+from ..db_async import ReadSession, get_read_db, fetch_scalars, run_cpu
+from ..services.kpi import aggregate_on_time_stats, rebuild_kpi_tables
+from ..services.kpi_incremental import get_rollup
+from ..models import UploadedRow, FunctionKPI, CompanyKPI, LocationKPI
 from ..models_kpi import OnTimeKPI, WorkHourKPI, WorkHourLostKPI, LeaveAnalysisKPI
 
 
@@ -15,14 +18,15 @@ router = APIRouter()
 @router.get("/on_time/{group_by}/")
 @router.get("/on-time/{group_by}")
 @router.get("/on-time/{group_by}/")
-def on_time(
+async def on_time(
     group_by: Literal["function", "company", "location"],
-    db: Session = Depends(get_db),
+    db: ReadSession = Depends(get_read_db),
 ) -> List[Dict[str, Any]]:
     # Always use on-the-fly calculation for accurate unique member counting
     # Pre-calculated tables store per-file data, but we need accurate aggregation
     # across all files for the same month/group combination
-    return compute_on_time_stats(db, group_by)
+    rows = await fetch_scalars(db, select(UploadedRow.data))
+    return await run_cpu(aggregate_on_time_stats, rows, group_by)
 
 
 @router.post("/rebuild")
@@ -34,13 +38,27 @@ def rebuild(db: Session = Depends(get_db)):
 # Simple, on-the-fly computation (no persistence) for immediate results
 @router.get("/simple/{group_by}")
 @router.get("/simple/{group_by}/")
-def on_time_simple(
+async def on_time_simple(
     group_by: Literal["function", "company", "location"],
-    db: Session = Depends(get_db),
+    db: ReadSession = Depends(get_read_db),
 ) -> List[Dict[str, Any]]:
+    rows = await fetch_scalars(db, select(UploadedRow.data))
     try:
-        return compute_on_time_stats(db, group_by)
+        return await run_cpu(aggregate_on_time_stats, rows, group_by)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+# Cross-file rollups maintained incrementally on upload/delete (no row scan)
+@router.get("/rollup/{kind}/{group_by}")
+@router.get("/rollup/{kind}/{group_by}/")
+def kpi_rollup(
+    kind: Literal["on_time", "work_hour", "work_hour_lost", "leave_analysis"],
+    group_by: Literal["function", "company", "location"],
+    db: Session = Depends(get_db),
+) -> List[Dict[str, Any]]:
+    try:
+        return get_rollup(db, kind, group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
@@ -1,11 +1,11 @@
 """Endpoint to rebuild KPIs for all existing files."""
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends
 from sqlalchemy.orm import Session
 
 from ..db import get_db
-from ..models import UploadedFile
-from ..services.kpi_calculator import calculate_kpis_for_file
-from ..models_kpi import OnTimeKPI, WorkHourKPI, WorkHourLostKPI, LeaveAnalysisKPI
+from ..services.kpi_calculator import rebuild_all_file_kpis
+from ..services.dashboard_snapshot import refresh_snapshots
+from ..services.dataset_version import ATTENDANCE, KPI, bump_version
 from ..auth import get_current_user
 
 router = APIRouter()
@@ -13,36 +13,27 @@ router = APIRouter()
 
 @router.post("/rebuild-all")
 def rebuild_all_kpis(
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """
     Rebuild KPIs for all existing uploaded files.
     Use this to populate pre-calculated tables for existing data.
+    The new KPIs are built in shadow tables and swapped in atomically,
+    so dashboards never see empty or partial KPI tables meanwhile.
     """
-    # Clear existing KPI data
-    db.query(OnTimeKPI).delete()
-    db.query(WorkHourKPI).delete()
-    db.query(WorkHourLostKPI).delete()
-    db.query(LeaveAnalysisKPI).delete()
+    total_files, calculated_count = rebuild_all_file_kpis(db)
+
+    # Stored dashboard summaries are recomputed too
+    bump_version(db, ATTENDANCE)
+    bump_version(db, KPI)
     db.commit()
-    
-    # Get all uploaded files
-    files = db.query(UploadedFile).all()
-    
-    calculated_count = 0
-    for file in files:
-        try:
-            calculate_kpis_for_file(db, file.id)
-            calculated_count += 1
-        except Exception as e:
-            print(f"Error calculating KPIs for file {file.id}: {e}")
-            continue
+    background_tasks.add_task(refresh_snapshots)
     
     return {
         "status": "success",
-        "total_files": len(files),
+        "total_files": total_files,
         "calculated": calculated_count,
-        "message": f"Successfully calculated KPIs for {calculated_count} out of {len(files)} files"
+        "message": f"Successfully calculated KPIs for {calculated_count} out of {total_files} files"
     }
-
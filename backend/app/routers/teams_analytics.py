@@ -1,480 +1,249 @@
 """MS Teams analytics endpoints for dashboard charts."""
+from collections import defaultdict
 from typing import List, Optional
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
 
-from ..db import get_db
-from ..models import TeamsUploadedFile, TeamsUploadedRow, EmployeeUploadedFile, EmployeeUploadedRow, CXOUser
+from ..db_async import ReadSession, get_read_db, fetch_all, run_cpu
+from ..models import TeamsActivityFact, TeamsUploadedFile, EmployeeDirectory, EmployeeUploadedRow, CXOUser
+from ..services.teams_activity import TEAMS_METRICS, metric_columns
 from ..auth import get_current_user
 
 router = APIRouter()
 
+def _teams_files_stmt(file_id: Optional[int]):
+    """Selected Teams file, or all Teams files newest first."""
+    stmt = select(
+        TeamsUploadedFile.id, TeamsUploadedFile.filename,
+        TeamsUploadedFile.from_month, TeamsUploadedFile.to_month,
+    )
+    if file_id:
+        return stmt.where(TeamsUploadedFile.id == file_id)
+    return stmt.order_by(TeamsUploadedFile.uploaded_at.desc())
+
+
+def _metrics(values) -> dict:
+    """Metric name -> count for the metric columns of one fact row."""
+    return {name: value for (name, _, _), value in zip(TEAMS_METRICS, values)}
+
+
+def _month_range(file) -> str:
+    if file.from_month and file.to_month:
+        return f"{file.from_month} to {file.to_month}"
+    return file.from_month or file.to_month or 'N/A'
+
+
+def _activity_stmt(file_ids: List[int]):
+    """Typed activity facts of the given files in upload order, in one query."""
+    return (
+        select(TeamsActivityFact.file_id, TeamsActivityFact.user_principal_name, *metric_columns())
+        .where(TeamsActivityFact.file_id.in_(file_ids))
+        .order_by(TeamsActivityFact.id)
+    )
+
+
+def _rows_by_file(rows) -> dict:
+    """Group activity rows as file_id -> [(key, metric values)]."""
+    rows_by_file = defaultdict(list)
+    for file_id, key, *values in rows:
+        rows_by_file[file_id].append((key, values))
+    return rows_by_file
+
+
+def _user_records(files, rows) -> List[dict]:
+    """Per-user activity records for every selected file, newest file first."""
+    rows_by_file = _rows_by_file(rows)
+    result = []
+    for file in files:
+        file_info = {
+            'file_id': file.id,
+            'filename': file.filename,
+            'from_month': file.from_month,
+            'to_month': file.to_month,
+            'month_range': _month_range(file),
+        }
+        for upn, values in rows_by_file.get(file.id, []):
+            user = upn if upn is not None else 'Unknown'
+            result.append({**file_info, 'user': user, **_metrics(values)})
+    return result
+
 
 @router.get("/user-activity")
-def get_user_activity(
+async def get_user_activity(
     file_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    db: ReadSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """
     Get user-wise activity data from uploaded files.
     Returns activity metrics for each user.
     """
-    # Get files
-    if file_id:
-        files = db.query(TeamsUploadedFile).filter(TeamsUploadedFile.id == file_id).all()
-    else:
-        files = db.query(TeamsUploadedFile).order_by(TeamsUploadedFile.uploaded_at.desc()).all()
-    
+    files = await fetch_all(db, _teams_files_stmt(file_id))
     if not files:
         return []
-    
-    result = []
-    
-    for file in files:
-        # Get all rows for this file
-        rows = db.query(TeamsUploadedRow).filter(TeamsUploadedRow.file_id == file.id).all()
-        
-        for row in rows:
-            data = row.data
-            
-            # Extract user email from User Principal Name
-            user_email = data.get('User Principal Name', 'Unknown')
-            
-            # Create user activity record
-            user_activity = {
-                'file_id': file.id,
-                'filename': file.filename,
-                'from_month': file.from_month,
-                'to_month': file.to_month,
-                'month_range': f"{file.from_month} to {file.to_month}" if file.from_month and file.to_month else file.from_month or file.to_month or 'N/A',
-                'user': user_email,
-                'Team Chat': 0,
-                'Private Chat': 0,
-                'Calls': 0,
-                'Meetings Org': 0,
-                'Meetings Att': 0,
-                'One-time Org': 0,
-                'One-time Att': 0,
-                'Recurring Org': 0,
-                'Recurring Att': 0,
-                'Post Messages': 0,
-            }
-            
-            # Extract metrics (convert to int, default to 0)
-            try:
-                user_activity['Team Chat'] = int(data.get('Team Chat Message Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['Private Chat'] = int(data.get('Private Chat Message Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['Calls'] = int(data.get('Call Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['Meetings Org'] = int(data.get('Meetings Organized Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['Meetings Att'] = int(data.get('Meetings Attended Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['One-time Org'] = int(data.get('Scheduled One-time Meetings Organized Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['One-time Att'] = int(data.get('Scheduled One-time Meetings Attended Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['Recurring Org'] = int(data.get('Scheduled Recurring Meetings Organized Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['Recurring Att'] = int(data.get('Scheduled Recurring Meetings Attended Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['Post Messages'] = int(data.get('Post Messages', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            result.append(user_activity)
-        
-        return result
+
+    rows = await fetch_all(db, _activity_stmt([f.id for f in files]))
+    return await run_cpu(_user_records, files, rows)
+
+
+def _cube_stmt(teams_file_id: Optional[int]):
+    """
+    SUM of the activity facts per (function, company) of the employee
+    directory: the finest grain of the cube, in one GROUP BY.
+    """
+    function = func.coalesce(EmployeeDirectory.function, 'Unknown')
+    company = func.coalesce(EmployeeDirectory.company, 'Unknown')
+    stmt = (
+        select(function, company, *[func.sum(column) for column in metric_columns()])
+        .select_from(TeamsActivityFact)
+        .join(EmployeeDirectory, EmployeeDirectory.email == TeamsActivityFact.email)
+        .group_by(function, company)
+    )
+    if teams_file_id:
+        stmt = stmt.where(TeamsActivityFact.file_id == teams_file_id)
+    return stmt
+
+
+def _employee_file_stmt(employee_file_id: int):
+    """Email, function and company of one Employee List file's rows."""
+    return (
+        select(
+            EmployeeUploadedRow.data['Email (Offical)'].as_string(),
+            EmployeeUploadedRow.data['Function'].as_string(),
+            EmployeeUploadedRow.data['Company'].as_string(),
+        )
+        .where(EmployeeUploadedRow.file_id == employee_file_id)
+        .order_by(EmployeeUploadedRow.id)
+    )
+
+
+def _sum_by_employee_file(fact_rows, employee_rows) -> List[tuple]:
+    """(function, company, *sums) of the facts matched to one Employee List file on the normalized email."""
+    email_to_group = {}
+    for email, function, company in employee_rows:
+        email = (email or '').strip().lower()
+        if email:
+            email_to_group[email] = (
+                function if function is not None else 'Unknown',
+                company if company is not None else 'Unknown',
+            )
+
+    totals = {}
+    for email, *values in fact_rows:
+        group = email_to_group.get(email)
+        if group is None:
+            continue
+        sums = totals.setdefault(group, [0] * len(values))
+        for i, value in enumerate(values):
+            sums[i] += value
+    return [(*group, *sums) for group, sums in totals.items()]
+
+
+def _rollup(cells) -> dict:
+    """Function, company and (function, company) rollups of the cube cells."""
+    levels = {'function': ('function',), 'company': ('company',), 'function_company': ('function', 'company')}
+    cube = {}
+    for level, keys in levels.items():
+        totals = {}
+        for function, company, *values in cells:
+            group = {'function': function, 'company': company}
+            key = tuple(group[k] for k in keys)
+            sums = totals.setdefault(key, [0] * len(values))
+            for i, value in enumerate(values):
+                # SUM() comes back as Decimal on MySQL
+                sums[i] += int(value or 0)
+        cube[level] = [
+            {**dict(zip(keys, key)), **_metrics(totals[key])}
+            for key in sorted(totals)
+        ]
+    return cube
+
+
+async def _activity_cube(db: ReadSession, teams_file_id: Optional[int], employee_file_id: Optional[int]) -> dict:
+    """
+    Teams activity per function, per company and per (function, company).
+    Without an employee file the facts are summed in SQL per employee
+    directory group (latest upload per email); a specific employee file is
+    matched against its own rows.
+    """
+    if employee_file_id:
+        employee_rows = await fetch_all(db, _employee_file_stmt(employee_file_id))
+        if not employee_rows:
+            return _rollup([])
+        stmt = select(TeamsActivityFact.email, *metric_columns())
+        if teams_file_id:
+            stmt = stmt.where(TeamsActivityFact.file_id == teams_file_id)
+        fact_rows = await fetch_all(db, stmt)
+        cells = await run_cpu(_sum_by_employee_file, fact_rows, employee_rows)
+    else:
+        cells = await fetch_all(db, _cube_stmt(teams_file_id))
+    return _rollup(cells)
+
+
+@router.get("/activity-cube")
+async def get_activity_cube(
+    teams_file_id: Optional[int] = Query(None),
+    employee_file_id: Optional[int] = Query(None),
+    db: ReadSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Get Teams activity rolled up by function, by company and by
+    (function, company) in one response, from a single aggregation.
+    Matches User Principal Name (Teams) with Email (Official) (Employee).
+    """
+    return await _activity_cube(db, teams_file_id, employee_file_id)
 
 
 @router.get("/function-activity")
-def get_function_activity(
+async def get_function_activity(
     teams_file_id: Optional[int] = Query(None),
     employee_file_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    db: ReadSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """
     Get Function-wise activity data by matching Teams data with Employee data.
     Matches User Principal Name (Teams) with Email (Official) (Employee).
     """
-    # Get Teams files
-    if teams_file_id:
-        teams_files = db.query(TeamsUploadedFile).filter(TeamsUploadedFile.id == teams_file_id).all()
-    else:
-        teams_files = db.query(TeamsUploadedFile).order_by(TeamsUploadedFile.uploaded_at.desc()).all()
-    
-    # Get Employee files
-    if employee_file_id:
-        employee_files = db.query(EmployeeUploadedFile).filter(EmployeeUploadedFile.id == employee_file_id).all()
-    else:
-        employee_files = db.query(EmployeeUploadedFile).order_by(EmployeeUploadedFile.uploaded_at.desc()).all()
-    
-    if not teams_files or not employee_files:
-        return []
-    
-    # Build email to employee data mapping
-    email_to_employee = {}
-    for emp_file in employee_files:
-        emp_rows = db.query(EmployeeUploadedRow).filter(EmployeeUploadedRow.file_id == emp_file.id).all()
-        for row in emp_rows:
-            data = row.data
-            email = data.get('Email (Offical)', '').strip().lower()
-            if email:
-                email_to_employee[email] = {
-                    'function': data.get('Function', 'Unknown'),
-                    'company': data.get('Company', 'Unknown')
-                }
-    
-    # Aggregate by Function
-    function_data = {}
-    
-    for teams_file in teams_files:
-        teams_rows = db.query(TeamsUploadedRow).filter(TeamsUploadedRow.file_id == teams_file.id).all()
-        
-        for row in teams_rows:
-            data = row.data
-            user_email = data.get('User Principal Name', '').strip().lower()
-            
-            # Match with employee data
-            if user_email in email_to_employee:
-                function = email_to_employee[user_email]['function']
-                
-                if function not in function_data:
-                    function_data[function] = {
-                        'function': function,
-                        'Team Chat': 0,
-                        'Private Chat': 0,
-                        'Calls': 0,
-                        'Meetings Org': 0,
-                        'Meetings Att': 0,
-                        'One-time Org': 0,
-                        'One-time Att': 0,
-                        'Recurring Org': 0,
-                        'Recurring Att': 0,
-                        'Post Messages': 0,
-                    }
-                
-                # Aggregate activities
-                try:
-                    function_data[function]['Team Chat'] += int(data.get('Team Chat Message Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    function_data[function]['Private Chat'] += int(data.get('Private Chat Message Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    function_data[function]['Calls'] += int(data.get('Call Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    function_data[function]['Meetings Org'] += int(data.get('Meetings Organized Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    function_data[function]['Meetings Att'] += int(data.get('Meetings Attended Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    function_data[function]['One-time Org'] += int(data.get('Scheduled One-time Meetings Organized Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    function_data[function]['One-time Att'] += int(data.get('Scheduled One-time Meetings Attended Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    function_data[function]['Recurring Org'] += int(data.get('Scheduled Recurring Meetings Organized Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    function_data[function]['Recurring Att'] += int(data.get('Scheduled Recurring Meetings Attended Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    function_data[function]['Post Messages'] += int(data.get('Post Messages', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-    
-    return list(function_data.values())
+    return (await _activity_cube(db, teams_file_id, employee_file_id))['function']
 
 
 @router.get("/company-activity")
-def get_company_activity(
+async def get_company_activity(
     teams_file_id: Optional[int] = Query(None),
     employee_file_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    db: ReadSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """
     Get Company-wise activity data by matching Teams data with Employee data.
     Matches User Principal Name (Teams) with Email (Official) (Employee).
     """
-    # Get Teams files
-    if teams_file_id:
-        teams_files = db.query(TeamsUploadedFile).filter(TeamsUploadedFile.id == teams_file_id).all()
-    else:
-        teams_files = db.query(TeamsUploadedFile).order_by(TeamsUploadedFile.uploaded_at.desc()).all()
-    
-    # Get Employee files
-    if employee_file_id:
-        employee_files = db.query(EmployeeUploadedFile).filter(EmployeeUploadedFile.id == employee_file_id).all()
-    else:
-        employee_files = db.query(EmployeeUploadedFile).order_by(EmployeeUploadedFile.uploaded_at.desc()).all()
-    
-    if not teams_files or not employee_files:
-        return []
-    
-    # Build email to employee data mapping
-    email_to_employee = {}
-    for emp_file in employee_files:
-        emp_rows = db.query(EmployeeUploadedRow).filter(EmployeeUploadedRow.file_id == emp_file.id).all()
-        for row in emp_rows:
-            data = row.data
-            email = data.get('Email (Offical)', '').strip().lower()
-            if email:
-                email_to_employee[email] = {
-                    'function': data.get('Function', 'Unknown'),
-                    'company': data.get('Company', 'Unknown')
-                }
-    
-    # Aggregate by Company
-    company_data = {}
-    
-    for teams_file in teams_files:
-        teams_rows = db.query(TeamsUploadedRow).filter(TeamsUploadedRow.file_id == teams_file.id).all()
-        
-        for row in teams_rows:
-            data = row.data
-            user_email = data.get('User Principal Name', '').strip().lower()
-            
-            # Match with employee data
-            if user_email in email_to_employee:
-                company = email_to_employee[user_email]['company']
-                
-                if company not in company_data:
-                    company_data[company] = {
-                        'company': company,
-                        'Team Chat': 0,
-                        'Private Chat': 0,
-                        'Calls': 0,
-                        'Meetings Org': 0,
-                        'Meetings Att': 0,
-                        'One-time Org': 0,
-                        'One-time Att': 0,
-                        'Recurring Org': 0,
-                        'Recurring Att': 0,
-                        'Post Messages': 0,
-                    }
-                
-                # Aggregate activities
-                try:
-                    company_data[company]['Team Chat'] += int(data.get('Team Chat Message Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    company_data[company]['Private Chat'] += int(data.get('Private Chat Message Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    company_data[company]['Calls'] += int(data.get('Call Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    company_data[company]['Meetings Org'] += int(data.get('Meetings Organized Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    company_data[company]['Meetings Att'] += int(data.get('Meetings Attended Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    company_data[company]['One-time Org'] += int(data.get('Scheduled One-time Meetings Organized Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    company_data[company]['One-time Att'] += int(data.get('Scheduled One-time Meetings Attended Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    company_data[company]['Recurring Org'] += int(data.get('Scheduled Recurring Meetings Organized Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    company_data[company]['Recurring Att'] += int(data.get('Scheduled Recurring Meetings Attended Count', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-                
-                try:
-                    company_data[company]['Post Messages'] += int(data.get('Post Messages', 0) or 0)
-                except (ValueError, TypeError):
-                    pass
-    
-    return list(company_data.values())
+    return (await _activity_cube(db, teams_file_id, employee_file_id))['company']
 
 
 @router.get("/cxo-activity")
-def get_cxo_activity(
+async def get_cxo_activity(
     file_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    db: ReadSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """
     Get CXO user activity data from uploaded files.
     Only returns activity for users marked as CXO.
     """
-    # Get list of CXO emails
-    cxo_users = db.query(CXOUser).all()
-    cxo_emails = {cxo.email.lower() for cxo in cxo_users}
-    
-    if not cxo_emails:
-        return []
-    
-    # Get files
-    if file_id:
-        files = db.query(TeamsUploadedFile).filter(TeamsUploadedFile.id == file_id).all()
-    else:
-        files = db.query(TeamsUploadedFile).order_by(TeamsUploadedFile.uploaded_at.desc()).all()
-    
+    files = await fetch_all(db, _teams_files_stmt(file_id))
     if not files:
         return []
-    
-    result = []
-    
-    for file in files:
-        # Get all rows for this file
-        rows = db.query(TeamsUploadedRow).filter(TeamsUploadedRow.file_id == file.id).all()
-        
-        for row in rows:
-            data = row.data
-            
-            # Extract user email from User Principal Name
-            user_email = data.get('User Principal Name', 'Unknown').strip().lower()
-            
-            # Only include if user is a CXO
-            if user_email not in cxo_emails:
-                continue
-            
-            # Create user activity record
-            user_activity = {
-                'file_id': file.id,
-                'filename': file.filename,
-                'from_month': file.from_month,
-                'to_month': file.to_month,
-                'month_range': f"{file.from_month} to {file.to_month}" if file.from_month and file.to_month else file.from_month or file.to_month or 'N/A',
-                'user': user_email,
-                'Team Chat': 0,
-                'Private Chat': 0,
-                'Calls': 0,
-                'Meetings Org': 0,
-                'Meetings Att': 0,
-                'One-time Org': 0,
-                'One-time Att': 0,
-                'Recurring Org': 0,
-                'Recurring Att': 0,
-                'Post Messages': 0,
-            }
-            
-            # Extract metrics (convert to int, default to 0)
-            try:
-                user_activity['Team Chat'] = int(data.get('Team Chat Message Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['Private Chat'] = int(data.get('Private Chat Message Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['Calls'] = int(data.get('Call Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['Meetings Org'] = int(data.get('Meetings Organized Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['Meetings Att'] = int(data.get('Meetings Attended Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['One-time Org'] = int(data.get('Scheduled One-time Meetings Organized Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['One-time Att'] = int(data.get('Scheduled One-time Meetings Attended Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['Recurring Org'] = int(data.get('Scheduled Recurring Meetings Organized Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['Recurring Att'] = int(data.get('Scheduled Recurring Meetings Attended Count', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_activity['Post Messages'] = int(data.get('Post Messages', 0) or 0)
-            except (ValueError, TypeError):
-                pass
-            
-            result.append(user_activity)
-        
-        return result
 
+    # Indexed join of cxo_users.email against the normalized fact email
+    # (idx_teams_fact_email_file): cost follows the CXO count, not all Teams rows
+    stmt = (
+        select(TeamsActivityFact.file_id, TeamsActivityFact.email, *metric_columns())
+        .join(CXOUser, CXOUser.email == TeamsActivityFact.email)
+        .where(TeamsActivityFact.file_id.in_([f.id for f in files]))
+        .order_by(TeamsActivityFact.id)
+    )
+    rows = await fetch_all(db, stmt)
+    return await run_cpu(_user_records, files, rows)
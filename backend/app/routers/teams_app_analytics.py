@@ -1,70 +1,87 @@
 """Teams App Usage analytics endpoints."""
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import func, select
 
-from ..db import get_db
-from ..models import TeamsAppUploadedFile, TeamsAppUploadedRow
+from ..db_async import ReadSession, get_read_db, fetch_all
+from ..models import TeamsAppUploadedFile, TeamsAppUsageFact
 from ..auth import get_current_user
 
 router = APIRouter()
 
 
+def _file_filter(stmt, file_id: Optional[int], from_month: Optional[str], to_month: Optional[str]):
+    """Restrict facts to one file, or to files whose period overlaps from_month..to_month (YYYY-MM)."""
+    if file_id:
+        return stmt.where(TeamsAppUsageFact.file_id == file_id)
+    if from_month or to_month:
+        file_start = func.coalesce(TeamsAppUploadedFile.from_month, TeamsAppUploadedFile.to_month)
+        file_end = func.coalesce(TeamsAppUploadedFile.to_month, TeamsAppUploadedFile.from_month)
+        files = select(TeamsAppUploadedFile.id).where(file_start.is_not(None))
+        if from_month:
+            files = files.where(file_end >= from_month)
+        if to_month:
+            files = files.where(file_start <= to_month)
+        stmt = stmt.where(TeamsAppUsageFact.file_id.in_(files))
+    return stmt
+
+
 @router.get("/app-activity")
-def get_app_activity(
+async def get_app_activity(
+    response: Response,
     file_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    from_month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    to_month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    app_name: Optional[List[str]] = Query(None),
+    sort: str = Query("users_using_app", pattern="^(users_using_app|team_using_app|app_name)$"),
+    order: Optional[str] = Query(None, pattern="^(asc|desc)$"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: ReadSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """
-    Get Teams App activity data.
+    Get Teams App activity data, summed per app across the selected files.
     Returns: App Name, Team Using App, Users Using App
+
+    Without a file_id, all files are used, or those whose period overlaps
+    from_month..to_month. Sorted by `sort` (counts descending, names ascending
+    unless `order` is given) and paged with limit/offset; the number of apps
+    before paging is returned in the X-Total-Count header.
     """
-    # Get files
-    if file_id:
-        files = db.query(TeamsAppUploadedFile).filter(TeamsAppUploadedFile.id == file_id).all()
+    team_using_app = func.sum(TeamsAppUsageFact.team_using_app).label("team_using_app")
+    users_using_app = func.sum(TeamsAppUsageFact.users_using_app).label("users_using_app")
+    stmt = _file_filter(
+        select(TeamsAppUsageFact.app_name, team_using_app, users_using_app),
+        file_id, from_month, to_month,
+    )
+    if app_name:
+        stmt = stmt.where(TeamsAppUsageFact.app_name.in_(app_name))
+    stmt = stmt.group_by(TeamsAppUsageFact.app_name)
+
+    sort_column = {
+        "users_using_app": users_using_app,
+        "team_using_app": team_using_app,
+        "app_name": TeamsAppUsageFact.app_name,
+    }[sort]
+    descending = order == "desc" if order else sort != "app_name"
+    stmt = stmt.order_by(sort_column.desc() if descending else sort_column.asc(), TeamsAppUsageFact.app_name)
+
+    if limit is not None or offset:
+        count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+        total = (await fetch_all(db, count_stmt))[0][0]
+        rows = await fetch_all(db, stmt.limit(limit).offset(offset))
     else:
-        files = db.query(TeamsAppUploadedFile).order_by(TeamsAppUploadedFile.uploaded_at.desc()).all()
-    
-    if not files:
-        return []
-    
-    # Aggregate app data across all rows in selected files
-    app_data = {}
-    
-    for file in files:
-        rows = db.query(TeamsAppUploadedRow).filter(TeamsAppUploadedRow.file_id == file.id).all()
-        
-        for row in rows:
-            data = row.data
-            app_name = data.get('App Name', '').strip()
-            
-            if not app_name:
-                continue
-            
-            if app_name not in app_data:
-                app_data[app_name] = {
-                    'app_name': app_name,
-                    'team_using_app': 0,
-                    'users_using_app': 0,
-                }
-            
-            # Aggregate the metrics
-            try:
-                team_count = int(data.get('Team Using App', 0) or 0)
-                app_data[app_name]['team_using_app'] += team_count
-            except (ValueError, TypeError):
-                pass
-            
-            try:
-                user_count = int(data.get('Users Using App', 0) or 0)
-                app_data[app_name]['users_using_app'] += user_count
-            except (ValueError, TypeError):
-                pass
-    
-    # Sort by users using app (descending)
-    result = list(app_data.values())
-    result.sort(key=lambda x: x['users_using_app'], reverse=True)
-    
-    return result
+        rows = await fetch_all(db, stmt)
+        total = len(rows)
+    response.headers["X-Total-Count"] = str(total)
 
+    # SUM() comes back as Decimal on MySQL
+    return [
+        {
+            'app_name': name,
+            'team_using_app': int(teams or 0),
+            'users_using_app': int(users or 0),
+        }
+        for name, teams, users in rows
+    ]
@@ -6,6 +6,7 @@ from sqlalchemy import func
 
 from ..db import get_db
 from ..models import TeamsAppUploadedFile, TeamsAppUploadedRow
+from ..services.dataset_version import TEAMS_APP, bump_version
 from ..schemas import UploadedFileListItem, UploadedFileDetail, DeleteRequest, DeleteResponse
 from ..auth import get_current_user
 
@@ -81,6 +82,8 @@ def delete_teams_app_files(
         if file:
             db.delete(file)
             deleted_count += 1
+    if deleted_count:
+        bump_version(db, TEAMS_APP)
     db.commit()
     return {"deleted_count": deleted_count}
 
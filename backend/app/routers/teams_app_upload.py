@@ -1,12 +1,16 @@
 """Teams App Usage file upload endpoint."""
+import time
 from typing import List, Optional
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Form
 from sqlalchemy.orm import Session
 
 from ..db import get_db
+from ..metrics import record_upload
 from ..models import TeamsAppUploadedFile, TeamsAppUploadedRow
 from ..schemas import UploadResponseItem
 from ..services.parser import read_file_preserve_text
+from ..services.dataset_version import TEAMS_APP, bump_version
+from ..services.teams_app_usage import write_app_facts
 from ..auth import get_current_user
 
 router = APIRouter()
@@ -24,6 +28,7 @@ async def upload_teams_app_files(
     results = []
     
     for uploaded_file in files:
+        started = time.perf_counter()
         try:
             # Read file content
             file_bytes = await uploaded_file.read()
@@ -48,9 +53,14 @@ async def upload_teams_app_files(
                     data=row_dict
                 )
                 db.add(db_row)
+
+            # Typed counts for the SQL app ranking
+            write_app_facts(db, db_file.id, rows_data)
+            bump_version(db, TEAMS_APP)
             
             db.commit()
             db.refresh(db_file)
+            record_upload("teams_app", len(file_bytes), len(rows_data), time.perf_counter() - started)
             
             results.append(
                 UploadResponseItem(
@@ -6,6 +6,7 @@ from sqlalchemy import func
 
 from ..db import get_db
 from ..models import TeamsUploadedFile, TeamsUploadedRow
+from ..services.dataset_version import TEAMS, bump_version
 from ..schemas import UploadedFileListItem, UploadedFileDetail, DeleteRequest, DeleteResponse
 from ..auth import get_current_user
 
@@ -80,6 +81,8 @@ def delete_teams_files(
     deleted_count = db.query(TeamsUploadedFile).filter(
         TeamsUploadedFile.id.in_(request.file_ids)
     ).delete(synchronize_session=False)
+    if deleted_count:
+        bump_version(db, TEAMS)
     
     db.commit()
     
@@ -1,19 +1,49 @@
 """MS Teams file upload endpoint."""
+import time
 from typing import List, Optional
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Form
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from ..db import get_db
+from ..metrics import record_upload
 from ..models import TeamsUploadedFile, TeamsUploadedRow
 from ..schemas import UploadResponseItem
-from ..services.teams_parser import parse_teams_file
+from ..services.dataset_version import TEAMS, bump_version
+from ..services.teams_activity import write_facts
+from ..services.teams_parser import SNIFF_BYTES, read_teams_csv, sniff_encoding
 from ..auth import get_current_user
 
 router = APIRouter()
 
 
+def _store_teams_file(db: Session, uploaded_file: UploadFile, encoding: str,
+                      from_month: Optional[str], to_month: Optional[str]):
+    """Stream one file into the database batch by batch; returns (file record, row count)."""
+    uploaded_file.file.seek(0)
+    headers, batches = read_teams_csv(uploaded_file.file, encoding)
+
+    # Create file record
+    db_file = TeamsUploadedFile(
+        filename=uploaded_file.filename,
+        header_order=headers,
+        from_month=from_month,
+        to_month=to_month
+    )
+    db.add(db_file)
+    db.flush()  # Get the file ID
+
+    total_rows = 0
+    for batch in batches:
+        db.execute(insert(TeamsUploadedRow), [{"file_id": db_file.id, "data": row} for row in batch])
+        # Typed metric counts for the SQL rollups
+        write_facts(db, db_file, batch)
+        total_rows += len(batch)
+    return db_file, total_rows
+
+
 @router.post("", response_model=List[UploadResponseItem])
-async def upload_teams_files(
+def upload_teams_files(
     files: List[UploadFile] = File(...),
     from_month: Optional[str] = Form(None),
     to_month: Optional[str] = Form(None),
@@ -22,43 +52,35 @@ async def upload_teams_files(
 ):
     """Upload one or more MS Teams CSV files and store in database with month range."""
     results = []
-    
+
     for uploaded_file in files:
+        started = time.perf_counter()
         try:
-            # Parse the file
-            headers, rows_data = await parse_teams_file(uploaded_file)
-            
-            # Create file record
-            db_file = TeamsUploadedFile(
-                filename=uploaded_file.filename,
-                header_order=headers,
-                from_month=from_month,
-                to_month=to_month
-            )
-            db.add(db_file)
-            db.flush()  # Get the file ID
-            
-            # Create row records
-            for row_dict in rows_data:
-                db_row = TeamsUploadedRow(
-                    file_id=db_file.id,
-                    data=row_dict
-                )
-                db.add(db_row)
-            
+            encoding = sniff_encoding(uploaded_file.file.read(SNIFF_BYTES))
+            try:
+                with db.begin_nested():
+                    db_file, total_rows = _store_teams_file(db, uploaded_file, encoding, from_month, to_month)
+            except UnicodeDecodeError:
+                if encoding != 'utf-8':
+                    raise
+                # Not UTF-8 after all (past the sniffed block): start this file over as latin-1
+                with db.begin_nested():
+                    db_file, total_rows = _store_teams_file(db, uploaded_file, 'latin-1', from_month, to_month)
+
+            bump_version(db, TEAMS)
             db.commit()
             db.refresh(db_file)
-            
+            record_upload("teams", uploaded_file.size or 0, total_rows, time.perf_counter() - started)
+
             results.append({
                 "id": db_file.id,
                 "filename": db_file.filename,
                 "uploaded_at": db_file.uploaded_at,
-                "total_rows": len(rows_data)
+                "total_rows": total_rows
             })
-            
+
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=400, detail=f"Error processing {uploaded_file.filename}: {str(e)}")
-    
-    return results
 
+    return results
@@ -1,13 +1,19 @@
+import time
 from typing import List
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
 from ..db import get_db
+from ..metrics import record_upload
 from ..models import UploadedFile, UploadedRow
 from ..schemas import UploadResponseItem
 from ..services.parser import read_file_preserve_text
 from ..services.kpi_calculator import calculate_kpis_for_file
+from ..services.kpi_incremental import apply_file
+from ..services.attendance_fact import write_facts
+from ..services.dashboard_snapshot import refresh_snapshots
+from ..services.dataset_version import ATTENDANCE, bump_version
 
 
 router = APIRouter()
@@ -25,6 +31,7 @@ async def upload_files(
     created_items: List[UploadResponseItem] = []
 
     for uf in files:
+        started = time.perf_counter()
         content = await uf.read()
         try:
             header_order, rows = read_file_preserve_text(uf.filename, content)
@@ -39,16 +46,23 @@ async def upload_files(
             row_models = [UploadedRow(file_id=file_rec.id, data=row) for row in rows]
             if row_models:
                 db.add_all(row_models)
+                db.flush()  # to get the row ids
+                # Employee/date index for the drilldown
+                write_facts(db, file_rec.id, ((r.id, r.data) for r in row_models))
+            bump_version(db, ATTENDANCE)
             db.commit()
             db.refresh(file_rec)
+            record_upload("attendance", len(content), len(rows), time.perf_counter() - started)
             
-            # Calculate KPIs for this file in background
+            # Calculate KPIs for this file in background, then add them to the rollups
             if background_tasks:
                 background_tasks.add_task(calculate_kpis_for_file, db, file_rec.id)
+                background_tasks.add_task(apply_file, db, file_rec.id)
             else:
                 # If no background tasks, calculate synchronously
                 try:
                     calculate_kpis_for_file(db, file_rec.id)
+                    apply_file(db, file_rec.id)
                 except Exception as calc_err:
                     print(f"Warning: KPI calculation failed for file {file_rec.id}: {calc_err}")
                     # Don't fail the upload if KPI calculation fails
@@ -69,6 +83,10 @@ async def upload_files(
             )
         )
 
+    # Recompute the stored dashboard summaries once for the whole batch
+    if background_tasks:
+        background_tasks.add_task(refresh_snapshots)
+
     return created_items
 
 
@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from ..db import get_db
 from ..models import User
 from ..schemas import UserResponse, UserCreate, UserUpdate
-from ..auth import get_current_admin_user, get_password_hash
+from ..auth import get_current_admin_user, get_password_hash, invalidate_user, bump_token_generation, CachedUser
 
 router = APIRouter()
 
@@ -14,7 +14,7 @@ router = APIRouter()
 @router.get("/", response_model=List[UserResponse])
 def list_users(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: CachedUser = Depends(get_current_admin_user)
 ):
     """List all users (admin only)."""
     users = db.query(User).all()
@@ -25,7 +25,7 @@ def list_users(
 def create_user(
     user_data: UserCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: CachedUser = Depends(get_current_admin_user)
 ):
     """Create a new user (admin only)."""
     # Check if email exists
@@ -69,7 +69,7 @@ def create_user(
 def get_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: CachedUser = Depends(get_current_admin_user)
 ):
     """Get a specific user (admin only)."""
     user = db.query(User).filter(User.id == user_id).first()
@@ -86,7 +86,7 @@ def update_user(
     user_id: int,
     user_data: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: CachedUser = Depends(get_current_admin_user)
 ):
     """Update a user (admin only)."""
     user = db.query(User).filter(User.id == user_id).first()
@@ -137,6 +137,7 @@ def update_user(
     
     if user_data.password is not None:
         user.hashed_password = get_password_hash(user_data.password)
+        bump_token_generation()
     
     if user_data.role is not None and user_data.role in ["admin", "user"]:
         user.role = user_data.role
@@ -149,6 +150,8 @@ def update_user(
     
     db.commit()
     db.refresh(user)
+    # Role, activation or permissions may have changed
+    invalidate_user(user_id)
     
     return user
 
@@ -157,7 +160,7 @@ def update_user(
 def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: CachedUser = Depends(get_current_admin_user)
 ):
     """Delete a user (admin only)."""
     # Prevent admin from deleting themselves
@@ -176,6 +179,7 @@ def delete_user(
     
     db.delete(user)
     db.commit()
+    invalidate_user(user_id)
     
     return {"message": "User deleted successfully"}
 
@@ -0,0 +1,115 @@
+"""Employee/date index of uploaded attendance rows.
+
+Every uploaded attendance row gets a row in ``attendance_fact`` with its
+employee code and its attendance date parsed to a DATE, written at upload
+(``write_facts``). ``idx_attendance_fact_employee_date`` then serves one
+employee's days for a date range as an index range scan. Files uploaded
+before the table existed are backfilled at startup
+(``backfill_attendance_facts``).
+
+Attendance dates come as "01-Mar-2024", "2024-03-01", "2024/03/01 00:00:00",
+"01/03/2024" and so on, which is why they are parsed here rather than with a
+generated column on ``uploaded_row``.
+"""
+import re
+from datetime import date
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import exists, insert, select
+from sqlalchemy.orm import Session
+
+from ..models import AttendanceFact, UploadedFile, UploadedRow
+
+# Fact rows per multi-row INSERT
+_CHUNK = 1000
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+_YMD = re.compile(r"(20\d{2})[-/](\d{1,2})[-/](\d{1,2})")
+_D_MON_Y = re.compile(r"(\d{1,2})[-/ ]([a-z]{3,})[-/ ,]*(20\d{2})", re.I)
+# Day first, as in the month parsing of the KPI services
+_DMY = re.compile(r"(\d{1,2})[-/.](\d{1,2})[-/.](20\d{2})")
+
+
+def parse_attendance_date(value: Any) -> Optional[date]:
+    """Attendance date as a ``date``, or None when the string is not a date."""
+    s = str(value or "").strip()
+    if not s:
+        return None
+    m = _YMD.search(s)
+    if m:
+        year, month, day = int(m.group(1)), int(m.group(2)), int(m.group(3))
+    else:
+        m = _D_MON_Y.search(s)
+        if m:
+            month = _MONTHS.get(m.group(2).lower()[:3], 0)
+            year, day = int(m.group(3)), int(m.group(1))
+        else:
+            m = _DMY.search(s)
+            if not m:
+                return None
+            year, month, day = int(m.group(3)), int(m.group(2)), int(m.group(1))
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def fact_row(file_id: int, row_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "file_id": file_id,
+        "row_id": row_id,
+        "employee_code": str(data.get("Employee Code", "")).strip()[:50],
+        "attendance_date": parse_attendance_date(data.get("Attendance Date")),
+    }
+
+
+def write_facts(db: Session, file_id: int, rows: Iterable[Tuple[int, Dict[str, Any]]]) -> int:
+    """
+    Insert the facts for one uploaded file's ``(row id, data)`` pairs.
+    Runs inside the caller's transaction; the caller commits.
+    """
+    count = 0
+    chunk = []
+    for row_id, data in rows:
+        chunk.append(fact_row(file_id, row_id, data if isinstance(data, dict) else {}))
+        if len(chunk) >= _CHUNK:
+            db.execute(insert(AttendanceFact), chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        db.execute(insert(AttendanceFact), chunk)
+        count += len(chunk)
+    return count
+
+
+def backfill_attendance_facts():
+    """Write facts for attendance files uploaded before the fact table existed (startup task)."""
+    from ..db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        missing = db.execute(
+            select(UploadedFile)
+            .where(~exists().where(AttendanceFact.file_id == UploadedFile.id))
+            .where(exists().where(UploadedRow.file_id == UploadedFile.id))
+            .order_by(UploadedFile.id)
+        ).scalars().all()
+        for file in missing:
+            # Read the file's rows fully before inserting on the same connection
+            rows = db.execute(
+                select(UploadedRow.id, UploadedRow.data)
+                .where(UploadedRow.file_id == file.id)
+                .order_by(UploadedRow.id)
+            ).all()
+            count = write_facts(db, file.id, rows)
+            db.commit()
+            print(f"✓ Attendance facts backfilled for {file.filename} ({count} rows)")
+    except Exception as e:
+        print(f"⚠ Error backfilling attendance facts: {e}")
+        db.rollback()
+    finally:
+        db.close()
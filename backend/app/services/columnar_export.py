@@ -0,0 +1,84 @@
+"""Compact columnar JSON export of uploaded rows.
+
+Layout (one JSON object, streamed):
+
+    {
+      "format": "columnar-dict-v1",
+      "columns": ["Flag", "Is Late", ...],
+      "chunks": [{"rows": 5000, "codes": [[0, 1, 0, ...], [0, 0, 1, ...], ...]}, ...],
+      "dictionaries": [["P", "A", ...], ["No", "Yes"], ...],
+      "rows": 123456
+    }
+
+Every column is dictionary-encoded: a chunk holds one integer code array per
+column and ``dictionaries[c][code]`` is the value (``null`` when the row has no
+such key). Codes are assigned in order of first appearance and never change,
+so chunks can be written while rows are read and the dictionaries follow at
+the end. Repeated values (flags, dates, group names) cost a few bytes each.
+"""
+import json
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+FORMAT = "columnar-dict-v1"
+
+# Rows per chunk of code arrays
+CHUNK_ROWS = 5000
+
+# Attendance columns the client-side KPI computations read (frontend/src/lib)
+ATTENDANCE_EXPORT_COLUMNS = (
+    "Employee Code", "Name", "Attendance Date", "Flag", "Is Late",
+    "In Time", "Out Time", "Shift In Time", "Shift Out Time",
+    "Function Name", "Comapny Name", "Job Location",
+)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def iter_columnar_json(rows: Iterable[Sequence[Any]], columns: Sequence[str],
+                       chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    """Encode ``rows`` (one value per column) as columnar JSON text pieces."""
+    dictionaries: List[Dict[Any, int]] = [{} for _ in columns]
+    total = 0
+
+    yield '{"format":%s,"columns":%s,"chunks":[' % (_dumps(FORMAT), _dumps(list(columns)))
+
+    codes: List[List[int]] = [[] for _ in columns]
+    count = 0
+    first = True
+
+    def flush() -> str:
+        return ('' if first else ',') + '{"rows":%d,"codes":%s}' % (count, _dumps(codes))
+
+    for row in rows:
+        for c, value in enumerate(row):
+            dictionary = dictionaries[c]
+            code = dictionary.get(value)
+            if code is None:
+                code = dictionary[value] = len(dictionary)
+            codes[c].append(code)
+        count += 1
+        total += 1
+        if count >= chunk_rows:
+            yield flush()
+            first = False
+            codes = [[] for _ in columns]
+            count = 0
+    if count:
+        yield flush()
+
+    # dicts keep insertion order, i.e. code order
+    yield '],"dictionaries":%s,"rows":%d}' % (_dumps([list(d) for d in dictionaries]), total)
+
+
+def gzip_stream(pieces: Iterable[str], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compress text pieces as a stream of byte chunks."""
+    # wbits=31: zlib with a gzip header and trailer
+    stream = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for piece in pieces:
+        data = stream.compress(piece.encode("utf-8"))
+        if data:
+            yield data
+    yield stream.flush()
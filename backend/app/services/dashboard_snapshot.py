@@ -0,0 +1,91 @@
+"""Precomputed /dashboard/summary payloads.
+
+For every group_by the full summary is stored in ``dashboard_snapshot`` as
+gzip-compressed JSON, stamped with the attendance dataset version it was
+computed from. Uploads, deletes and rebuilds bump that version and schedule
+``refresh_snapshots``; the endpoint serves the stored bytes while the stamp
+matches the current version and computes live otherwise.
+"""
+import gzip
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import DashboardSnapshot
+from .dashboard_summary import get_dashboard_summary
+from .dataset_version import ATTENDANCE, current_version
+
+GROUP_BYS = ("function", "company", "location")
+
+# One refresh per group_by at a time in this process
+_refresh_locks = {group_by: threading.Lock() for group_by in GROUP_BYS}
+
+
+def serialize_summary(summary: Dict[str, Any]) -> bytes:
+    """Gzip-compressed JSON, encoded the way FastAPI's JSONResponse encodes it."""
+    text = json.dumps(summary, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+    return gzip.compress(text.encode("utf-8"))
+
+
+def _store(db: Session, group_by: str, version: int, payload: bytes, seconds: float):
+    values = {
+        "version": version,
+        "payload": payload,
+        "computed_at": datetime.utcnow(),
+        "compute_seconds": round(seconds, 3),
+    }
+    # Never replace a snapshot of a newer version
+    result = db.execute(
+        update(DashboardSnapshot)
+        .where(DashboardSnapshot.group_by == group_by, DashboardSnapshot.version <= version)
+        .values(**values)
+    )
+    if result.rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(DashboardSnapshot).values(group_by=group_by, **values))
+    except IntegrityError:
+        # A newer snapshot exists, or another worker stored one concurrently
+        pass
+
+
+def build_snapshot(db: Session, group_by: str) -> int:
+    """Compute and store the snapshot for ``group_by``; returns the version it is stamped with."""
+    # Read the version first: rows added meanwhile make the snapshot stale, never wrongly current
+    version = current_version(db, ATTENDANCE)
+    started = time.perf_counter()
+    payload = serialize_summary(get_dashboard_summary(db, group_by))
+    _store(db, group_by, version, payload, time.perf_counter() - started)
+    db.commit()
+    return version
+
+
+def refresh_snapshots(group_bys: Iterable[str] = GROUP_BYS):
+    """Bring the snapshots up to the current attendance version (background task)."""
+    from ..db import SessionLocal
+
+    for group_by in group_bys:
+        lock = _refresh_locks[group_by]
+        if not lock.acquire(blocking=False):
+            continue  # already being refreshed
+        db = SessionLocal()
+        try:
+            stored = db.execute(
+                select(DashboardSnapshot.version).where(DashboardSnapshot.group_by == group_by)
+            ).scalar()
+            if stored is not None and stored >= current_version(db, ATTENDANCE):
+                continue
+            build_snapshot(db, group_by)
+        except Exception as e:
+            print(f"⚠ Error refreshing dashboard snapshot ({group_by}): {e}")
+            db.rollback()
+        finally:
+            db.close()
+            lock.release()
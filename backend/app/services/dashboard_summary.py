@@ -1,11 +1,13 @@
 """Dashboard summary service - pre-aggregated data for faster loading."""
 from typing import Dict, Any, List
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from .kpi import compute_on_time_stats
-from .work_hour import compute_work_hour_completion
-from .work_hour_lost import compute_work_hour_lost
-from .leave_analysis import compute_leave_analysis
+from ..models import UploadedRow
+from .kpi import aggregate_on_time_stats
+from .work_hour import aggregate_work_hour_completion
+from .work_hour_lost import aggregate_work_hour_lost
+from .leave_analysis import aggregate_leave_analysis
 
 
 def get_dashboard_summary(db: Session, group_by: str) -> Dict[str, Any]:
@@ -13,11 +15,17 @@ def get_dashboard_summary(db: Session, group_by: str) -> Dict[str, Any]:
     Get pre-aggregated dashboard data for faster loading.
     Returns summary stats and chart data for all groups.
     """
-    # Fetch all KPI data in parallel (already optimized in services)
-    on_time_data = compute_on_time_stats(db, group_by)
-    work_hour_data = compute_work_hour_completion(db, group_by)
-    work_hour_lost_data = compute_work_hour_lost(db, group_by)
-    leave_analysis_data = compute_leave_analysis(db, group_by)
+    rows = db.execute(select(UploadedRow.data)).scalars().all()
+    return summarize_dashboard(rows, group_by)
+
+
+def summarize_dashboard(rows: List[Any], group_by: str) -> Dict[str, Any]:
+    """Build the dashboard summary from already-fetched attendance rows."""
+    # One scan of the attendance rows feeds all four KPIs
+    on_time_data = aggregate_on_time_stats(rows, group_by)
+    work_hour_data = aggregate_work_hour_completion(rows, group_by)
+    work_hour_lost_data = aggregate_work_hour_lost(rows, group_by)
+    leave_analysis_data = aggregate_leave_analysis(rows, group_by)
     
     # Get all unique groups
     groups = set()
@@ -83,14 +91,17 @@ def get_dashboard_summary(db: Session, group_by: str) -> Dict[str, Any]:
     avg_lost = round(weighted_lost / total_lost_members, 2) if total_lost_members > 0 else 0
     
     # Organize data by group for efficient lookup
-    data_by_group = {}
-    for group in all_groups:
-        data_by_group[group] = {
-            'on_time': [item for item in on_time_data if item.get('group') == group],
-            'work_hour': [item for item in work_hour_data if item.get('group') == group],
-            'work_hour_lost': [item for item in work_hour_lost_data if item.get('group') == group],
-            'leave_analysis': [item for item in leave_analysis_data if item.get('group') == group]
-        }
+    # (one pass over each KPI list instead of one per group)
+    data_by_group = {
+        group: {'on_time': [], 'work_hour': [], 'work_hour_lost': [], 'leave_analysis': []}
+        for group in all_groups
+    }
+    for key, items in (('on_time', on_time_data), ('work_hour', work_hour_data),
+                       ('work_hour_lost', work_hour_lost_data), ('leave_analysis', leave_analysis_data)):
+        for item in items:
+            entry = data_by_group.get(item.get('group'))
+            if entry is not None:
+                entry[key].append(item)
     
     return {
         'summary': {
@@ -0,0 +1,60 @@
+"""Per-dataset change counters (``dataset_version``).
+
+Writers bump a dataset's version inside the transaction that changes it, so
+derived data stamped with the version it was computed from (e.g. the
+dashboard snapshots) can tell whether it is still current. Committed bumps
+are published to the ``/events`` subscribers (see app/events.py).
+"""
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..events import broadcaster
+from ..models import DatasetVersion
+
+ATTENDANCE = "attendance"
+TEAMS = "teams"
+TEAMS_APP = "teams_app"
+EMPLOYEE = "employee"
+# KPI tables (per-upload calculation and rollups, full rebuilds)
+KPI = "kpi"
+
+# session.info key: {dataset: version} bumped in the open transaction
+_BUMPED = "bumped_versions"
+
+
+def bump_version(db: Session, name: str) -> None:
+    """
+    Increment the dataset's version (creating it at 1).
+    Runs inside the caller's transaction; the caller commits, which
+    publishes the new version to /events.
+    """
+    where = DatasetVersion.name == name
+    if not db.execute(update(DatasetVersion).where(where).values(version=DatasetVersion.version + 1)).rowcount:
+        try:
+            with db.begin_nested():
+                db.execute(insert(DatasetVersion).values(name=name, version=1))
+        except IntegrityError:
+            # Another writer created the row concurrently; fall back to incrementing it
+            db.execute(update(DatasetVersion).where(where).values(version=DatasetVersion.version + 1))
+    db.info.setdefault(_BUMPED, {})[name] = current_version(db, name)
+
+
+def version_stmt(name: str):
+    return select(DatasetVersion.version).where(DatasetVersion.name == name)
+
+
+def current_version(db: Session, name: str) -> int:
+    """The dataset's version; 0 before its first change."""
+    return db.execute(version_stmt(name)).scalar() or 0
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_bumped(session: Session):
+    for name, version in session.info.pop(_BUMPED, {}).items():
+        broadcaster.publish(name, version)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_bumped(session: Session):
+    session.info.pop(_BUMPED, None)
@@ -0,0 +1,99 @@
+"""One employee's attendance timeline and per-month KPI contributions."""
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from .kpi_calculator import group_values, row_kpi_values
+
+
+def _pct(numerator: float, denominator: float) -> float:
+    return round(numerator / denominator * 100.0, 2) if denominator > 0 else 0.0
+
+
+def _month_kpis(month: str, c: Counter) -> Dict[str, Any]:
+    """The month's counters, with the percentages the KPI tables use."""
+    on_time = c["present"] - c["late"]
+    return {
+        "month": month,
+        "present": c["present"],
+        "late": c["late"],
+        "on_time": on_time,
+        "on_time_pct": _pct(on_time, c["present"]),
+        "od": c["od"],
+        "shift_hours": round(c["shift_hours"], 2),
+        "work_hours": round(c["work_hours"], 2),
+        "completed": c["completed"],
+        "completion_pct": _pct(c["completed"], c["present"] + c["od"]),
+        "lost_hours": round(c["lost_hours"], 2),
+        "lost_pct": _pct(c["lost_hours"], c["lost_shift_hours"]),
+        "workdays": c["workdays"],
+        "total_sl": c["SL"],
+        "total_cl": c["CL"],
+        "total_a": c["A"],
+        "a_pct": _pct(c["A"], c["workdays"]),
+    }
+
+
+def summarize_employee(employee_code: str,
+                       rows: List[Tuple[Optional[date], int, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Build the drilldown from the employee's ``(attendance date, file id, row data)``
+    rows in date order: one timeline entry per row, and per month what the rows
+    add to the On Time %, Work Hour Completion, Work Hour Lost and leave KPIs.
+    """
+    days = []
+    months: Dict[str, Counter] = defaultdict(Counter)
+    name = ""
+
+    for attendance_date, file_id, r in rows:
+        if not isinstance(r, dict):
+            continue
+        v = row_kpi_values(r)
+        function, company, location = group_values(r)
+        name = str(r.get("Name", "")).strip() or name
+
+        days.append({
+            "date": attendance_date.isoformat() if attendance_date else None,
+            "attendance_date": r.get("Attendance Date"),
+            "file_id": file_id,
+            "month": v.month,
+            "flag": v.flag,
+            "in_time": r.get("In Time", ""),
+            "out_time": r.get("Out Time", ""),
+            "shift_in_time": r.get("Shift In Time", ""),
+            "shift_out_time": r.get("Shift Out Time", ""),
+            "is_late": v.is_late,
+            "shift_hours": round(v.shift_hours, 2),
+            "worked_hours": round(v.work_hours, 2),
+            "completed": v.completed,
+            "lost_hours": v.lost_hours,
+            "function": function,
+            "company": company,
+            "location": location,
+        })
+
+        c = months[v.month]
+        if v.is_present:
+            c["present"] += 1
+            if v.is_late:
+                c["late"] += 1
+        elif v.is_od:
+            c["od"] += 1
+        if v.shift_hours > 0:
+            c["shift_hours"] += v.shift_hours
+            c["work_hours"] += v.work_hours
+            if v.completed:
+                c["completed"] += 1
+            c["lost_shift_hours"] += v.lost_shift_hours
+            c["lost_hours"] += v.lost_hours
+        if v.is_workday:
+            c["workdays"] += 1
+            if v.flag in ("SL", "CL", "A"):
+                c[v.flag] += 1
+
+    return {
+        "employee_code": employee_code,
+        "name": name,
+        "days": days,
+        "months": [_month_kpis(month, months[month]) for month in sorted(months)],
+    }
@@ -0,0 +1,135 @@
+"""Materialized employee directory built from the Employee List uploads.
+
+``employee_directory`` holds one row per employee, keyed by the stripped,
+lowercase ``Email (Offical)`` with a unique index. When an email appears in
+several uploads the latest upload wins (within one file, its first row).
+It is kept current instead of being rebuilt per request:
+
+* on upload the new file's employees replace existing entries (``apply_file``)
+* on delete the removed files' entries are refilled from the remaining
+  uploads, newest first (``remove_files``)
+* at startup an empty directory is backfilled from existing uploads
+  (``backfill_directory``)
+
+Readers join Teams rows and CXO flags against it in SQL.
+"""
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import EmployeeDirectory, EmployeeUploadedFile, EmployeeUploadedRow
+
+# Emails per DELETE ... IN (...) / multi-row INSERT
+_CHUNK = 500
+
+
+def directory_entry(data: dict, file_id: int) -> Optional[Dict[str, Optional[str]]]:
+    """Directory row for one Employee List row, or None when it has no email."""
+    display_email = (data.get('Email (Offical)') or '').strip()
+    if not display_email:
+        return None
+    return {
+        'email': display_email.lower(),
+        'display_email': display_email,
+        'name': data.get('Employee Name', '') or data.get('Name', '') or '',
+        'function': data.get('Function'),
+        'company': data.get('Company'),
+        'file_id': file_id,
+    }
+
+
+def _first_per_email(entries: Iterable[Optional[dict]], emails: Optional[Set[str]] = None) -> List[dict]:
+    seen = {}
+    for entry in entries:
+        if entry is None or entry['email'] in seen:
+            continue
+        if emails is not None and entry['email'] not in emails:
+            continue
+        seen[entry['email']] = entry
+    return list(seen.values())
+
+
+def _replace(db: Session, entries: List[dict]):
+    """Replace the directory rows for the entries' emails."""
+    for start in range(0, len(entries), _CHUNK):
+        chunk = entries[start:start + _CHUNK]
+        emails = [entry['email'] for entry in chunk]
+        for attempt in range(2):
+            try:
+                with db.begin_nested():
+                    db.execute(delete(EmployeeDirectory).where(EmployeeDirectory.email.in_(emails)))
+                    db.execute(insert(EmployeeDirectory), chunk)
+                break
+            except IntegrityError:
+                # Another upload inserted one of these emails concurrently; retry once
+                if attempt:
+                    raise
+
+
+def apply_file(db: Session, file_id: int, rows: Iterable[dict]):
+    """
+    Make an uploaded file's employees the current directory entries.
+    Runs inside the caller's transaction; the caller commits.
+    """
+    _replace(db, _first_per_email(directory_entry(data, file_id) for data in rows))
+
+
+def _rows_newest_first(db: Session, exclude_file_ids: Iterable[int] = ()):
+    """Employee rows of every upload, newest upload first, keeping file order within one."""
+    stmt = (
+        select(EmployeeUploadedRow.file_id, EmployeeUploadedRow.data)
+        .join(EmployeeUploadedFile, EmployeeUploadedFile.id == EmployeeUploadedRow.file_id)
+        .order_by(EmployeeUploadedFile.uploaded_at.desc(), EmployeeUploadedFile.id.desc(), EmployeeUploadedRow.id)
+    )
+    exclude_file_ids = list(exclude_file_ids)
+    if exclude_file_ids:
+        stmt = stmt.where(EmployeeUploadedRow.file_id.notin_(exclude_file_ids))
+    for file_id, data in db.execute(stmt).yield_per(_CHUNK):
+        yield directory_entry(data, file_id)
+
+
+def remove_files(db: Session, file_ids: List[int]):
+    """
+    Drop the given files from the directory before they are deleted, falling
+    back to the newest remaining upload for the affected emails.
+    Runs inside the caller's transaction; the caller deletes the files and commits.
+    """
+    if not file_ids:
+        return
+    affected = set(db.execute(
+        select(EmployeeDirectory.email).where(EmployeeDirectory.file_id.in_(file_ids))
+    ).scalars())
+    if not affected:
+        return
+    db.execute(delete(EmployeeDirectory).where(EmployeeDirectory.file_id.in_(file_ids)))
+    _replace(db, _first_per_email(_rows_newest_first(db, file_ids), affected))
+
+
+def build_directory(db: Session):
+    """Rebuild the whole directory from the uploaded Employee List files."""
+    entries = _first_per_email(_rows_newest_first(db))
+    db.execute(delete(EmployeeDirectory))
+    _replace(db, entries)
+    db.commit()
+    return len(entries)
+
+
+def backfill_directory():
+    """Fill an empty directory from existing uploads (startup task)."""
+    from ..db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if db.execute(select(func.count()).select_from(EmployeeDirectory)).scalar():
+            return
+        if not db.execute(select(EmployeeUploadedRow.id).limit(1)).first():
+            return
+        count = build_directory(db)
+        print(f"✓ Employee directory backfilled ({count} employees)")
+    except Exception as e:
+        print(f"⚠ Error backfilling employee directory: {e}")
+        db.rollback()
+    finally:
+        db.close()
@@ -2,11 +2,13 @@ from __future__ import annotations
 
 from typing import Dict, Any, List, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from collections import defaultdict
 import re
 
+from ..metrics import observe_aggregation
 from ..models import UploadedRow, FunctionKPI, CompanyKPI, LocationKPI
+from .kpi_shadow import create_shadow_tables, swap_shadow_tables
 
 
 def _get_company_short_name(company_name: str) -> str:
@@ -46,6 +48,12 @@ def _extract_month(date_str: str) -> str:
 
 
 def compute_on_time_stats(db: Session, group_by: str) -> List[Dict[str, Any]]:
+    rows = db.execute(select(UploadedRow.data)).scalars().all()
+    return aggregate_on_time_stats(rows, group_by)
+
+
+@observe_aggregation("on_time")
+def aggregate_on_time_stats(rows: List[Any], group_by: str) -> List[Dict[str, Any]]:
     key_map = {
         "function": "Function Name",
         "company": "Comapny Name",
@@ -61,8 +69,6 @@ def compute_on_time_stats(db: Session, group_by: str) -> List[Dict[str, Any]]:
     if not group_key:
         raise ValueError("Invalid group_by")
 
-    rows = db.execute(select(UploadedRow.data)).scalars().all()
-
     # month -> group_value -> accumulators
     members: Dict[Tuple[str, str], set] = defaultdict(set)
     present_count: Dict[Tuple[str, str], int] = defaultdict(int)
@@ -146,6 +152,9 @@ def rebuild_kpi_tables(db: Session) -> None:
         "location": (LocationKPI, "Job Location"),
     }
 
+    # Write into shadow tables; the live ones are swapped out only once complete
+    shadows = create_shadow_tables(db, [Model for Model, _ in mapping.values()])
+
     rows = db.execute(select(UploadedRow.data)).scalars().all()
 
     from collections import defaultdict
@@ -187,10 +196,7 @@ def rebuild_kpi_tables(db: Session) -> None:
                 if is_late:
                     late_count[k] += 1
 
-        # clear existing
-        db.query(Model).delete()
-
-        # insert new
+        # insert new generation into the shadow table
         to_add = []
         for (month, group_val), mset in members.items():
             present = present_count.get((month, group_val), 0)
@@ -198,18 +204,18 @@ def rebuild_kpi_tables(db: Session) -> None:
             on_time = max(present - late, 0)
             pct = f"{(on_time / present * 100.0):.2f}" if present > 0 else "0.00"
             to_add.append(
-                Model(
-                    month=month,
-                    group_value=group_val,
-                    members=len(mset),
-                    present=present,
-                    late=late,
-                    on_time=on_time,
-                    on_time_pct=pct,
-                )
+                {
+                    "month": month,
+                    "group_value": group_val,
+                    "members": len(mset),
+                    "present": present,
+                    "late": late,
+                    "on_time": on_time,
+                    "on_time_pct": pct,
+                }
             )
         if to_add:
-            db.add_all(to_add)
+            db.execute(insert(shadows[Model]), to_add)
     db.commit()
 
-
+    swap_shadow_tables(db, shadows)
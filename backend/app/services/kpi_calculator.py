@@ -1,12 +1,15 @@
 """Service to calculate and store KPIs for uploaded files."""
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import select
-from collections import defaultdict
+from sqlalchemy import Table, select, insert
 import re
 
-from ..models import UploadedRow
-from ..models_kpi import OnTimeKPI, WorkHourKPI, WorkHourLostKPI, LeaveAnalysisKPI
+from ..models import UploadedFile, UploadedRow
+from ..models_kpi import OnTimeKPI, WorkHourKPI, WorkHourLostKPI, LeaveAnalysisKPI, KPIMember
+from .kpi_shadow import create_shadow_tables, swap_shadow_tables
+from .kpi_incremental import ROLLUP_MODELS, build_rollups
+
+KPI_MODELS = (OnTimeKPI, WorkHourKPI, WorkHourLostKPI, LeaveAnalysisKPI, KPIMember)
 
 
 def _get_company_short_name(company_name: str) -> str:
@@ -64,11 +67,74 @@ def _compute_duration_hours(start_str: str, end_str: str) -> float:
     return max(0, end_h - start_h)
 
 
-def calculate_kpis_for_file(db: Session, file_id: int):
+GROUP_BYS = ("function", "company", "location")
+
+# Rows per multi-row INSERT statement (keeps statements well below packet/bind limits)
+_INSERT_CHUNK = 500
+
+# Flags that count towards leave-analysis workdays
+_WORKDAY_FLAGS = frozenset(["A", "CL", "EL", "OD", "P", "SL", "WHF"])
+
+
+class _KpiAccumulator:
+    """Counters for one (group_by, month, group) key, shared by all four KPIs."""
+    __slots__ = (
+        "members", "present", "late", "od",
+        "shift_hours", "work_hours", "completed",
+        "lost_shift_hours", "lost_work_hours", "lost_hours",
+        "workdays", "sl", "cl", "a",
+    )
+
+    def __init__(self):
+        self.members = set()
+        self.present = 0
+        self.late = 0
+        self.od = 0
+        self.shift_hours = 0.0
+        self.work_hours = 0.0
+        self.completed = 0
+        self.lost_shift_hours = 0.0
+        self.lost_work_hours = 0.0
+        self.lost_hours = 0.0
+        self.workdays = 0
+        self.sl = 0
+        self.cl = 0
+        self.a = 0
+
+
+def group_values(r: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Return the (function, company, location) group values of a row."""
+    company_name = str(r.get("Comapny Name", ""))
+    function_name = str(r.get("Function Name", "")).strip()
+    company_short = _get_company_short_name(company_name.strip())
+    if company_short and function_name:
+        function_group = f"{company_short} - {function_name}"
+    elif function_name:
+        function_group = function_name
+    else:
+        function_group = company_short or "Unknown"
+    return function_group, company_name, str(r.get("Job Location", ""))
+
+
+def _bulk_insert(db: Session, table: Table, values: List[Dict[str, Any]]):
+    """Write rows with multi-row ``INSERT ... VALUES`` statements."""
+    for start in range(0, len(values), _INSERT_CHUNK):
+        db.execute(insert(table).values(values[start:start + _INSERT_CHUNK]))
+
+
+def calculate_kpis_for_file(db: Session, file_id: int, tables: Optional[Dict[type, Table]] = None):
     """
     Calculate all KPIs for a specific uploaded file and store in database.
     This runs after file upload to pre-calculate all dashboard data.
+
+    All four KPIs for all three groupings are fed from a single pass over the
+    file's rows and written with one multi-row INSERT per KPI table, plus the
+    file's distinct members per key for the incremental rollups.
+
+    ``tables`` optionally redirects the inserts (model -> Table), e.g. into the
+    shadow tables of a full rebuild; by default the live KPI tables are used.
     """
+    tables = tables or {}
     # Fetch only rows for this file
     rows = db.execute(
         select(UploadedRow.data).where(UploadedRow.file_id == file_id)
@@ -77,341 +143,214 @@ def calculate_kpis_for_file(db: Session, file_id: int):
     if not rows:
         return
     
-    # Calculate for all three group types
-    for group_by in ['function', 'company', 'location']:
-        _calculate_on_time_kpi(db, file_id, group_by, rows)
-        _calculate_work_hour_kpi(db, file_id, group_by, rows)
-        _calculate_work_hour_lost_kpi(db, file_id, group_by, rows)
-        _calculate_leave_analysis_kpi(db, file_id, group_by, rows)
-    
-    db.commit()
-
-
-def _calculate_on_time_kpi(db: Session, file_id: int, group_by: str, rows: List[Dict]):
-    """Calculate and store On Time % KPIs."""
-    key_map = {
-        "function": "Function Name",
-        "company": "Comapny Name",
-        "location": "Job Location",
-    }
-    group_key = key_map.get(group_by)
-    
-    members = defaultdict(set)
-    present_count = defaultdict(int)
-    late_count = defaultdict(int)
+    accumulators = _accumulate(rows)
     
-    for r in rows:
-        if not isinstance(r, dict):
+    on_time_rows, work_hour_rows, lost_rows, leave_rows, member_rows = [], [], [], [], []
+    for (group_by, month, group_val), acc in accumulators.items():
+        if not acc.members:
+            # Only keys with at least one identifiable member are reported
             continue
-        month = _extract_month(str(r.get("Attendance Date", "")))
+        key = {"file_id": file_id, "month": month, "group_by": group_by, "group_value": group_val}
+        members = len(acc.members)
+        member_rows.extend({**key, "member_id": member_id} for member_id in acc.members)
         
-        if group_by == "function":
-            company_name = str(r.get("Comapny Name", "")).strip()
-            function_name = str(r.get("Function Name", "")).strip()
-            company_short = _get_company_short_name(company_name)
-            if company_short and function_name:
-                group_val = f"{company_short} - {function_name}"
-            elif function_name:
-                group_val = function_name
-            else:
-                group_val = company_short or "Unknown"
-        else:
-            group_val = str(r.get(group_key, ""))
+        # On Time %
+        on_time = acc.present - acc.late
+        on_time_rows.append({
+            **key,
+            "members": members,
+            "present": acc.present,
+            "late": acc.late,
+            "on_time": on_time,
+            "on_time_pct": round((on_time / acc.present * 100.0), 2) if acc.present > 0 else 0.0,
+        })
         
-        emp_code = str(r.get("Employee Code", "")).strip()
-        emp_name = str(r.get("Name", "")).strip()
-        member_id = emp_code or emp_name
-        flag = str(r.get("Flag", "")).strip()
-        is_late = str(r.get("Is Late", "")).strip().lower() == "yes"
+        # Work Hour Completion
+        attended = acc.present + acc.od
+        work_hour_rows.append({
+            **key,
+            "members": members,
+            "present": acc.present,
+            "od": acc.od,
+            "shift_hours": round(acc.shift_hours, 2),
+            "work_hours": round(acc.work_hours, 2),
+            "completed": acc.completed,
+            "completion_pct": round((acc.completed / attended * 100.0), 2) if attended > 0 else 0.0,
+        })
         
-        key = (month, group_val)
-        if member_id:
-            members[key].add(member_id)
-        if flag == "P":
-            present_count[key] += 1
-            if is_late:
-                late_count[key] += 1
-    
-    # Store results
-    for (month, group_val), member_set in members.items():
-        present = present_count.get((month, group_val), 0)
-        late = late_count.get((month, group_val), 0)
-        on_time = present - late
-        on_time_pct = round((on_time / present * 100.0), 2) if present > 0 else 0.0
+        # Work Hour Lost
+        lost_rows.append({
+            **key,
+            "members": members,
+            "present": acc.present,
+            "od": acc.od,
+            "shift_hours": round(acc.lost_shift_hours, 2),
+            "work_hours": round(acc.lost_work_hours, 2),
+            "lost_hours": round(acc.lost_hours, 2),
+            "lost_pct": round((acc.lost_hours / acc.lost_shift_hours * 100.0), 2) if acc.lost_shift_hours > 0 else 0.0,
+        })
         
-        kpi = OnTimeKPI(
-            file_id=file_id,
-            month=month,
-            group_by=group_by,
-            group_value=group_val,
-            members=len(member_set),
-            present=present,
-            late=late,
-            on_time=on_time,
-            on_time_pct=on_time_pct
-        )
-        db.add(kpi)
-
-
-def _calculate_work_hour_kpi(db: Session, file_id: int, group_by: str, rows: List[Dict]):
-    """Calculate and store Work Hour Completion KPIs."""
-    key_map = {
-        "function": "Function Name",
-        "company": "Comapny Name",
-        "location": "Job Location",
-    }
-    group_key = key_map.get(group_by)
+        # Leave Analysis (simplified: adjacency would need the full per-employee logic)
+        leave_rows.append({
+            **key,
+            "members": members,
+            "total_sl": acc.sl,
+            "total_cl": acc.cl,
+            "workdays": acc.workdays,
+            "total_a": acc.a,
+            "sl_adjacent_w": 0,
+            "cl_adjacent_w": 0,
+            "sl_adjacent_h": 0,
+            "cl_adjacent_h": 0,
+            "sl_pct": 0.0,
+            "cl_pct": 0.0,
+            "a_pct": round((acc.a / acc.workdays * 100.0), 2) if acc.workdays > 0 else 0.0,
+        })
     
-    members = defaultdict(set)
-    present_count = defaultdict(int)
-    od_count = defaultdict(int)
-    shift_hours_sum = defaultdict(float)
-    work_hours_sum = defaultdict(float)
-    completed_count = defaultdict(int)
-    
-    for r in rows:
-        if not isinstance(r, dict):
-            continue
-        month = _extract_month(str(r.get("Attendance Date", "")))
-        
-        if group_by == "function":
-            company_name = str(r.get("Comapny Name", "")).strip()
-            function_name = str(r.get("Function Name", "")).strip()
-            company_short = _get_company_short_name(company_name)
-            if company_short and function_name:
-                group_val = f"{company_short} - {function_name}"
-            elif function_name:
-                group_val = function_name
-            else:
-                group_val = company_short or "Unknown"
-        else:
-            group_val = str(r.get(group_key, ""))
-        
-        emp_code = str(r.get("Employee Code", "")).strip()
-        emp_name = str(r.get("Name", "")).strip()
-        member_id = emp_code or emp_name
-        flag = str(r.get("Flag", "")).strip()
-        
-        key = (month, group_val)
-        if member_id:
-            members[key].add(member_id)
-        if flag == "P":
-            present_count[key] += 1
-        if flag == "OD":
-            od_count[key] += 1
-        
-        shift_hrs = _compute_duration_hours(
-            str(r.get("Shift In Time", "")).strip(),
-            str(r.get("Shift Out Time", "")).strip()
-        )
-        work_hrs = _compute_duration_hours(
-            str(r.get("In Time", "")).strip(),
-            str(r.get("Out Time", "")).strip()
-        )
-        
-        if shift_hrs > 0:
-            shift_hours_sum[key] += shift_hrs
-            work_hours_sum[key] += work_hrs
-            if (flag == "P" or flag == "OD") and work_hrs >= shift_hrs:
-                completed_count[key] += 1
+    _bulk_insert(db, tables.get(OnTimeKPI, OnTimeKPI.__table__), on_time_rows)
+    _bulk_insert(db, tables.get(WorkHourKPI, WorkHourKPI.__table__), work_hour_rows)
+    _bulk_insert(db, tables.get(WorkHourLostKPI, WorkHourLostKPI.__table__), lost_rows)
+    _bulk_insert(db, tables.get(LeaveAnalysisKPI, LeaveAnalysisKPI.__table__), leave_rows)
+    # Distinct members per key, so cross-file rollups can recount them exactly
+    _bulk_insert(db, tables.get(KPIMember, KPIMember.__table__), member_rows)
     
-    # Store results
-    for (month, group_val), member_set in members.items():
-        present = present_count.get((month, group_val), 0)
-        od = od_count.get((month, group_val), 0)
-        shift_hrs = shift_hours_sum.get((month, group_val), 0.0)
-        work_hrs = work_hours_sum.get((month, group_val), 0.0)
-        completed = completed_count.get((month, group_val), 0)
-        completion_pct = round((completed / (present + od) * 100.0), 2) if (present + od) > 0 else 0.0
-        
-        kpi = WorkHourKPI(
-            file_id=file_id,
-            month=month,
-            group_by=group_by,
-            group_value=group_val,
-            members=len(member_set),
-            present=present,
-            od=od,
-            shift_hours=round(shift_hrs, 2),
-            work_hours=round(work_hrs, 2),
-            completed=completed,
-            completion_pct=completion_pct
-        )
-        db.add(kpi)
+    db.commit()
 
 
-def _calculate_work_hour_lost_kpi(db: Session, file_id: int, group_by: str, rows: List[Dict]):
-    """Calculate and store Work Hour Lost KPIs."""
-    key_map = {
-        "function": "Function Name",
-        "company": "Comapny Name",
-        "location": "Job Location",
-    }
-    group_key = key_map.get(group_by)
-    
-    members = defaultdict(set)
-    present_count = defaultdict(int)
-    od_count = defaultdict(int)
-    shift_hours_sum = defaultdict(float)
-    work_hours_sum = defaultdict(float)
-    lost_hours_sum = defaultdict(float)
+class RowKpiValues(NamedTuple):
+    """What one attendance row contributes to the KPIs."""
+    month: str
+    member_id: str
+    flag: str
+    is_present: bool
+    is_od: bool
+    is_late: bool
+    shift_hours: float
+    work_hours: float
+    completed: bool
+    lost_shift_hours: float
+    lost_work_hours: float
+    lost_hours: float
+    is_workday: bool
+
+
+def row_kpi_values(r: Dict[str, Any]) -> RowKpiValues:
+    """Per-row derivations, done once for all KPIs and groupings."""
+    month = _extract_month(str(r.get("Attendance Date", "")))
+    emp_code = str(r.get("Employee Code", "")).strip()
+    emp_name = str(r.get("Name", "")).strip()
+    member_id = emp_code or emp_name
+    flag = str(r.get("Flag", "")).strip()
+    is_present = flag == "P"
+    is_od = flag == "OD"
+    is_late = is_present and str(r.get("Is Late", "")).strip().lower() == "yes"
     
-    for r in rows:
-        if not isinstance(r, dict):
-            continue
-        month = _extract_month(str(r.get("Attendance Date", "")))
-        
-        if group_by == "function":
-            company_name = str(r.get("Comapny Name", "")).strip()
-            function_name = str(r.get("Function Name", "")).strip()
-            company_short = _get_company_short_name(company_name)
-            if company_short and function_name:
-                group_val = f"{company_short} - {function_name}"
-            elif function_name:
-                group_val = function_name
-            else:
-                group_val = company_short or "Unknown"
-        else:
-            group_val = str(r.get(group_key, ""))
-        
-        emp_code = str(r.get("Employee Code", "")).strip()
-        emp_name = str(r.get("Name", "")).strip()
-        member_id = emp_code or emp_name
-        flag = str(r.get("Flag", "")).strip()
-        
-        key = (month, group_val)
-        if member_id:
-            members[key].add(member_id)
-        if flag == "P":
-            present_count[key] += 1
-        if flag == "OD":
-            od_count[key] += 1
-        
-        shift_hrs = _compute_duration_hours(
-            str(r.get("Shift In Time", "")).strip(),
-            str(r.get("Shift Out Time", "")).strip()
-        )
+    shift_hrs = _compute_duration_hours(
+        str(r.get("Shift In Time", "")).strip(),
+        str(r.get("Shift Out Time", "")).strip()
+    )
+    work_hrs = 0.0
+    completed = False
+    lost_shift_hrs = lost_work_hrs = lost_hrs = 0.0
+    if shift_hrs > 0:
         work_hrs = _compute_duration_hours(
             str(r.get("In Time", "")).strip(),
             str(r.get("Out Time", "")).strip()
         )
-        
-        if shift_hrs > 0:
-            shift_hrs = round(shift_hrs, 2)
-            work_hrs = round(work_hrs, 2)
-            shift_hours_sum[key] += shift_hrs
-            work_hours_sum[key] += work_hrs
-            
-            countable_flags = ("P", "OD", "")
-            if flag in countable_flags:
-                if work_hrs > 0:
-                    lost_hrs = max(0.0, shift_hrs - work_hrs)
-                else:
-                    lost_hrs = shift_hrs
+        completed = (is_present or is_od) and work_hrs >= shift_hrs
+        # Lost-hour rule works on values rounded to 2 decimals:
+        # P/OD/blank days lose (shift - work), or the full shift without punches
+        lost_shift_hrs = round(shift_hrs, 2)
+        lost_work_hrs = round(work_hrs, 2)
+        if flag in ("P", "OD", ""):
+            if lost_work_hrs > 0:
+                lost_hrs = max(0.0, lost_shift_hrs - lost_work_hrs)
             else:
-                lost_hrs = 0.0
-            
-            lost_hrs = round(lost_hrs, 2)
-            lost_hours_sum[key] += lost_hrs
+                lost_hrs = lost_shift_hrs
+        lost_hrs = round(lost_hrs, 2)
     
-    # Store results
-    for (month, group_val), member_set in members.items():
-        present = present_count.get((month, group_val), 0)
-        od = od_count.get((month, group_val), 0)
-        shift_hrs = shift_hours_sum.get((month, group_val), 0.0)
-        work_hrs = work_hours_sum.get((month, group_val), 0.0)
-        lost_hrs = lost_hours_sum.get((month, group_val), 0.0)
-        lost_pct = round((lost_hrs / shift_hrs * 100.0), 2) if shift_hrs > 0 else 0.0
-        
-        kpi = WorkHourLostKPI(
-            file_id=file_id,
-            month=month,
-            group_by=group_by,
-            group_value=group_val,
-            members=len(member_set),
-            present=present,
-            od=od,
-            shift_hours=round(shift_hrs, 2),
-            work_hours=round(work_hrs, 2),
-            lost_hours=round(lost_hrs, 2),
-            lost_pct=lost_pct
-        )
-        db.add(kpi)
+    return RowKpiValues(
+        month, member_id, flag, is_present, is_od, is_late,
+        shift_hrs, work_hrs, completed,
+        lost_shift_hrs, lost_work_hrs, lost_hrs,
+        flag in _WORKDAY_FLAGS,
+    )
 
 
-def _calculate_leave_analysis_kpi(db: Session, file_id: int, group_by: str, rows: List[Dict]):
-    """Calculate and store Leave Analysis KPIs."""
-    # This is complex due to adjacency logic - simplified version for now
-    # Full implementation would need the complete adjacency checking logic
-    key_map = {
-        "function": "Function Name",
-        "company": "Comapny Name",
-        "location": "Job Location",
-    }
-    group_key = key_map.get(group_by)
-    
-    members = defaultdict(set)
-    count_sl = defaultdict(int)
-    count_cl = defaultdict(int)
-    count_a = defaultdict(int)
-    count_workdays = defaultdict(int)
+def _accumulate(rows: List[Dict]) -> Dict[Tuple[str, str, str], _KpiAccumulator]:
+    """Single pass over a file's rows feeding every (group_by, month, group) accumulator."""
+    accumulators: Dict[Tuple[str, str, str], _KpiAccumulator] = {}
     
     for r in rows:
         if not isinstance(r, dict):
             continue
-        month = _extract_month(str(r.get("Attendance Date", "")))
-        
-        if group_by == "function":
-            company_name = str(r.get("Comapny Name", "")).strip()
-            function_name = str(r.get("Function Name", "")).strip()
-            company_short = _get_company_short_name(company_name)
-            if company_short and function_name:
-                group_val = f"{company_short} - {function_name}"
-            elif function_name:
-                group_val = function_name
-            else:
-                group_val = company_short or "Unknown"
-        else:
-            group_val = str(r.get(group_key, ""))
-        
-        emp_code = str(r.get("Employee Code", "")).strip()
-        emp_name = str(r.get("Name", "")).strip()
-        member_id = emp_code or emp_name
-        flag = str(r.get("Flag", "")).strip()
+        (month, member_id, flag, is_present, is_od, is_late,
+         shift_hrs, work_hrs, completed,
+         lost_shift_hrs, lost_work_hrs, lost_hrs, is_workday) = row_kpi_values(r)
         
-        key = (month, group_val)
-        if member_id:
-            members[key].add(member_id)
-        
-        # Count flags for workdays
-        if flag in ["A", "CL", "EL", "OD", "P", "SL", "WHF"]:
-            count_workdays[key] += 1
-        if flag == "SL":
-            count_sl[key] += 1
-        if flag == "CL":
-            count_cl[key] += 1
-        if flag == "A":
-            count_a[key] += 1
+        for group_by, group_val in zip(GROUP_BYS, group_values(r)):
+            key = (group_by, month, group_val)
+            acc = accumulators.get(key)
+            if acc is None:
+                acc = accumulators[key] = _KpiAccumulator()
+            
+            if member_id:
+                acc.members.add(member_id)
+            if is_present:
+                acc.present += 1
+                if is_late:
+                    acc.late += 1
+            elif is_od:
+                acc.od += 1
+            if shift_hrs > 0:
+                acc.shift_hours += shift_hrs
+                acc.work_hours += work_hrs
+                if completed:
+                    acc.completed += 1
+                acc.lost_shift_hours += lost_shift_hrs
+                acc.lost_work_hours += lost_work_hrs
+                acc.lost_hours += lost_hrs
+            if is_workday:
+                acc.workdays += 1
+                if flag == "SL":
+                    acc.sl += 1
+                elif flag == "CL":
+                    acc.cl += 1
+                elif flag == "A":
+                    acc.a += 1
     
-    # Store simplified results (adjacency calculation would need full logic)
-    for (month, group_val), member_set in members.items():
-        kpi = LeaveAnalysisKPI(
-            file_id=file_id,
-            month=month,
-            group_by=group_by,
-            group_value=group_val,
-            members=len(member_set),
-            total_sl=count_sl.get((month, group_val), 0),
-            total_cl=count_cl.get((month, group_val), 0),
-            workdays=count_workdays.get((month, group_val), 0),
-            total_a=count_a.get((month, group_val), 0),
-            sl_adjacent_w=0,  # Would need full adjacency logic
-            cl_adjacent_w=0,
-            sl_adjacent_h=0,
-            cl_adjacent_h=0,
-            sl_pct=0.0,
-            cl_pct=0.0,
-            a_pct=round((count_a.get((month, group_val), 0) / count_workdays.get((month, group_val), 1) * 100.0), 2) if count_workdays.get((month, group_val), 0) > 0 else 0.0
-        )
-        db.add(kpi)
+    return accumulators
+
+
+def rebuild_all_file_kpis(db: Session) -> Tuple[int, int]:
+    """
+    Recalculate the per-file KPI tables and the cross-file rollups for every
+    uploaded file.
+
+    The new generation is built in shadow tables and swapped in at the end, so
+    dashboards keep reading the previous complete generation meanwhile.
+    Returns ``(total_files, calculated_files)``.
+    """
+    shadows = create_shadow_tables(db, KPI_MODELS + ROLLUP_MODELS)
+
+    seen = set()
+    calculated_count = 0
+    while True:
+        # Loop until no new files appear, so uploads made during the rebuild
+        # are part of the generation being swapped in
+        file_ids = db.execute(select(UploadedFile.id).order_by(UploadedFile.id)).scalars().all()
+        pending = [fid for fid in file_ids if fid not in seen]
+        if not pending:
+            break
+        for file_id in pending:
+            seen.add(file_id)
+            try:
+                calculate_kpis_for_file(db, file_id, shadows)
+                calculated_count += 1
+            except Exception as e:
+                print(f"Error calculating KPIs for file {file_id}: {e}")
+                db.rollback()
 
+    build_rollups(db, shadows)
+    swap_shadow_tables(db, shadows)
+    return len(seen), calculated_count
@@ -0,0 +1,252 @@
+"""Incremental maintenance of the cross-file KPI rollups.
+
+The per-file KPI tables hold additive counters per (file, group_by, month,
+group). The rollup tables hold the same counters summed across all files and
+are kept current by applying a single file's counters as a delta:
+
+* on upload the new file's counters are added (``apply_file``)
+* on delete the removed files' counters are subtracted (``remove_files``)
+
+Distinct member counts are not additive, so for every touched key they are
+recounted exactly from ``kpi_member``; percentages are then re-derived from the
+summed counters. Cost scales with the keys a file touches, not with history.
+"""
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Table, delete, distinct, func, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models_kpi import (
+    OnTimeKPI, WorkHourKPI, WorkHourLostKPI, LeaveAnalysisKPI, KPIMember,
+    OnTimeRollup, WorkHourRollup, WorkHourLostRollup, LeaveAnalysisRollup,
+)
+from .dataset_version import KPI, bump_version
+
+Key = Tuple[str, str, str]  # (group_by, month, group_value)
+
+# Keys per IN (...) clause when reading/updating touched rollup rows
+_KEY_CHUNK = 200
+
+
+def _number(value: Any) -> Any:
+    """Normalize SUM() results (MySQL returns Decimal) to int/float."""
+    if value is None:
+        return 0
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+
+def _pct(numerator: float, denominator: float) -> float:
+    return round((numerator / denominator * 100.0), 2) if denominator > 0 else 0.0
+
+
+def _derive_on_time(v: Dict[str, Any]) -> Dict[str, Any]:
+    on_time = v["present"] - v["late"]
+    return {"on_time": on_time, "on_time_pct": _pct(on_time, v["present"])}
+
+
+def _derive_work_hour(v: Dict[str, Any]) -> Dict[str, Any]:
+    return {"completion_pct": _pct(v["completed"], v["present"] + v["od"])}
+
+
+def _derive_work_hour_lost(v: Dict[str, Any]) -> Dict[str, Any]:
+    return {"lost_pct": _pct(v["lost_hours"], v["shift_hours"])}
+
+
+def _derive_leave_analysis(v: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "sl_pct": _pct(v["sl_adjacent_w"] + v["sl_adjacent_h"], v["total_sl"]),
+        "cl_pct": _pct(v["cl_adjacent_w"], v["total_cl"]),
+        "a_pct": _pct(v["total_a"], v["workdays"]),
+    }
+
+
+# kind -> (per-file model, rollup model, additive columns, derived-column function)
+ROLLUPS: Dict[str, Tuple[type, type, Tuple[str, ...], Callable[[Dict[str, Any]], Dict[str, Any]]]] = {
+    "on_time": (OnTimeKPI, OnTimeRollup, ("present", "late"), _derive_on_time),
+    "work_hour": (
+        WorkHourKPI, WorkHourRollup,
+        ("present", "od", "shift_hours", "work_hours", "completed"),
+        _derive_work_hour,
+    ),
+    "work_hour_lost": (
+        WorkHourLostKPI, WorkHourLostRollup,
+        ("present", "od", "shift_hours", "work_hours", "lost_hours"),
+        _derive_work_hour_lost,
+    ),
+    "leave_analysis": (
+        LeaveAnalysisKPI, LeaveAnalysisRollup,
+        ("total_sl", "total_cl", "workdays", "total_a",
+         "sl_adjacent_w", "cl_adjacent_w", "sl_adjacent_h", "cl_adjacent_h"),
+        _derive_leave_analysis,
+    ),
+}
+
+ROLLUP_MODELS = tuple(rollup for _, rollup, _, _ in ROLLUPS.values())
+
+
+def _key_columns(table: Table):
+    return table.c.group_by, table.c.month, table.c.group_value
+
+
+def _chunks(keys: List[Key]) -> Iterable[List[Key]]:
+    for start in range(0, len(keys), _KEY_CHUNK):
+        yield keys[start:start + _KEY_CHUNK]
+
+
+def _file_deltas(db: Session, per_file: Table, additive: Tuple[str, ...], file_ids: List[int]) -> Dict[Key, Dict[str, Any]]:
+    """Sum the additive counters of the given files per key."""
+    stmt = (
+        select(*_key_columns(per_file), *[func.sum(per_file.c[col]).label(col) for col in additive])
+        .where(per_file.c.file_id.in_(file_ids))
+        .group_by(*_key_columns(per_file))
+    )
+    return {
+        (r.group_by, r.month, r.group_value): {col: _number(getattr(r, col)) for col in additive}
+        for r in db.execute(stmt).all()
+    }
+
+
+def _apply_deltas(db: Session, rollup: Table, additive: Tuple[str, ...], deltas: Dict[Key, Dict[str, Any]], sign: int):
+    """Atomically add (sign=1) or subtract (sign=-1) per-key counters."""
+    for (group_by, month, group_value), values in deltas.items():
+        where = (
+            (rollup.c.group_by == group_by)
+            & (rollup.c.month == month)
+            & (rollup.c.group_value == group_value)
+        )
+        increments = {col: rollup.c[col] + sign * values[col] for col in additive}
+        result = db.execute(update(rollup).where(where).values(**increments))
+        if result.rowcount or sign < 0:
+            continue
+        try:
+            with db.begin_nested():
+                db.execute(insert(rollup).values(group_by=group_by, month=month, group_value=group_value, **values))
+        except IntegrityError:
+            # Another upload created the key concurrently; fall back to incrementing it
+            db.execute(update(rollup).where(where).values(**increments))
+
+
+def _count_members(db: Session, keys: List[Key]) -> Dict[Key, int]:
+    member = KPIMember.__table__
+    counts: Dict[Key, int] = {}
+    for chunk in _chunks(keys):
+        stmt = (
+            select(*_key_columns(member), func.count(distinct(member.c.member_id)))
+            .where(tuple_(*_key_columns(member)).in_(chunk))
+            .group_by(*_key_columns(member))
+        )
+        for group_by, month, group_value, count in db.execute(stmt).all():
+            counts[(group_by, month, group_value)] = count
+    return counts
+
+
+def _refresh_keys(db: Session, keys: Set[Key]):
+    """Recount members exactly and re-derive percentages for the touched keys."""
+    if not keys:
+        return
+    keys = sorted(keys)
+    members = _count_members(db, keys)
+
+    for _, rollup_model, additive, derive in ROLLUPS.values():
+        rollup = rollup_model.__table__
+        for chunk in _chunks(keys):
+            rows = db.execute(select(rollup).where(tuple_(*_key_columns(rollup)).in_(chunk))).all()
+            for row in rows:
+                count = members.get((row.group_by, row.month, row.group_value), 0)
+                if count == 0:
+                    # No file contributes to this key any more
+                    db.execute(delete(rollup).where(rollup.c.id == row.id))
+                    continue
+                # Round away float drift from repeated add/subtract
+                values = {col: round(getattr(row, col), 2) for col in additive}
+                values["members"] = count
+                values.update(derive(values))
+                db.execute(update(rollup).where(rollup.c.id == row.id).values(**values))
+
+
+def apply_file(db: Session, file_id: int):
+    """Add one file's per-file KPIs to the rollups (run after calculate_kpis_for_file)."""
+    touched: Set[Key] = set()
+    for per_file, rollup, additive, _ in ROLLUPS.values():
+        deltas = _file_deltas(db, per_file.__table__, additive, [file_id])
+        _apply_deltas(db, rollup.__table__, additive, deltas, sign=1)
+        touched.update(deltas)
+    _refresh_keys(db, touched)
+    bump_version(db, KPI)
+    db.commit()
+
+
+def remove_files(db: Session, file_ids: List[int]):
+    """
+    Subtract the given files from the rollups before they are deleted.
+    Runs inside the caller's transaction; the caller deletes the files and commits.
+    """
+    if not file_ids:
+        return
+    touched: Set[Key] = set()
+    for per_file, rollup, additive, _ in ROLLUPS.values():
+        deltas = _file_deltas(db, per_file.__table__, additive, file_ids)
+        _apply_deltas(db, rollup.__table__, additive, deltas, sign=-1)
+        touched.update(deltas)
+    db.execute(delete(KPIMember).where(KPIMember.file_id.in_(file_ids)))
+    _refresh_keys(db, touched)
+
+
+def build_rollups(db: Session, tables: Optional[Dict[type, Table]] = None):
+    """
+    Populate the rollup tables from scratch out of the per-file KPI and member
+    tables. ``tables`` (model -> Table) redirects reads and writes, e.g. to the
+    shadow tables of a full rebuild.
+    """
+    tables = tables or {}
+    member = tables.get(KPIMember, KPIMember.__table__)
+    members = {
+        (r[0], r[1], r[2]): r[3]
+        for r in db.execute(
+            select(*_key_columns(member), func.count(distinct(member.c.member_id)))
+            .group_by(*_key_columns(member))
+        ).all()
+    }
+
+    for per_file_model, rollup_model, additive, derive in ROLLUPS.values():
+        per_file = tables.get(per_file_model, per_file_model.__table__)
+        rollup = tables.get(rollup_model, rollup_model.__table__)
+        stmt = (
+            select(*_key_columns(per_file), *[func.sum(per_file.c[col]).label(col) for col in additive])
+            .group_by(*_key_columns(per_file))
+        )
+        to_insert = []
+        for r in db.execute(stmt).all():
+            count = members.get((r.group_by, r.month, r.group_value), 0)
+            if count == 0:
+                continue
+            values = {col: round(_number(getattr(r, col)), 2) for col in additive}
+            values.update(group_by=r.group_by, month=r.month, group_value=r.group_value, members=count)
+            values.update(derive(values))
+            to_insert.append(values)
+        db.execute(delete(rollup))
+        if to_insert:
+            db.execute(insert(rollup), to_insert)
+    db.commit()
+
+
+def get_rollup(db: Session, kind: str, group_by: str) -> List[Dict[str, Any]]:
+    """Read the maintained rollup of one KPI for a grouping, sorted by month then group."""
+    if kind not in ROLLUPS:
+        raise ValueError("Invalid KPI kind")
+    rollup = ROLLUPS[kind][1].__table__
+    rows = db.execute(
+        select(rollup)
+        .where(rollup.c.group_by == group_by)
+        .order_by(rollup.c.month, rollup.c.group_value)
+    ).mappings().all()
+    results = []
+    for row in rows:
+        item = {"month": row["month"], "group": row["group_value"]}
+        item.update({k: v for k, v in row.items() if k not in ("id", "month", "group_by", "group_value")})
+        results.append(item)
+    return results
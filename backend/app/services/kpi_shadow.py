@@ -0,0 +1,88 @@
+"""Shadow-table rebuilds for the pre-calculated KPI tables.
+
+A full rebuild never touches the live tables row by row. It writes a complete
+new generation into ``<table>__shadow`` copies and then switches over:
+
+* MySQL: one multi-table ``RENAME TABLE`` statement swaps every shadow in
+  atomically, and the previous generation is thrown away with ``DROP TABLE``
+  instead of a large ``DELETE`` (no undo-log bloat).
+* Other dialects: the live rows are replaced from the shadow inside a single
+  transaction, which readers also observe as one switch.
+
+Readers therefore always see either the old or the new generation, never an
+empty or half-written table.
+"""
+from typing import Dict, Iterable
+
+from sqlalchemy import MetaData, Table, delete, insert, select, text
+from sqlalchemy.orm import Session
+
+from ..db import is_mysql
+
+SHADOW_SUFFIX = "__shadow"
+RETIRED_SUFFIX = "__old"
+
+
+def create_shadow_tables(db: Session, models: Iterable[type]) -> Dict[type, Table]:
+    """(Re)create an empty shadow table per model and return ``{model: shadow_table}``."""
+    mysql = is_mysql(db)
+    metadata = MetaData()
+    shadows: Dict[type, Table] = {}
+
+    for model in models:
+        live: Table = model.__table__
+        # Foreign-key targets must live in the same MetaData to emit the DDL
+        for fk in live.foreign_keys:
+            target = fk.column.table
+            if target.name not in metadata.tables:
+                target.to_metadata(metadata)
+
+        shadow = live.to_metadata(metadata, name=live.name + SHADOW_SUFFIX)
+        if not mysql:
+            # Index names are schema-wide outside MySQL and the shadow is only a
+            # staging area there (rows are copied into the live table on swap).
+            shadow.indexes.clear()
+
+        connection = db.connection()
+        shadow.drop(connection, checkfirst=True)
+        shadow.create(connection)
+        shadows[model] = shadow
+
+    db.commit()
+    return shadows
+
+
+def swap_shadow_tables(db: Session, shadows: Dict[type, Table]) -> None:
+    """Make the shadow tables live and discard the previous generation."""
+    if not shadows:
+        return
+
+    if is_mysql(db):
+        renames = []
+        retired = []
+        for model, shadow in shadows.items():
+            live_name = model.__table__.name
+            old_name = live_name + RETIRED_SUFFIX
+            renames.append(f"`{live_name}` TO `{old_name}`")
+            renames.append(f"`{shadow.name}` TO `{live_name}`")
+            retired.append(f"`{old_name}`")
+
+        retired_sql = ", ".join(retired)
+        db.execute(text(f"DROP TABLE IF EXISTS {retired_sql}"))
+        # A single RENAME TABLE statement is atomic across all listed tables
+        db.execute(text("RENAME TABLE " + ", ".join(renames)))
+        db.execute(text(f"DROP TABLE {retired_sql}"))
+        db.commit()
+        return
+
+    for model, shadow in shadows.items():
+        live: Table = model.__table__
+        columns = [c.name for c in shadow.columns]
+        db.execute(delete(live))
+        db.execute(insert(live).from_select(columns, select(*[shadow.c[name] for name in columns])))
+    db.commit()
+
+    connection = db.connection()
+    for shadow in shadows.values():
+        shadow.drop(connection, checkfirst=True)
+    db.commit()
@@ -6,6 +6,7 @@ from sqlalchemy import select
 from collections import defaultdict
 import re
 
+from ..metrics import observe_aggregation
 from ..models import UploadedRow
 
 
@@ -80,6 +81,12 @@ def _is_consecutive_day(date1: tuple, date2: tuple) -> bool:
 
 
 def compute_leave_analysis(db: Session, group_by: str) -> List[Dict[str, Any]]:
+    rows = db.execute(select(UploadedRow.data)).scalars().all()
+    return aggregate_leave_analysis(rows, group_by)
+
+
+@observe_aggregation("leave_analysis")
+def aggregate_leave_analysis(rows: List[Any], group_by: str) -> List[Dict[str, Any]]:
     """Compute Leave Analysis KPIs based on adjacency rules."""
     key_map = {
         "function": "Function Name",
@@ -95,9 +102,6 @@ def compute_leave_analysis(db: Session, group_by: str) -> List[Dict[str, Any]]:
     group_key = key_map.get(group_by)
     if not group_key:
         raise ValueError("Invalid group_by")
-
-    # Fetch all rows
-    rows = db.execute(select(UploadedRow.data)).scalars().all()
     
     # Organize data by employee for adjacency checking
     emp_data = defaultdict(list)
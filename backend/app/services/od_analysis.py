@@ -5,6 +5,7 @@ from sqlalchemy import select
 from collections import defaultdict
 import re
 
+from ..metrics import observe_aggregation
 from ..models import UploadedRow
 
 
@@ -44,10 +45,13 @@ def _extract_month(date_str: str) -> str:
 
 
 def compute_od_analysis(db: Session, group_by: str) -> List[Dict[str, Any]]:
-    """Compute OD Analysis KPIs."""
-    # Fetch all rows
     rows = db.execute(select(UploadedRow.data)).scalars().all()
-    
+    return aggregate_od_analysis(rows, group_by)
+
+
+@observe_aggregation("od_analysis")
+def aggregate_od_analysis(rows: List[Any], group_by: str) -> List[Dict[str, Any]]:
+    """Compute OD Analysis KPIs."""
     if group_by == "function":
         # Function-wise aggregation (with Company Name - Function Name format)
         members = defaultdict(set)
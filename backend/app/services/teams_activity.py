@@ -0,0 +1,105 @@
+"""Typed Teams user activity facts.
+
+Every uploaded Teams row is also stored in ``teams_activity_fact`` with the
+ten metric counts parsed to integers once, at upload (``write_facts``).
+Analytics then sum integer columns in SQL instead of parsing JSON strings
+per request. Files uploaded before the table existed are backfilled at
+startup (``backfill_facts``).
+"""
+from typing import Iterable, List
+
+from sqlalchemy import exists, insert, select
+from sqlalchemy.orm import Session
+
+from ..models import TeamsActivityFact, TeamsUploadedFile, TeamsUploadedRow
+
+# (response metric name, Teams user activity export column, fact column)
+TEAMS_METRICS = (
+    ('Team Chat', 'Team Chat Message Count', 'team_chat'),
+    ('Private Chat', 'Private Chat Message Count', 'private_chat'),
+    ('Calls', 'Call Count', 'calls'),
+    ('Meetings Org', 'Meetings Organized Count', 'meetings_organized'),
+    ('Meetings Att', 'Meetings Attended Count', 'meetings_attended'),
+    ('One-time Org', 'Scheduled One-time Meetings Organized Count', 'one_time_organized'),
+    ('One-time Att', 'Scheduled One-time Meetings Attended Count', 'one_time_attended'),
+    ('Recurring Org', 'Scheduled Recurring Meetings Organized Count', 'recurring_organized'),
+    ('Recurring Att', 'Scheduled Recurring Meetings Attended Count', 'recurring_attended'),
+    ('Post Messages', 'Post Messages', 'post_messages'),
+)
+
+# Fact rows per multi-row INSERT
+_CHUNK = 1000
+
+
+def to_int(value) -> int:
+    try:
+        return int(value or 0)
+    except (ValueError, TypeError):
+        return 0
+
+
+def metric_columns() -> List:
+    """The fact metric columns in TEAMS_METRICS order."""
+    return [getattr(TeamsActivityFact, attr) for _, _, attr in TEAMS_METRICS]
+
+
+def fact_row(data: dict, file: TeamsUploadedFile) -> dict:
+    upn = data.get('User Principal Name')
+    fact = {
+        'file_id': file.id,
+        'user_principal_name': upn,
+        'email': (upn or '').strip().lower(),
+        'from_month': file.from_month,
+        'to_month': file.to_month,
+    }
+    for _, column, attr in TEAMS_METRICS:
+        fact[attr] = to_int(data.get(column))
+    return fact
+
+
+def write_facts(db: Session, file: TeamsUploadedFile, rows: Iterable[dict]) -> int:
+    """
+    Insert the facts for one uploaded file's rows, in file order.
+    Runs inside the caller's transaction; the caller commits.
+    """
+    count = 0
+    chunk = []
+    for data in rows:
+        chunk.append(fact_row(data, file))
+        if len(chunk) >= _CHUNK:
+            db.execute(insert(TeamsActivityFact), chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        db.execute(insert(TeamsActivityFact), chunk)
+        count += len(chunk)
+    return count
+
+
+def backfill_facts():
+    """Write facts for Teams files uploaded before the fact table existed (startup task)."""
+    from ..db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        missing = db.execute(
+            select(TeamsUploadedFile)
+            .where(~exists().where(TeamsActivityFact.file_id == TeamsUploadedFile.id))
+            .where(exists().where(TeamsUploadedRow.file_id == TeamsUploadedFile.id))
+            .order_by(TeamsUploadedFile.id)
+        ).scalars().all()
+        for file in missing:
+            # Read the file's rows fully before inserting on the same connection
+            rows = db.execute(
+                select(TeamsUploadedRow.data)
+                .where(TeamsUploadedRow.file_id == file.id)
+                .order_by(TeamsUploadedRow.id)
+            ).scalars().all()
+            count = write_facts(db, file, rows)
+            db.commit()
+            print(f"✓ Teams activity facts backfilled for {file.filename} ({count} rows)")
+    except Exception as e:
+        print(f"⚠ Error backfilling Teams activity facts: {e}")
+        db.rollback()
+    finally:
+        db.close()
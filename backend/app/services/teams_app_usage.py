@@ -0,0 +1,82 @@
+"""Typed Teams App Usage facts.
+
+Every uploaded Teams App Usage row with an app name is also stored in
+``teams_app_usage_fact`` with its counts parsed to integers once, at upload
+(``write_app_facts``), so the app ranking is a GROUP BY in SQL. Files
+uploaded before the table existed are backfilled at startup
+(``backfill_app_facts``).
+"""
+from typing import Iterable
+
+from sqlalchemy import exists, insert, select
+from sqlalchemy.orm import Session
+
+from ..models import TeamsAppUploadedFile, TeamsAppUploadedRow, TeamsAppUsageFact
+from .teams_activity import to_int
+
+# Fact rows per multi-row INSERT
+_CHUNK = 1000
+
+
+def app_fact_row(data: dict, file_id: int):
+    """Fact row for one Teams App Usage row, or None when it has no app name."""
+    app_name = (data.get('App Name') or '').strip()
+    if not app_name:
+        return None
+    return {
+        'file_id': file_id,
+        'app_name': app_name,
+        'team_using_app': to_int(data.get('Team Using App')),
+        'users_using_app': to_int(data.get('Users Using App')),
+    }
+
+
+def write_app_facts(db: Session, file_id: int, rows: Iterable[dict]) -> int:
+    """
+    Insert the facts for one uploaded file's rows.
+    Runs inside the caller's transaction; the caller commits.
+    """
+    count = 0
+    chunk = []
+    for data in rows:
+        fact = app_fact_row(data, file_id)
+        if fact is None:
+            continue
+        chunk.append(fact)
+        if len(chunk) >= _CHUNK:
+            db.execute(insert(TeamsAppUsageFact), chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        db.execute(insert(TeamsAppUsageFact), chunk)
+        count += len(chunk)
+    return count
+
+
+def backfill_app_facts():
+    """Write facts for Teams App Usage files uploaded before the fact table existed (startup task)."""
+    from ..db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        missing = db.execute(
+            select(TeamsAppUploadedFile.id, TeamsAppUploadedFile.filename)
+            .where(~exists().where(TeamsAppUsageFact.file_id == TeamsAppUploadedFile.id))
+            .where(exists().where(TeamsAppUploadedRow.file_id == TeamsAppUploadedFile.id))
+            .order_by(TeamsAppUploadedFile.id)
+        ).all()
+        for file_id, filename in missing:
+            # Read the file's rows fully before inserting on the same connection
+            rows = db.execute(
+                select(TeamsAppUploadedRow.data)
+                .where(TeamsAppUploadedRow.file_id == file_id)
+                .order_by(TeamsAppUploadedRow.id)
+            ).scalars().all()
+            count = write_app_facts(db, file_id, rows)
+            db.commit()
+            print(f"✓ Teams app usage facts backfilled for {filename} ({count} rows)")
+    except Exception as e:
+        print(f"⚠ Error backfilling Teams app usage facts: {e}")
+        db.rollback()
+    finally:
+        db.close()
@@ -1,46 +1,75 @@
-"""Parser for MS Teams User Activity CSV files."""
+"""Parser for MS Teams User Activity CSV files.
+
+The file is read as a stream: the encoding is sniffed from the first block,
+text is decoded incrementally by ``io.TextIOWrapper`` while ``csv`` reads it,
+and rows come out in batches, so memory stays at about one batch regardless
+of the file size.
+"""
+import codecs
 import csv
 import io
-from typing import List, Tuple, Dict, Any
-from fastapi import UploadFile
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+
+# Rows per batch handed to the insert path
+BATCH_SIZE = 1000
 
+# Bytes inspected to pick the encoding
+SNIFF_BYTES = 64 * 1024
 
-async def parse_teams_file(uploaded_file: UploadFile) -> Tuple[List[str], List[Dict[str, Any]]]:
+
+def sniff_encoding(head: bytes) -> str:
     """
-    Parse MS Teams CSV file and return headers and rows.
-    
-    Returns:
-        Tuple of (headers, rows) where rows is a list of dicts with original casing
+    Encoding for a file starting with ``head``: from its BOM when it has one,
+    otherwise UTF-8 if the block decodes as UTF-8, else latin-1.
     """
-    content = await uploaded_file.read()
-    
-    # Try UTF-8 first, then fall back to other encodings
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
     try:
-        text = content.decode('utf-8')
+        # Not final: the block may end inside a multi-byte character
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8'
     except UnicodeDecodeError:
-        try:
-            text = content.decode('utf-8-sig')  # UTF-8 with BOM
-        except UnicodeDecodeError:
-            text = content.decode('latin-1')  # Fallback
-    
-    # Parse CSV
-    reader = csv.DictReader(io.StringIO(text))
-    
+        return 'latin-1'
+
+
+def read_teams_csv(fileobj: BinaryIO, encoding: str,
+                   batch_size: int = BATCH_SIZE) -> Tuple[List[str], Iterator[List[Dict[str, Any]]]]:
+    """
+    Read a Teams CSV from a binary file object positioned at its start.
+
+    Returns:
+        Tuple of (headers, batches) where batches yields lists of row dicts with
+        original header casing and string values. A UTF-8 decode error past the
+        sniffed block is raised from the batches iterator.
+    """
+    text = io.TextIOWrapper(fileobj, encoding=encoding, newline='')
+    reader = csv.DictReader(text)
+
     # Get headers (preserve original casing and order)
     headers = reader.fieldnames
     if not headers:
+        text.detach()
         raise ValueError("CSV file has no headers")
-    
-    # Parse all rows
-    rows_data = []
-    for row in reader:
-        # Convert row to dict, preserving original header names
-        row_dict = {}
-        for header in headers:
-            value = row.get(header, '')
-            # Store as string, preserving original value
-            row_dict[header] = str(value) if value is not None else ''
-        rows_data.append(row_dict)
-    
-    return list(headers), rows_data
+    headers = list(headers)
+
+    def batches():
+        try:
+            batch = []
+            for row in reader:
+                # Store as string, preserving original value
+                batch.append({
+                    header: str(row[header]) if row.get(header) is not None else ''
+                    for header in headers
+                })
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        finally:
+            # Leave the underlying file open (the caller may rewind and retry)
+            text.detach()
 
+    return headers, batches()
@@ -6,6 +6,7 @@ from sqlalchemy import select
 from collections import defaultdict
 import re
 
+from ..metrics import observe_aggregation
 from ..models import UploadedRow
 
 
@@ -71,6 +72,12 @@ def _compute_duration_hours(start_str: str, end_str: str) -> float:
 
 
 def compute_work_hour_completion(db: Session, group_by: str) -> List[Dict[str, Any]]:
+    rows = db.execute(select(UploadedRow.data)).scalars().all()
+    return aggregate_work_hour_completion(rows, group_by)
+
+
+@observe_aggregation("work_hour")
+def aggregate_work_hour_completion(rows: List[Any], group_by: str) -> List[Dict[str, Any]]:
     key_map = {
         "function": "Function Name",
         "company": "Comapny Name",
@@ -86,8 +93,6 @@ def compute_work_hour_completion(db: Session, group_by: str) -> List[Dict[str, A
     if not group_key:
         raise ValueError("Invalid group_by")
 
-    rows = db.execute(select(UploadedRow.data)).scalars().all()
-
     members = defaultdict(set)
     present_count = defaultdict(int)
     od_count = defaultdict(int)
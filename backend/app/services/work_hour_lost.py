@@ -7,6 +7,7 @@ from collections import defaultdict
 import re
 from datetime import datetime
 
+from ..metrics import observe_aggregation
 from ..models import UploadedRow
 
 
@@ -91,6 +92,12 @@ def _compute_duration_hours(start_str: str, end_str: str) -> float:
 
 
 def compute_work_hour_lost(db: Session, group_by: str) -> List[Dict[str, Any]]:
+    rows = db.execute(select(UploadedRow.data)).scalars().all()
+    return aggregate_work_hour_lost(rows, group_by)
+
+
+@observe_aggregation("work_hour_lost")
+def aggregate_work_hour_lost(rows: List[Any], group_by: str) -> List[Dict[str, Any]]:
     key_map = {
         "function": "Function Name",
         "company": "Comapny Name",
@@ -106,8 +113,6 @@ def compute_work_hour_lost(db: Session, group_by: str) -> List[Dict[str, Any]]:
     if not group_key:
         raise ValueError("Invalid group_by")
 
-    rows = db.execute(select(UploadedRow.data)).scalars().all()
-
     members = defaultdict(set)
     present_count = defaultdict(int)
     od_count = defaultdict(int)
@@ -0,0 +1,145 @@
+"""Benchmarks for the analytics services and the upload parser.
+
+Run from ``backend/``:
+    python -m benchmarks run --sizes 10000,100000 --out bench.json
+    python -m benchmarks run --database-url mysql+pymysql://root:@localhost:3310/attendance_bench --allow-reset
+    python -m benchmarks compare baseline.json bench.json --threshold 0.15
+
+Each size is a synthetic dataset of about that many attendance rows, uploaded
+as one file per month. SQLite datasets are cached in ``benchmarks/.data``; a
+``--database-url`` database has its uploaded attendance replaced for every size,
+so only point it at a throwaway database. Every case runs in its own process
+and reports wall time (median of ``--repeat`` runs after ``--warmup``), rows
+per second and peak RSS.
+"""
+import argparse
+import json
+import sys
+
+from .runner import compare, environment, run_case, run_case_in_process
+
+
+def _run(args) -> int:
+    from .cases import CASES
+    from .datasets import (
+        dataset_info, ensure_sqlite_dataset, ensure_upload_files, load_dataset, make_engine,
+    )
+
+    if args.database_url and not args.database_url.startswith("sqlite") and not args.allow_reset:
+        print("Refusing to replace uploaded attendance in a non-SQLite database without --allow-reset")
+        return 2
+
+    names = args.cases.split(",") if args.cases else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        print(f"Unknown cases: {', '.join(unknown)}. Available: {', '.join(CASES)}")
+        return 2
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    report = {"environment": environment(), "settings": vars(args).copy(), "results": []}
+    report["settings"].pop("func", None)
+    report["settings"]["database_url"] = (args.database_url or "sqlite").split("@")[-1]
+
+    for size in sizes:
+        if args.database_url:
+            engine = make_engine(args.database_url)
+            print(f"Loading ~{size} rows into {engine.dialect.name}...", file=sys.stderr)
+            load_dataset(engine, size, args.months)
+            dataset = dataset_info(engine)
+            engine.dispose()
+            url = args.database_url
+        else:
+            print(f"Preparing SQLite dataset of ~{size} rows...", file=sys.stderr)
+            url = ensure_sqlite_dataset(size, args.months)
+            engine = make_engine(url)
+            dataset = dataset_info(engine)
+            engine.dispose()
+        files = ensure_upload_files(size, args.months) if any(CASES[n].needs_files for n in names) else None
+
+        for name in names:
+            result = run_case(name, url, args.group_by, args.repeat, args.warmup, files, dataset)
+            result["size"] = size
+            report["results"].append(result)
+            if "error" in result:
+                print(f"  {name:<32} size={size:<8} ERROR {result['error']}", file=sys.stderr)
+            else:
+                print(
+                    f"  {name:<32} size={size:<8} {result['wall_seconds']['median']:>9.4f}s "
+                    f"{result['rows_per_second'] or 0:>12,.0f} rows/s  peak {result['peak_rss_mb']} MB",
+                    file=sys.stderr,
+                )
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"✓ Results written to {args.out}", file=sys.stderr)
+    else:
+        print(text)
+    return 1 if any("error" in r for r in report["results"]) else 0
+
+
+def _compare(args) -> int:
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold, args.rss_threshold)
+    if not rows:
+        print("No common (case, size) results to compare")
+        return 2
+    print(f"{'case':<32} {'size':>8} {'baseline':>10} {'current':>10} {'ratio':>7} {'rss MB':>15}  flags")
+    for r in rows:
+        rss = f"{r['baseline_rss_mb']}->{r['current_rss_mb']}"
+        print(
+            f"{r['case']:<32} {r['size']:>8} {r['baseline_s']:>9.4f}s {r['current_s']:>9.4f}s "
+            f"{r['time_ratio'] or 0:>7.3f} {rss:>15}  {', '.join(r['flags'])}"
+        )
+    regressions = [r for r in rows if r["regression"]]
+    print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%} time / {args.rss_threshold:.0%} memory")
+    return 1 if regressions else 0
+
+
+def _child(args) -> int:
+    params = json.loads(sys.stdin.read())
+    result = run_case_in_process(
+        params["case"], params["database_url"], params["group_by"], params["repeat"], params["warmup"],
+        params["files"], params["dataset"],
+    )
+    print(json.dumps(result))
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run benchmark cases across dataset sizes")
+    run.add_argument("--sizes", default="10000,50000", help="Comma-separated attendance row counts")
+    run.add_argument("--months", type=int, default=3, help="Months per dataset (one uploaded file each)")
+    run.add_argument("--cases", help="Comma-separated case names (default: all)")
+    run.add_argument("--group-by", default="function", choices=("function", "company", "location"))
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--warmup", type=int, default=1)
+    run.add_argument("--database-url", help="Benchmark against this database instead of SQLite")
+    run.add_argument("--allow-reset", action="store_true", help="Allow replacing data in --database-url")
+    run.add_argument("--out", help="Write the JSON report here (default: stdout)")
+    run.set_defaults(func=_run)
+
+    cmp = sub.add_parser("compare", help="Compare a report against a saved baseline")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown of the median (0.15 = 15%%)")
+    cmp.add_argument("--rss-threshold", type=float, default=0.25, help="Allowed growth of peak RSS")
+    cmp.set_defaults(func=_compare)
+
+    child = sub.add_parser("_child")
+    child.set_defaults(func=_child)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Benchmark cases: one callable per service, returning the number of rows processed.
+
+Each case gets ``(ctx, setup)``: ``ctx`` holds the session factory, the group_by
+under test and the dataset description; ``setup`` is run untimed before every
+repetition (e.g. to clear the KPI rows a previous run wrote).
+"""
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import delete
+
+from app.models_kpi import KPIMember, LeaveAnalysisKPI, OnTimeKPI, WorkHourKPI, WorkHourLostKPI
+from app.services.dashboard_summary import get_dashboard_summary
+from app.services.kpi import compute_on_time_stats
+from app.services.kpi_calculator import calculate_kpis_for_file
+from app.services.leave_analysis import compute_leave_analysis
+from app.services.od_analysis import compute_od_analysis
+from app.services.parser import read_file_preserve_text
+from app.services.work_hour import compute_work_hour_completion
+from app.services.work_hour_lost import compute_work_hour_lost
+
+
+class Case:
+    def __init__(self, name: str, run: Callable[[Dict[str, Any]], int],
+                 setup: Optional[Callable[[Dict[str, Any]], None]] = None, needs_files: bool = False):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.needs_files = needs_files
+
+
+def _compute(fn):
+    def run(ctx):
+        with ctx["session_factory"]() as db:
+            fn(db, ctx["group_by"])
+        return ctx["dataset"]["rows"]
+    return run
+
+
+def _dashboard_summary(ctx):
+    with ctx["session_factory"]() as db:
+        get_dashboard_summary(db, ctx["group_by"])
+    return ctx["dataset"]["rows"]
+
+
+def _clear_file_kpis(ctx):
+    file_id = ctx["dataset"]["largest_file_id"]
+    with ctx["session_factory"]() as db:
+        for model in (OnTimeKPI, WorkHourKPI, WorkHourLostKPI, LeaveAnalysisKPI, KPIMember):
+            db.execute(delete(model).where(model.file_id == file_id))
+        db.commit()
+
+
+def _calculate_kpis_for_file(ctx):
+    with ctx["session_factory"]() as db:
+        calculate_kpis_for_file(db, ctx["dataset"]["largest_file_id"])
+    return ctx["dataset"]["largest_file_rows"]
+
+
+def _parser(ext):
+    def run(ctx):
+        path = ctx["files"][ext]
+        with open(path, "rb") as f:
+            content = f.read()
+        _, rows = read_file_preserve_text(path, content)
+        return len(rows)
+    return run
+
+
+CASES: Dict[str, Case] = {case.name: case for case in (
+    Case("compute_on_time_stats", _compute(compute_on_time_stats)),
+    Case("compute_work_hour_completion", _compute(compute_work_hour_completion)),
+    Case("compute_work_hour_lost", _compute(compute_work_hour_lost)),
+    Case("compute_leave_analysis", _compute(compute_leave_analysis)),
+    Case("compute_od_analysis", _compute(compute_od_analysis)),
+    Case("get_dashboard_summary", _dashboard_summary),
+    Case("calculate_kpis_for_file", _calculate_kpis_for_file, setup=_clear_file_kpis),
+    Case("read_file_preserve_text[csv]", _parser("csv"), needs_files=True),
+    Case("read_file_preserve_text[xlsx]", _parser("xlsx"), needs_files=True),
+)}
@@ -0,0 +1,115 @@
+"""Synthetic attendance datasets loaded into a benchmark database."""
+import math
+import os
+import random
+from typing import Dict, List
+
+from sqlalchemy import create_engine, delete, func, insert, inspect, select
+from sqlalchemy.engine import Engine
+
+from app.db import Base, configure_sqlite, engine_options
+from app import models, models_kpi  # noqa: F401  (register tables)
+from app.models import UploadedFile, UploadedRow
+from generate_synthetic_data import (
+    ATTENDANCE_HEADERS, attendance_rows, generate_employees, month_range, parse_flag_weights, DEFAULT_FLAGS,
+    write_table,
+)
+
+# Bump when the generated data changes so cached SQLite files are rebuilt
+DATASET_VERSION = 1
+DEFAULT_MONTHS = 3
+START_MONTH = "2024-01"
+_INSERT_CHUNK = 2000
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data")
+
+
+def sqlite_url(size: int, months: int, data_dir: str = DATA_DIR) -> str:
+    return f"sqlite:///{os.path.join(data_dir, f'attendance_{size}_{months}m_v{DATASET_VERSION}.db')}"
+
+
+def make_engine(url: str) -> Engine:
+    """An engine configured the way the app configures its own for ``url``."""
+    engine = create_engine(url, future=True, **engine_options(url))
+    configure_sqlite(engine)
+    return engine
+
+
+def _monthly_rows(size: int, months: int, seed: int) -> List[List[Dict[str, str]]]:
+    """About ``size`` attendance rows split into one list per month (one upload each)."""
+    rnd = random.Random(seed)
+    employees = generate_employees(max(1, math.ceil(size / (30.4 * months))), rnd=rnd)
+    weights = parse_flag_weights(DEFAULT_FLAGS)
+    return [
+        list(attendance_rows(employees, year, month, weights, rnd=random.Random(seed + i)))
+        for i, (year, month) in enumerate(month_range(START_MONTH, months))
+    ]
+
+
+def load_dataset(engine: Engine, size: int, months: int = DEFAULT_MONTHS, seed: int = 42) -> Dict[str, int]:
+    """
+    Replace all uploaded attendance in the database with a generated dataset.
+    Returns ``{"rows": total rows, "largest_file_id": id, "largest_file_rows": n}``.
+    """
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # KPI tables cascade from uploaded_file on MySQL; delete explicitly for SQLite
+        for model in (models_kpi.OnTimeKPI, models_kpi.WorkHourKPI, models_kpi.WorkHourLostKPI,
+                      models_kpi.LeaveAnalysisKPI, models_kpi.KPIMember):
+            conn.execute(delete(model))
+        conn.execute(delete(UploadedRow))
+        conn.execute(delete(UploadedFile))
+
+        largest = (None, 0)
+        total = 0
+        for index, rows in enumerate(_monthly_rows(size, months, seed)):
+            file_id = conn.execute(
+                insert(UploadedFile).values(filename=f"synthetic_{index + 1}.csv", header_order=ATTENDANCE_HEADERS)
+            ).inserted_primary_key[0]
+            for start in range(0, len(rows), _INSERT_CHUNK):
+                conn.execute(insert(UploadedRow), [
+                    {"file_id": file_id, "data": row} for row in rows[start:start + _INSERT_CHUNK]
+                ])
+            total += len(rows)
+            if len(rows) > largest[1]:
+                largest = (file_id, len(rows))
+    return {"rows": total, "largest_file_id": largest[0], "largest_file_rows": largest[1]}
+
+
+def dataset_info(engine: Engine) -> Dict[str, int]:
+    """Describe the dataset already loaded in the database."""
+    with engine.connect() as conn:
+        counts = conn.execute(
+            select(UploadedRow.file_id, func.count()).group_by(UploadedRow.file_id)
+        ).all()
+    if not counts:
+        return {"rows": 0, "largest_file_id": None, "largest_file_rows": 0}
+    file_id, rows = max(counts, key=lambda c: c[1])
+    return {"rows": sum(c[1] for c in counts), "largest_file_id": file_id, "largest_file_rows": rows}
+
+
+def ensure_sqlite_dataset(size: int, months: int = DEFAULT_MONTHS, data_dir: str = DATA_DIR) -> str:
+    """Build (or reuse) the cached SQLite file for ``size`` and return its URL."""
+    os.makedirs(data_dir, exist_ok=True)
+    url = sqlite_url(size, months, data_dir)
+    engine = make_engine(url)
+    try:
+        # The load is a single transaction, so an existing file is complete
+        if not inspect(engine).has_table(UploadedRow.__tablename__) or not dataset_info(engine)["rows"]:
+            load_dataset(engine, size, months)
+    finally:
+        engine.dispose()
+    return url
+
+
+def ensure_upload_files(size: int, months: int = DEFAULT_MONTHS, data_dir: str = DATA_DIR) -> Dict[str, str]:
+    """CSV and XLSX copies of the largest month, for the parser benchmarks."""
+    os.makedirs(data_dir, exist_ok=True)
+    paths = {ext: os.path.join(data_dir, f"attendance_{size}_{months}m_v{DATASET_VERSION}.{ext}") for ext in ("csv", "xlsx")}
+    missing = [ext for ext, path in paths.items() if not os.path.exists(path)]
+    if missing:
+        rows = max(_monthly_rows(size, months, 42), key=len)
+        for ext in missing:
+            write_table(paths[ext] + ".tmp." + ext, ATTENDANCE_HEADERS, rows)
+            os.replace(paths[ext] + ".tmp." + ext, paths[ext])
+    return paths
@@ -0,0 +1,311 @@
+"""HTTP load test replaying the dashboard and Teams page-load patterns.
+
+Start the backend (e.g. ``gunicorn -c gunicorn.conf.py app.main:app``), then
+from ``backend/``:
+    python -m benchmarks.loadtest --users 20 --duration 60
+    python -m benchmarks.loadtest --users 50 --uploaders 2 --upload-rows 20000 --out load.json
+
+Each virtual user logs in through ``/auth/login`` once and then loops over
+pages picked by ``--mix``. A page issues its requests the way the frontend
+does: requests that React Query starts together run concurrently, dependent
+ones wait. ``--uploaders`` adds users that keep uploading generated attendance
+(and Teams) files while the readers run, deleting them again afterwards.
+
+Reports p50/p95/p99 latency per endpoint and per page, throughput, and an
+error breakdown (HTTP status or exception type). Requires ``httpx``
+(``pip install httpx``).
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+from generate_synthetic_data import (
+    ATTENDANCE_HEADERS, TEAMS_ACTIVITY_HEADERS, DEFAULT_FLAGS, attendance_rows, generate_employees,
+    parse_flag_weights, teams_activity_rows,
+)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    """Latencies and errors per endpoint label."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.started = time.perf_counter()
+
+    def ok(self, label: str, seconds: float):
+        self.latencies[label].append(seconds)
+
+    def error(self, label: str, seconds: float, reason: str):
+        self.latencies[label].append(seconds)
+        self.errors[label][reason] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        endpoints = {}
+        for label in sorted(self.latencies):
+            values = sorted(self.latencies[label])
+            errors = sum(self.errors[label].values())
+            endpoints[label] = {
+                "count": len(values),
+                "errors": errors,
+                "error_rate": round(errors / len(values), 4) if values else 0.0,
+                "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+                "max_ms": round(values[-1] * 1000, 1) if values else 0.0,
+            }
+        return {
+            "duration_seconds": round(elapsed, 1),
+            "endpoints": endpoints,
+            "errors": {label: dict(counter) for label, counter in self.errors.items() if counter},
+        }
+
+
+class VirtualUser:
+    def __init__(self, client: "httpx.AsyncClient", recorder: Recorder, token: str):
+        self.client = client
+        self.recorder = recorder
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    async def request(self, method: str, url: str, label: Optional[str] = None, **kwargs) -> Any:
+        label = f"{method} {label or url}"
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.error(label, time.perf_counter() - started, type(e).__name__)
+            return None
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            self.recorder.error(label, elapsed, f"HTTP {response.status_code}")
+            return None
+        self.recorder.ok(label, elapsed)
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    async def get(self, url: str, label: Optional[str] = None, **kwargs) -> Any:
+        return await self.request("GET", url, label, **kwargs)
+
+    async def page(self, name: str, coro):
+        started = time.perf_counter()
+        await coro
+        self.recorder.ok(f"PAGE {name}", time.perf_counter() - started)
+
+    # --- pages (mirroring the frontend's queries) -------------------------
+
+    async def dashboard(self, group_by: str):
+        """DashboardPage: four KPI queries for the active tab, in parallel."""
+        await asyncio.gather(
+            self.get(f"/kpi/simple/{group_by}", "/kpi/simple/{group_by}"),
+            self.get(f"/work_hour/completion/{group_by}", "/work_hour/completion/{group_by}"),
+            self.get(f"/work_hour/lost/{group_by}", "/work_hour/lost/{group_by}"),
+            self.get(f"/work_hour/leave/{group_by}", "/work_hour/leave/{group_by}"),
+        )
+
+    async def teams_dashboard(self, tab: str):
+        """TeamsDashboardPage: file lists, then activity for the latest file, then the tab's query."""
+        files, employee_files = await asyncio.gather(self.get("/teams/files/"), self.get("/employee/files/"))
+        if not files:
+            return
+        # The first render queries without a file id, then again once the latest file is selected
+        await self.get("/teams/analytics/user-activity")
+        file_id = files[0]["id"]
+        await self.get("/teams/analytics/user-activity", "/teams/analytics/user-activity?file_id",
+                       params={"file_id": file_id})
+        employee_file_id = employee_files[0]["id"] if employee_files else None
+        if tab in ("function", "company") and employee_file_id:
+            await self.get(f"/teams/analytics/{tab}-activity", f"/teams/analytics/{tab}-activity?ids",
+                           params={"teams_file_id": file_id, "employee_file_id": employee_file_id})
+        elif tab == "cxo":
+            await self.get("/teams/analytics/cxo-activity", "/teams/analytics/cxo-activity?file_id",
+                           params={"file_id": file_id})
+
+    async def teams_app(self):
+        """TeamsAppActivityPage: file list, then activity without and with the latest file id."""
+        files = await self.get("/teams/app/files/")
+        if not files:
+            return
+        await self.get("/teams/app/analytics/app-activity")
+        await self.get("/teams/app/analytics/app-activity", "/teams/app/analytics/app-activity?file_id",
+                       params={"file_id": files[0]["id"]})
+
+
+async def login(client: "httpx.AsyncClient", recorder: Recorder, username: str, password: str) -> Optional[str]:
+    started = time.perf_counter()
+    try:
+        response = await client.post("/auth/login", json={"username": username, "password": password})
+    except httpx.HTTPError as e:
+        recorder.error("POST /auth/login", time.perf_counter() - started, type(e).__name__)
+        return None
+    if response.status_code != 200:
+        recorder.error("POST /auth/login", time.perf_counter() - started, f"HTTP {response.status_code}")
+        return None
+    recorder.ok("POST /auth/login", time.perf_counter() - started)
+    return response.json()["access_token"]
+
+
+def _csv_bytes(headers: List[str], rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=headers)
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def build_upload_payloads(rows: int, seed: int = 7) -> Dict[str, bytes]:
+    """One attendance month of about ``rows`` rows and the matching Teams report."""
+    rnd = random.Random(seed)
+    employees = generate_employees(max(1, rows // 30), rnd=rnd)
+    return {
+        "attendance": _csv_bytes(ATTENDANCE_HEADERS, attendance_rows(
+            employees, 2024, 1, parse_flag_weights(DEFAULT_FLAGS), rnd=random.Random(seed))),
+        "teams": _csv_bytes(TEAMS_ACTIVITY_HEADERS, teams_activity_rows(employees, 2024, 1, rnd=random.Random(seed))),
+    }
+
+
+async def run_reader(user: VirtualUser, mix: List[str], deadline: float, think: float, rnd: random.Random):
+    while time.perf_counter() < deadline:
+        page = rnd.choice(mix)
+        if page == "dashboard":
+            group_by = rnd.choice(("function", "company", "location"))
+            await user.page(f"dashboard:{group_by}", user.dashboard(group_by))
+        elif page == "teams":
+            tab = rnd.choice(("user", "function", "company", "cxo"))
+            await user.page(f"teams:{tab}", user.teams_dashboard(tab))
+        elif page == "teams_app":
+            await user.page("teams_app", user.teams_app())
+        if think:
+            await asyncio.sleep(rnd.uniform(0, 2 * think))
+
+
+async def run_uploader(user: VirtualUser, payloads: Dict[str, bytes], deadline: float, interval: float,
+                       keep: bool, rnd: random.Random):
+    while time.perf_counter() < deadline:
+        kind = rnd.choice(("attendance", "attendance", "teams"))
+        if kind == "attendance":
+            result = await user.request("POST", "/upload", files={"files": ("load.csv", payloads[kind], "text/csv")})
+            if result and not keep:
+                await user.request("DELETE", "/files/", json={"file_ids": [f["id"] for f in result]})
+        else:
+            result = await user.request(
+                "POST", "/teams/upload", files={"files": ("load_teams.csv", payloads[kind], "text/csv")},
+                data={"from_month": "2024-01", "to_month": "2024-01"},
+            )
+            if result and not keep:
+                await user.request("DELETE", "/teams/files/", json={"file_ids": [f["id"] for f in result]})
+        await asyncio.sleep(interval)
+
+
+def parse_mix(spec: str) -> List[str]:
+    """``"dashboard=3,teams=1"`` -> weighted list of page names."""
+    pages = []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("dashboard", "teams", "teams_app"):
+            raise ValueError(f"Unknown page {name!r}; use dashboard, teams or teams_app")
+        pages.extend([name] * int(weight or 1))
+    return pages
+
+
+async def main_async(args) -> Dict[str, Any]:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.users + args.uploaders + 5)
+    timeout = httpx.Timeout(args.timeout)
+    mix = parse_mix(args.mix)
+    payloads = build_upload_payloads(args.upload_rows) if args.uploaders else {}
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as client:
+        token = await login(client, recorder, args.username, args.password)
+        if token is None:
+            raise SystemExit(f"Login failed: {recorder.summary()['errors']}")
+        # Every virtual user logs in, as each browser session would
+        tokens = await asyncio.gather(*[
+            login(client, recorder, args.username, args.password) for _ in range(args.users + args.uploaders)
+        ])
+        recorder.started = time.perf_counter()
+        deadline = time.perf_counter() + args.duration
+        tasks = []
+        for i in range(args.users):
+            user = VirtualUser(client, recorder, tokens[i] or token)
+            tasks.append(run_reader(user, mix, deadline, args.think_time, random.Random(args.seed + i)))
+        for i in range(args.uploaders):
+            user = VirtualUser(client, recorder, tokens[args.users + i] or token)
+            tasks.append(run_uploader(user, payloads, deadline, args.upload_interval, args.keep_uploads,
+                                      random.Random(args.seed + 1000 + i)))
+        await asyncio.gather(*tasks)
+
+    report = recorder.summary()
+    report["settings"] = {k: v for k, v in vars(args).items() if k != "password"}
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n{'endpoint':<58} {'count':>7} {'err':>5} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for label, s in report["endpoints"].items():
+        print(f"{label:<58} {s['count']:>7} {s['errors']:>5} {s['rps']:>7} "
+              f"{s['p50_ms']:>7}ms {s['p95_ms']:>7}ms {s['p99_ms']:>7}ms")
+    if report["errors"]:
+        print("\nErrors:")
+        for label, reasons in report["errors"].items():
+            print(f"  {label}: " + ", ".join(f"{reason} x{count}" for reason, count in reasons.items()))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8081")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent reading users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run")
+    parser.add_argument("--mix", default="dashboard=3,teams=2,teams_app=1", help="Weighted page mix")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Mean pause between pages (seconds)")
+    parser.add_argument("--uploaders", type=int, default=0, help="Concurrent users uploading files")
+    parser.add_argument("--upload-rows", type=int, default=5000, help="Attendance rows per uploaded file")
+    parser.add_argument("--upload-interval", type=float, default=2.0, help="Pause between uploads (seconds)")
+    parser.add_argument("--keep-uploads", action="store_true", help="Do not delete uploaded files again")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    if httpx is None:
+        print("The load test needs httpx: pip install httpx")
+        return 2
+
+    report = asyncio.run(main_async(args))
+    print_report(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report written to {args.out}")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""Run benchmark cases in child processes and compare result files."""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_case_in_process(case_name: str, database_url: str, group_by: str, repeat: int, warmup: int,
+                        files: Optional[Dict[str, str]], dataset: Dict[str, Any]) -> Dict[str, Any]:
+    """Time one case in this process (called in the child)."""
+    from sqlalchemy.orm import sessionmaker
+
+    from .cases import CASES
+    from .datasets import make_engine
+
+    case = CASES[case_name]
+    engine = make_engine(database_url)
+    ctx = {
+        "session_factory": sessionmaker(bind=engine, autoflush=False, future=True),
+        "group_by": group_by,
+        "dataset": dataset,
+        "files": files or {},
+    }
+    rss_before = _peak_rss_mb()
+
+    timings: List[float] = []
+    rows = 0
+    for i in range(warmup + repeat):
+        if case.setup:
+            case.setup(ctx)
+        started = time.perf_counter()
+        rows = case.run(ctx)
+        elapsed = time.perf_counter() - started
+        if i >= warmup:
+            timings.append(elapsed)
+    engine.dispose()
+
+    median = statistics.median(timings)
+    peak = _peak_rss_mb()
+    return {
+        "case": case_name,
+        "rows": rows,
+        "wall_seconds": {
+            "min": round(min(timings), 6),
+            "median": round(median, 6),
+            "max": round(max(timings), 6),
+            "runs": [round(t, 6) for t in timings],
+        },
+        "rows_per_second": round(rows / median, 1) if median > 0 else None,
+        "peak_rss_mb": peak,
+        "rss_growth_mb": round(peak - rss_before, 1) if peak is not None and rss_before is not None else None,
+    }
+
+
+def run_case(case_name: str, database_url: str, group_by: str, repeat: int, warmup: int,
+             files: Optional[Dict[str, str]], dataset: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one case in a fresh interpreter so peak RSS belongs to that case alone."""
+    payload = json.dumps({
+        "case": case_name, "database_url": database_url, "group_by": group_by, "repeat": repeat,
+        "warmup": warmup, "files": files, "dataset": dataset,
+    })
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks", "_child"],
+        input=payload, capture_output=True, text=True, cwd=BACKEND_DIR,
+    )
+    if proc.returncode != 0:
+        return {"case": case_name, "error": (proc.stderr or proc.stdout).strip().splitlines()[-1:]}
+    # The result is the last line; anything before it is the app's own logging
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def environment() -> Dict[str, Any]:
+    commit = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=BACKEND_DIR
+        ).stdout.strip() or None
+    except OSError:
+        pass
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float,
+            rss_threshold: float) -> List[Dict[str, Any]]:
+    """Pair results by (case, size) and flag slower or larger ones."""
+    def index(report):
+        return {(r["case"], r["size"]): r for r in report.get("results", []) if "error" not in r}
+
+    base, cur = index(baseline), index(current)
+    rows = []
+    for key in sorted(set(base) & set(cur)):
+        b, c = base[key], cur[key]
+        b_time, c_time = b["wall_seconds"]["median"], c["wall_seconds"]["median"]
+        time_ratio = c_time / b_time if b_time else None
+        rss_ratio = (
+            c["peak_rss_mb"] / b["peak_rss_mb"] if b.get("peak_rss_mb") and c.get("peak_rss_mb") else None
+        )
+        flags = []
+        if time_ratio is not None and time_ratio > 1 + threshold:
+            flags.append("slower")
+        if rss_ratio is not None and rss_ratio > 1 + rss_threshold:
+            flags.append("more memory")
+        if time_ratio is not None and time_ratio < 1 / (1 + threshold):
+            flags.append("faster")
+        rows.append({
+            "case": key[0],
+            "size": key[1],
+            "baseline_s": b_time,
+            "current_s": c_time,
+            "time_ratio": round(time_ratio, 3) if time_ratio else None,
+            "baseline_rss_mb": b.get("peak_rss_mb"),
+            "current_rss_mb": c.get("peak_rss_mb"),
+            "flags": flags,
+            "regression": "slower" in flags or "more memory" in flags,
+        })
+    return rows
@@ -0,0 +1,440 @@
+"""Generate synthetic Attendance, Employee List and MS Teams files for scale testing.
+
+The files use the exact headers the upload endpoints and analytics services read
+(including the ``Comapny Name`` and ``Email (Offical)`` spellings), so a
+generated set can be uploaded through every module and exercised end to end
+without real HR exports.
+
+Examples:
+    python generate_synthetic_data.py --employees 2000 --months 6
+    python generate_synthetic_data.py --employees 20000 --months 12 --companies 5 --format xlsx
+    python generate_synthetic_data.py --flags "P=70,OD=8,SL=6,CL=6,A=4,EL=2,WHF=4" --late-rate 0.2
+
+Upload the output with the matching pages (Attendance, Employee List, Teams
+User Activity with the month in the file name as From/To, Teams App Usage).
+The functions below are also used by the benchmarks to build data in-process.
+"""
+import argparse
+import calendar
+import csv
+import os
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+ATTENDANCE_HEADERS = [
+    "Employee Code", "Name", "Attendance Date", "Comapny Name", "Function Name", "Job Location",
+    "Flag", "Is Late", "Shift In Time", "Shift Out Time", "In Time", "Out Time",
+]
+
+EMPLOYEE_HEADERS = [
+    "Employee Code", "Employee Name", "Email (Offical)", "Company", "Function", "Department",
+    "Designation", "Job Location",
+]
+
+TEAMS_ACTIVITY_HEADERS = [
+    "Report Refresh Date", "User Id", "User Principal Name", "Last Activity Date", "Is Deleted",
+    "Deleted Date", "Assigned Products", "Team Chat Message Count", "Private Chat Message Count",
+    "Call Count", "Meeting Count", "Meetings Organized Count", "Meetings Attended Count",
+    "Scheduled One-time Meetings Organized Count", "Scheduled One-time Meetings Attended Count",
+    "Scheduled Recurring Meetings Organized Count", "Scheduled Recurring Meetings Attended Count",
+    "Audio Duration In Seconds", "Video Duration In Seconds", "Post Messages", "Reply Messages",
+    "Is Licensed", "Report Period",
+]
+
+TEAMS_APP_HEADERS = [
+    "Report Refresh Date", "App Id", "App Name", "Publisher", "Team Using App", "Users Using App",
+    "Report Period",
+]
+
+# The first three match the short-code map used by the analytics services
+COMPANIES = [
+    "Confidence Batteries Limited",
+    "Confidence Infrastructure PLC.",
+    "Confidence Steel Export Limited",
+    "Confidence Power Holdings Limited",
+    "Confidence Cement Limited",
+]
+FUNCTIONS = [
+    "Human Resources", "Finance & Accounts", "Sales", "Marketing", "Supply Chain",
+    "Production", "Information Technology", "Administration", "Quality Control", "Engineering",
+]
+LOCATIONS = ["Dhaka", "Chattogram", "Gazipur", "Narayanganj", "Bogura"]
+DESIGNATIONS = ["Executive", "Senior Executive", "Assistant Manager", "Manager", "Senior Manager", "Officer"]
+FIRST_NAMES = [
+    "Rahim", "Karim", "Fatima", "Ayesha", "Hasan", "Nusrat", "Tanvir", "Sadia", "Imran", "Farhana",
+    "Arif", "Shirin", "Mahmud", "Sabrina", "Rafiq", "Nadia", "Kamal", "Tasnim", "Jamal", "Rumana",
+]
+LAST_NAMES = [
+    "Ahmed", "Hossain", "Rahman", "Islam", "Chowdhury", "Khan", "Akter", "Sarkar", "Uddin", "Begum",
+    "Haque", "Alam", "Miah", "Siddique", "Karim", "Sultana",
+]
+TEAMS_APPS = [
+    ("Microsoft Planner", "Microsoft"), ("Forms", "Microsoft"), ("Approvals", "Microsoft"),
+    ("OneNote", "Microsoft"), ("Whiteboard", "Microsoft"), ("Power BI", "Microsoft"),
+    ("Lists", "Microsoft"), ("Shifts", "Microsoft"), ("Viva Insights", "Microsoft"),
+    ("Power Automate", "Microsoft"), ("SharePoint", "Microsoft"), ("Wiki", "Microsoft"),
+    ("YouTube", "Google"), ("Jira Cloud", "Atlassian"), ("Confluence Cloud", "Atlassian"),
+    ("Trello", "Atlassian"), ("Zoom", "Zoom Video Communications"), ("Polly", "Polly"),
+    ("Asana", "Asana"), ("Adobe Acrobat", "Adobe"), ("Miro", "Miro"), ("GitHub", "GitHub"),
+    ("Salesforce", "Salesforce"), ("ServiceNow", "ServiceNow"), ("Smartsheet", "Smartsheet"),
+]
+
+# Weights for working days; W (weekly off) and H (holiday) come from the calendar
+DEFAULT_FLAGS = "P=80,OD=5,SL=3,CL=3,A=2,EL=1,WHF=6"
+LEAVE_FLAGS = ("SL", "CL", "EL")
+SHIFTS = [("09:00:00", "18:00:00"), ("08:00:00", "17:00:00"), ("10:00:00", "19:00:00")]
+NIGHT_SHIFT = ("22:00:00", "06:00:00")
+
+
+@dataclass
+class SyntheticEmployee:
+    code: str
+    name: str
+    email: str
+    company: str
+    function: str
+    location: str
+    designation: str
+    shift: Tuple[str, str]
+    late_propensity: float
+    leave_propensity: float
+    teams_engagement: float
+
+
+def parse_flag_weights(spec: str) -> Dict[str, float]:
+    """Parse ``"P=80,OD=5,SL=3"`` into normalized flag weights."""
+    weights: Dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        flag, _, weight = part.partition("=")
+        flag = flag.strip().upper()
+        if flag in ("W", "H"):
+            raise ValueError("W and H are generated from the calendar; use --weekend and --holidays-per-month")
+        weights[flag] = float(weight)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Flag weights must add up to more than zero")
+    return {flag: weight / total for flag, weight in weights.items()}
+
+
+def month_range(start: str, months: int) -> List[Tuple[int, int]]:
+    """``("2024-11", 3)`` -> ``[(2024, 11), (2024, 12), (2025, 1)]``."""
+    year, month = (int(p) for p in start.split("-"))
+    result = []
+    for _ in range(months):
+        result.append((year, month))
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+    return result
+
+
+def generate_employees(count: int, companies: int = 3, night_shift_rate: float = 0.03,
+                       late_rate: float = 0.12, rnd: Optional[random.Random] = None,
+                       domain: str = "example.com") -> List[SyntheticEmployee]:
+    """Employees spread over ``companies`` companies with skewed function sizes."""
+    rnd = rnd or random.Random(0)
+    company_names = COMPANIES[:companies] + [
+        f"Synthetic Company {i + 1} Limited" for i in range(max(0, companies - len(COMPANIES)))
+    ]
+    # A few functions dominate headcount, as in a manufacturing group
+    function_weights = [1.0 / (i + 1) for i in range(len(FUNCTIONS))]
+    shuffled_functions = FUNCTIONS[:]
+    rnd.shuffle(shuffled_functions)
+
+    employees = []
+    for i in range(count):
+        first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+        code = f"{100000 + i}"
+        company = company_names[i] if i < len(company_names) else rnd.choice(company_names)
+        shift = NIGHT_SHIFT if rnd.random() < night_shift_rate else rnd.choice(SHIFTS)
+        employees.append(SyntheticEmployee(
+            code=code,
+            name=f"{first} {last}",
+            email=f"{first}.{last}.{code}@{domain}".lower(),
+            company=company,
+            function=rnd.choices(shuffled_functions, weights=function_weights)[0],
+            location=rnd.choice(LOCATIONS),
+            designation=rnd.choice(DESIGNATIONS),
+            shift=shift,
+            # Most people are rarely late; a few are late most days
+            late_propensity=min(0.95, rnd.expovariate(1.0 / late_rate)) if late_rate > 0 else 0.0,
+            leave_propensity=rnd.uniform(0.5, 1.5),
+            teams_engagement=rnd.lognormvariate(0, 0.8),
+        ))
+    return employees
+
+
+def _calendar_flags(year: int, month: int, weekend: Sequence[int], holidays_per_month: int,
+                    rnd: random.Random) -> Dict[date, str]:
+    """Weekly-off and holiday flags shared by every employee for one month."""
+    days = [date(year, month, d) for d in range(1, calendar.monthrange(year, month)[1] + 1)]
+    flags = {d: "W" for d in days if d.weekday() in weekend}
+    workdays = [d for d in days if d not in flags]
+    for d in rnd.sample(workdays, min(holidays_per_month, len(workdays))):
+        flags[d] = "H"
+    return flags
+
+
+def _clock(base: str, minutes: int, seconds: int = 0) -> str:
+    t = datetime.strptime(base, "%H:%M:%S") + timedelta(minutes=minutes, seconds=seconds)
+    return t.strftime("%H:%M:%S")
+
+
+def attendance_rows(employees: Sequence[SyntheticEmployee], year: int, month: int,
+                    flag_weights: Dict[str, float], weekend: Sequence[int] = (4,),
+                    holidays_per_month: int = 1, leave_run_rate: float = 0.35,
+                    bridge_rate: float = 0.25, early_leave_rate: float = 0.06,
+                    missing_punch_rate: float = 0.01,
+                    rnd: Optional[random.Random] = None) -> Iterator[Dict[str, str]]:
+    """
+    One month of daily attendance rows, date by date. Leave comes in runs and is
+    often taken next to a weekly off or holiday (SL/CL bridging), which is what
+    the leave analysis looks for.
+    """
+    rnd = rnd or random.Random(year * 100 + month)
+    fixed = _calendar_flags(year, month, weekend, holidays_per_month, rnd)
+    days = [date(year, month, d) for d in range(1, calendar.monthrange(year, month)[1] + 1)]
+    flags = list(flag_weights)
+
+    # Per employee flag sequence for the month
+    sequences: List[List[str]] = []
+    for emp in employees:
+        weights = [
+            flag_weights[f] * emp.leave_propensity if f in LEAVE_FLAGS else flag_weights[f] for f in flags
+        ]
+        seq = []
+        carry = None
+        for d in days:
+            if d in fixed:
+                seq.append(fixed[d])
+                continue
+            if carry and rnd.random() < leave_run_rate:
+                seq.append(carry)
+                continue
+            flag = rnd.choices(flags, weights=weights)[0]
+            carry = flag if flag in LEAVE_FLAGS else None
+            seq.append(flag)
+        if rnd.random() < bridge_rate * emp.leave_propensity:
+            edges = [
+                i for i, flag in enumerate(seq)
+                if flag not in ("W", "H") and (
+                    (i > 0 and seq[i - 1] in ("W", "H")) or (i + 1 < len(seq) and seq[i + 1] in ("W", "H"))
+                )
+            ]
+            if edges:
+                seq[rnd.choice(edges)] = rnd.choice(("SL", "CL"))
+        sequences.append(seq)
+
+    for day_index, d in enumerate(days):
+        date_text = d.strftime("%d-%b-%Y")
+        for emp, seq in zip(employees, sequences):
+            flag = seq[day_index]
+            shift_in, shift_out = emp.shift
+            in_time = out_time = ""
+            is_late = "No"
+            if flag in ("P", "OD", "WHF"):
+                if rnd.random() < emp.late_propensity:
+                    is_late = "Yes"
+                    in_time = _clock(shift_in, rnd.randint(1, 90), rnd.randint(0, 59))
+                else:
+                    in_time = _clock(shift_in, -rnd.randint(1, 30), rnd.randint(0, 59))
+                if rnd.random() < early_leave_rate:
+                    out_time = _clock(shift_out, -rnd.randint(30, 180), rnd.randint(0, 59))
+                else:
+                    out_time = _clock(shift_out, int(rnd.gauss(15, 30)), rnd.randint(0, 59))
+                if rnd.random() < missing_punch_rate:
+                    out_time = ""
+            yield {
+                "Employee Code": emp.code,
+                "Name": emp.name,
+                "Attendance Date": date_text,
+                "Comapny Name": emp.company,
+                "Function Name": emp.function,
+                "Job Location": emp.location,
+                "Flag": flag,
+                "Is Late": is_late,
+                "Shift In Time": shift_in,
+                "Shift Out Time": shift_out,
+                "In Time": in_time,
+                "Out Time": out_time,
+            }
+
+
+def employee_list_rows(employees: Sequence[SyntheticEmployee]) -> Iterator[Dict[str, str]]:
+    for emp in employees:
+        yield {
+            "Employee Code": emp.code,
+            "Employee Name": emp.name,
+            "Email (Offical)": emp.email,
+            "Company": emp.company,
+            "Function": emp.function,
+            "Department": emp.function,
+            "Designation": emp.designation,
+            "Job Location": emp.location,
+        }
+
+
+def teams_activity_rows(employees: Sequence[SyntheticEmployee], year: int, month: int,
+                        coverage: float = 0.9, external_users: int = 0,
+                        rnd: Optional[random.Random] = None,
+                        domain: str = "example.com") -> Iterator[Dict[str, str]]:
+    """
+    One month of the Teams user activity report. ``coverage`` of the employees
+    appear (some with differently cased UPNs, as exported by Microsoft 365), plus
+    ``external_users`` accounts that are not in the Employee List.
+    """
+    rnd = rnd or random.Random(year * 100 + month + 7)
+    last_day = date(year, month, calendar.monthrange(year, month)[1])
+    refresh = (last_day + timedelta(days=2)).isoformat()
+    users = [(emp.email, emp.teams_engagement) for emp in employees if rnd.random() < coverage]
+    users += [(f"external.user{i}@partner.{domain}", rnd.lognormvariate(-1, 0.8)) for i in range(external_users)]
+
+    def count(mean: float, engagement: float) -> int:
+        return max(0, int(rnd.gauss(mean * engagement, mean * engagement * 0.3)))
+
+    for email, engagement in users:
+        upn = email.title() if rnd.random() < 0.05 else email
+        organized_once, attended_once = count(2, engagement), count(6, engagement)
+        organized_recurring, attended_recurring = count(1, engagement), count(8, engagement)
+        meetings_organized = organized_once + organized_recurring + count(1, engagement)
+        meetings_attended = attended_once + attended_recurring + count(2, engagement)
+        active = meetings_attended or engagement > 0.2
+        yield {
+            "Report Refresh Date": refresh,
+            "User Id": str(uuid.UUID(int=rnd.getrandbits(128))),
+            "User Principal Name": upn,
+            "Last Activity Date": (last_day - timedelta(days=rnd.randint(0, 10))).isoformat() if active else "",
+            "Is Deleted": "False",
+            "Deleted Date": "",
+            "Assigned Products": "MICROSOFT 365 BUSINESS STANDARD",
+            "Team Chat Message Count": str(count(25, engagement)),
+            "Private Chat Message Count": str(count(180, engagement)),
+            "Call Count": str(count(20, engagement)),
+            "Meeting Count": str(meetings_organized + meetings_attended),
+            "Meetings Organized Count": str(meetings_organized),
+            "Meetings Attended Count": str(meetings_attended),
+            "Scheduled One-time Meetings Organized Count": str(organized_once),
+            "Scheduled One-time Meetings Attended Count": str(attended_once),
+            "Scheduled Recurring Meetings Organized Count": str(organized_recurring),
+            "Scheduled Recurring Meetings Attended Count": str(attended_recurring),
+            "Audio Duration In Seconds": str(count(9000, engagement)),
+            "Video Duration In Seconds": str(count(3000, engagement)),
+            "Post Messages": str(count(4, engagement)),
+            "Reply Messages": str(count(6, engagement)),
+            "Is Licensed": "Yes",
+            "Report Period": "30",
+        }
+
+
+def teams_app_rows(user_count: int, year: int, month: int, apps: int = len(TEAMS_APPS),
+                   rnd: Optional[random.Random] = None) -> Iterator[Dict[str, str]]:
+    """One month of the Teams app usage report with a long-tailed adoption curve."""
+    rnd = rnd or random.Random(year * 100 + month + 13)
+    refresh = (date(year, month, calendar.monthrange(year, month)[1]) + timedelta(days=2)).isoformat()
+    catalog = TEAMS_APPS + [(f"Line of Business App {i + 1}", "Contoso") for i in range(max(0, apps - len(TEAMS_APPS)))]
+    teams = max(1, user_count // 15)
+    for rank, (app_name, publisher) in enumerate(catalog[:apps], start=1):
+        share = min(1.0, rnd.uniform(0.6, 1.2) / rank)
+        yield {
+            "Report Refresh Date": refresh,
+            "App Id": str(uuid.UUID(int=rnd.getrandbits(128))),
+            "App Name": app_name,
+            "Publisher": publisher,
+            "Team Using App": str(int(teams * share * rnd.uniform(0.3, 0.8))),
+            "Users Using App": str(int(user_count * share)),
+            "Report Period": "30",
+        }
+
+
+def write_table(path: str, headers: List[str], rows: Iterable[Dict[str, str]]) -> int:
+    """Stream rows to ``.csv`` or ``.xlsx`` (chosen by extension); returns the row count."""
+    written = 0
+    if path.lower().endswith(".xlsx"):
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(headers)
+        for row in rows:
+            ws.append([row.get(h, "") for h in headers])
+            written += 1
+        wb.save(path)
+        return written
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=headers)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            written += 1
+    return written
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--months", type=int, default=3)
+    parser.add_argument("--start", default="2024-01", help="First month, YYYY-MM")
+    parser.add_argument("--companies", type=int, default=3)
+    parser.add_argument("--flags", default=DEFAULT_FLAGS, help="Working-day flag weights, e.g. P=80,OD=5,SL=3")
+    parser.add_argument("--late-rate", type=float, default=0.12, help="Average share of late check-ins")
+    parser.add_argument("--weekend", default="4", help="Weekly-off weekdays, 0=Mon (default Friday)")
+    parser.add_argument("--holidays-per-month", type=int, default=1)
+    parser.add_argument("--bridge-rate", type=float, default=0.25,
+                        help="Chance per employee-month of SL/CL next to a weekly off or holiday")
+    parser.add_argument("--teams-coverage", type=float, default=0.9, help="Share of employees in the Teams report")
+    parser.add_argument("--external-users", type=int, default=0, help="Teams users not in the Employee List")
+    parser.add_argument("--apps", type=int, default=len(TEAMS_APPS))
+    parser.add_argument("--format", choices=("csv", "xlsx"), default="csv",
+                        help="Attendance and Employee List format (Teams files are always CSV)")
+    parser.add_argument("--single-file", action="store_true", help="Write all attendance months to one file")
+    parser.add_argument("--no-teams", action="store_true", help="Skip the Teams activity and app usage files")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=os.path.join("data", "synthetic"))
+    args = parser.parse_args(argv)
+
+    rnd = random.Random(args.seed)
+    flag_weights = parse_flag_weights(args.flags)
+    weekend = [int(d) for d in args.weekend.split(",") if d.strip()]
+    months = month_range(args.start, args.months)
+    os.makedirs(args.out, exist_ok=True)
+
+    employees = generate_employees(args.employees, args.companies, late_rate=args.late_rate, rnd=rnd)
+    ext = args.format
+
+    path = os.path.join(args.out, f"employee_list.{ext}")
+    print(f"✓ {path}: {write_table(path, EMPLOYEE_HEADERS, employee_list_rows(employees))} rows")
+
+    def month_rows(year, month):
+        return attendance_rows(employees, year, month, flag_weights, weekend=weekend,
+                               holidays_per_month=args.holidays_per_month, bridge_rate=args.bridge_rate,
+                               rnd=random.Random(rnd.random()))
+
+    if args.single_file:
+        path = os.path.join(args.out, f"attendance_{months[0][0]}-{months[0][1]:02d}_{len(months)}m.{ext}")
+        rows = (row for year, month in months for row in month_rows(year, month))
+        print(f"✓ {path}: {write_table(path, ATTENDANCE_HEADERS, rows)} rows")
+    else:
+        for year, month in months:
+            path = os.path.join(args.out, f"attendance_{year}-{month:02d}.{ext}")
+            print(f"✓ {path}: {write_table(path, ATTENDANCE_HEADERS, month_rows(year, month))} rows")
+
+    if args.no_teams:
+        return
+    for year, month in months:
+        path = os.path.join(args.out, f"teams_activity_{year}-{month:02d}.csv")
+        rows = teams_activity_rows(employees, year, month, coverage=args.teams_coverage,
+                                   external_users=args.external_users, rnd=random.Random(rnd.random()))
+        print(f"✓ {path}: {write_table(path, TEAMS_ACTIVITY_HEADERS, rows)} rows")
+        path = os.path.join(args.out, f"teams_app_usage_{year}-{month:02d}.csv")
+        rows = teams_app_rows(len(employees), year, month, apps=args.apps, rnd=random.Random(rnd.random()))
+        print(f"✓ {path}: {write_table(path, TEAMS_APP_HEADERS, rows)} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Gunicorn settings for the production server.
+
+    python prestart.py && gunicorn -c gunicorn.conf.py app.main:app
+
+The app is imported once in the master (``preload_app``) and forked into
+``WEB_CONCURRENCY`` uvicorn workers. One-time startup work is done by
+prestart.py, so the import here runs with RUN_STARTUP_TASKS=0. Each worker
+reports the time from fork to ready; the master reports the preload time.
+"""
+import os
+import time
+
+# Startup work already ran in prestart.py; must be set before the app import
+os.environ.setdefault("RUN_STARTUP_TASKS", "0")
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8081')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(4, os.cpu_count() or 1))))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+# KPI scans over large uploads can take well over the default 30s
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "180"))
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+errorlog = "-"
+
+# Workers read this for the connection sizing in /admin/db-pool
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+_master_started = time.time()
+
+
+def when_ready(server):
+    server.log.info("Master ready (app preloaded) in %.0f ms", (time.time() - _master_started) * 1000)
+
+
+def post_fork(server, worker):
+    os.environ["GUNICORN_WORKER_FORKED_AT"] = repr(time.time())
+    # Connections must never be shared across processes: drop whatever the
+    # master's pools hold without closing the sockets the master still owns
+    from app.db import engine
+    from app.db_async import async_engine
+    engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    forked_at = float(os.environ["GUNICORN_WORKER_FORKED_AT"])
+    worker.log.info("Worker %s initialized in %.0f ms", worker.pid, (time.time() - forked_at) * 1000)
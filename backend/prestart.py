@@ -0,0 +1,24 @@
+"""One-time startup work before the API workers are started.
+
+Creates missing tables, seeds the default admin user and backfills derived
+tables (employee directory, Teams activity and app usage facts), so that the
+workers can start with RUN_STARTUP_TASKS=0 and skip it (see gunicorn.conf.py).
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.init_db import run_startup_tasks
+
+
+def main():
+    started = time.perf_counter()
+    print("Running startup tasks (schema check, admin seeding, backfills)...")
+    run_startup_tasks()
+    print(f"✓ Startup tasks finished in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
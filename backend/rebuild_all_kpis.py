@@ -6,9 +6,9 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.db import SessionLocal
-from app.models import UploadedFile
-from app.services.kpi_calculator import calculate_kpis_for_file
-from app.models_kpi import OnTimeKPI, WorkHourKPI, WorkHourLostKPI, LeaveAnalysisKPI
+from app.services.kpi_calculator import rebuild_all_file_kpis
+from app.services.dashboard_snapshot import refresh_snapshots
+from app.services.dataset_version import ATTENDANCE, KPI, bump_version
 
 def rebuild_all_kpis():
     """Rebuild KPIs for all uploaded files."""
@@ -19,37 +19,20 @@ def rebuild_all_kpis():
         print("Rebuilding All KPIs")
         print("="*80)
         
-        # Clear existing KPI data
-        print("\n[1/3] Clearing existing KPI data...")
-        deleted_ontime = db.query(OnTimeKPI).delete()
-        deleted_workhour = db.query(WorkHourKPI).delete()
-        deleted_lost = db.query(WorkHourLostKPI).delete()
-        deleted_leave = db.query(LeaveAnalysisKPI).delete()
+        # The new generation is written to shadow tables and swapped in at the
+        # end, so the live KPI tables are never empty while this runs
+        print("\nCalculating KPIs for all files into shadow tables...")
+        total_files, calculated_count = rebuild_all_file_kpis(db)
+        print(f"   Swapped in KPIs for {total_files} files")
+
+        print("\nRecomputing stored dashboard summaries...")
+        bump_version(db, ATTENDANCE)
+        bump_version(db, KPI)
         db.commit()
-        print(f"   Deleted: {deleted_ontime} OnTime, {deleted_workhour} WorkHour, "
-              f"{deleted_lost} Lost, {deleted_leave} Leave records")
-        
-        # Get all uploaded files
-        print("\n[2/3] Fetching all uploaded files...")
-        files = db.query(UploadedFile).order_by(UploadedFile.id).all()
-        print(f"   Found {len(files)} files")
-        
-        # Calculate KPIs for each file
-        print("\n[3/3] Calculating KPIs for each file...")
-        calculated_count = 0
-        for idx, file in enumerate(files, 1):
-            try:
-                print(f"   [{idx}/{len(files)}] Processing file ID {file.id}: {file.filename}...", end=" ")
-                calculate_kpis_for_file(db, file.id)
-                calculated_count += 1
-                print("[OK]")
-            except Exception as e:
-                print(f"[ERROR] {e}")
-                db.rollback()
-                continue
+        refresh_snapshots()
         
         print("\n" + "="*80)
-        print(f"[SUCCESS] Successfully calculated KPIs for {calculated_count} out of {len(files)} files")
+        print(f"[SUCCESS] Successfully calculated KPIs for {calculated_count} out of {total_files} files")
         print("="*80)
         print("\nAll charts should now show data for all months!")
         print("Refresh your dashboard to see the updated data.")
@@ -1,6 +1,7 @@
 import { Outlet, useLocation } from 'react-router-dom'
 import Sidebar from './components/Sidebar'
 import HeaderBar from './components/HeaderBar'
+import { useDataEvents } from './lib/useDataEvents'
 
 const PAGE_TITLES = {
   '/attendance': 'Dashboard',
@@ -14,6 +15,9 @@ const PAGE_TITLES = {
 }
 
 function App() {
+  // Refetch data when uploads or deletes change it on the server
+  useDataEvents()
+
   return (
     <div className="h-screen overflow-hidden relative">
       {/* Background Image */}
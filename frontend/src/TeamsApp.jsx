@@ -1,8 +1,12 @@
 import { Outlet } from 'react-router-dom'
 import TeamsSidebar from './components/TeamsSidebar'
 import HeaderBar from './components/HeaderBar'
+import { useDataEvents } from './lib/useDataEvents'
 
 function TeamsApp() {
+  // Refetch data when uploads or deletes change it on the server
+  useDataEvents()
+
   return (
     <div className="h-screen overflow-hidden relative">
       {/* Background Image */}
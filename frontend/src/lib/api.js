@@ -76,6 +76,26 @@ export async function deleteFiles(ids) {
   return data
 }
 
+// All uploaded attendance rows, reduced to the columns the local KPI fallbacks
+// read, in one request. The response is dictionary-encoded columnar JSON
+// (see backend app/services/columnar_export.py) and is gzip-compressed.
+export async function getAttendanceExportRows() {
+  const { data } = await api.get('/files/export/attendance', { timeout: 120000 })
+  const { columns, chunks, dictionaries } = data
+  const rows = []
+  for (const chunk of chunks) {
+    for (let i = 0; i < chunk.rows; i++) {
+      const row = {}
+      for (let c = 0; c < columns.length; c++) {
+        const value = dictionaries[c][chunk.codes[c][i]]
+        if (value !== null) row[columns[c]] = value
+      }
+      rows.push(row)
+    }
+  }
+  return rows
+}
+
 export async function getOnTime(groupBy) {
   try {
     const { data } = await api.get(`/kpi/simple/${groupBy}`)
@@ -83,12 +103,7 @@ export async function getOnTime(groupBy) {
   } catch (e) {
     // fall back to local computation from uploaded rows
     try {
-      const files = (await api.get('/files/')).data
-      const allRows = []
-      for (const f of files) {
-        const detail = (await api.get(`/files/${f.id}`)).data
-        allRows.push(...detail.rows)
-      }
+      const allRows = await getAttendanceExportRows()
       return computeOnTime(allRows, groupBy)
     } catch (e3) {
       throw e3
@@ -102,12 +117,7 @@ export async function getWorkHourLost(groupBy) {
     return data
   } catch (e) {
     try {
-      const files = (await api.get('/files/')).data
-      const allRows = []
-      for (const f of files) {
-        const detail = (await api.get(`/files/${f.id}`)).data
-        allRows.push(...detail.rows)
-      }
+      const allRows = await getAttendanceExportRows()
       return computeWorkHourLost(allRows, groupBy)
     } catch (e3) {
       throw e3
@@ -122,12 +132,7 @@ export async function getWorkHourCompletion(groupBy) {
   } catch (e) {
     // fall back to local computation from uploaded rows
     try {
-      const files = (await api.get('/files/')).data
-      const allRows = []
-      for (const f of files) {
-        const detail = (await api.get(`/files/${f.id}`)).data
-        allRows.push(...detail.rows)
-      }
+      const allRows = await getAttendanceExportRows()
       return computeWorkHourCompletion(allRows, groupBy)
     } catch (e3) {
       throw e3
@@ -142,12 +147,7 @@ export async function getLeaveAnalysis(groupBy) {
   } catch (e) {
     // fall back to local computation from uploaded rows
     try {
-      const files = (await api.get('/files/')).data
-      const allRows = []
-      for (const f of files) {
-        const detail = (await api.get(`/files/${f.id}`)).data
-        allRows.push(...detail.rows)
-      }
+      const allRows = await getAttendanceExportRows()
       return computeLeaveAnalysis(allRows, groupBy)
     } catch (e3) {
       throw e3
@@ -167,6 +167,15 @@ export async function getDashboardSummary(groupBy = 'function') {
   return data
 }
 
+// One employee's day-by-day attendance and per-month KPI contributions (dates as YYYY-MM-DD)
+export async function getEmployeeAttendance(employeeCode, from, to) {
+  const params = {}
+  if (from) params.from = from
+  if (to) params.to = to
+  const { data } = await api.get(`/employees/${encodeURIComponent(employeeCode)}/attendance`, { params })
+  return data
+}
+
 // ===== Authentication APIs =====
 
 export async function login(username, password) {
@@ -262,6 +271,14 @@ export async function getTeamsCompanyActivity(teamsFileId, employeeFileId) {
   return data
 }
 
+export async function getTeamsActivityCube(teamsFileId, employeeFileId) {
+  const params = {}
+  if (teamsFileId) params.teams_file_id = teamsFileId
+  if (employeeFileId) params.employee_file_id = employeeFileId
+  const { data } = await api.get('/teams/analytics/activity-cube', { params })
+  return data
+}
+
 export async function getTeamsCXOActivity(fileId) {
   const params = {}
   if (fileId) params.file_id = fileId
@@ -355,9 +372,11 @@ export async function deleteTeamsAppFiles(ids) {
   return data
 }
 
-export async function getTeamsAppActivity(fileId) {
-  const params = {}
-  if (fileId) params.file_id = fileId
+export async function getTeamsAppActivity(fileId, appNames) {
+  // URLSearchParams repeats app_name=... for each app (FastAPI list query)
+  const params = new URLSearchParams()
+  if (fileId) params.append('file_id', fileId)
+  for (const name of appNames || []) params.append('app_name', name)
   const { data } = await api.get('/teams/app/analytics/app-activity', { params })
   return data
 }
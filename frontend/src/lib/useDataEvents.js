@@ -0,0 +1,52 @@
+import { useEffect, useRef } from 'react'
+import { useQueryClient } from '@tanstack/react-query'
+import { API_BASE } from './api'
+
+// Query keys (first element) that depend on each dataset announced by /events
+const QUERIES_BY_DATASET = {
+  attendance: ['files', 'file', 'kpi', 'work_hour', 'work_hour_lost', 'leave_analysis', 'od_analysis'],
+  kpi: ['kpi', 'work_hour', 'work_hour_lost', 'leave_analysis', 'od_analysis'],
+  teams: [
+    'teams_files', 'teams_file',
+    'teams_user_activity', 'teams_user_activity_compare',
+    'teams_cxo_activity', 'teams_cxo_activity_compare',
+    'teams_activity_cube', 'teams_activity_cube_compare',
+  ],
+  teams_app: ['teams_app_files', 'teams_app_file_detail', 'teams_app_activity', 'teams_app_activity_compare'],
+  employee: [
+    'employee_files', 'employee_file_detail', 'employees_with_cxo',
+    'teams_activity_cube', 'teams_activity_cube_compare',
+  ],
+}
+
+/**
+ * Subscribe to the backend's data-version events and refetch the affected
+ * queries once whenever a dataset changes (the query cache otherwise keeps
+ * data for 30 minutes). The first version seen for a dataset, on connect,
+ * is only recorded; after a reconnect a higher version still refreshes.
+ */
+export function useDataEvents() {
+  const queryClient = useQueryClient()
+  const versions = useRef({})
+
+  useEffect(() => {
+    const token = localStorage.getItem('token')
+    if (!token || typeof EventSource === 'undefined') return undefined
+
+    const source = new EventSource(`${API_BASE}/events?token=${encodeURIComponent(token)}`)
+    source.addEventListener('version', (event) => {
+      const { dataset, version } = JSON.parse(event.data)
+      const known = versions.current[dataset]
+      versions.current[dataset] = version
+      if (known === undefined || version <= known) return
+
+      const keys = QUERIES_BY_DATASET[dataset] || []
+      const predicate = (query) => keys.includes(query.queryKey[0])
+      // Mounted queries refetch now; unmounted ones are dropped, since
+      // refetchOnMount is off and they would otherwise show stale data
+      queryClient.invalidateQueries({ predicate, refetchType: 'active' })
+      queryClient.removeQueries({ predicate, type: 'inactive' })
+    })
+    return () => source.close()
+  }, [queryClient])
+}
@@ -4,6 +4,9 @@ import { listTeamsAppFiles, getTeamsAppActivity } from '../../lib/api'
 import DataTable from '../../components/DataTable'
 import { ResponsiveContainer, BarChart, Bar, XAxis, YAxis, Tooltip, Legend, CartesianGrid, LabelList } from 'recharts'
 
+// Apps shown on this page; only these are requested from the API
+const TRACKED_APPS = ['Planner', 'Loop']
+
 export default function TeamsAppActivityPage() {
   const [selectedFileId, setSelectedFileId] = useState(null)
   const [compareMode, setCompareMode] = useState(false)
@@ -24,7 +27,7 @@ export default function TeamsAppActivityPage() {
 
   const { data: appData = [], isLoading: isLoadingData } = useQuery({
     queryKey: ['teams_app_activity', selectedFileId],
-    queryFn: () => getTeamsAppActivity(selectedFileId),
+    queryFn: () => getTeamsAppActivity(selectedFileId, TRACKED_APPS),
     enabled: files.length > 0,
     staleTime: 5 * 60 * 1000,
     cacheTime: 10 * 60 * 1000,
@@ -32,7 +35,7 @@ export default function TeamsAppActivityPage() {
 
   const { data: compareData = [], isLoading: isLoadingCompare } = useQuery({
     queryKey: ['teams_app_activity_compare', compareFileId],
-    queryFn: () => getTeamsAppActivity(compareFileId),
+    queryFn: () => getTeamsAppActivity(compareFileId, TRACKED_APPS),
     enabled: compareMode && compareFileId !== null,
     staleTime: 5 * 60 * 1000,
     cacheTime: 10 * 60 * 1000,
@@ -42,15 +45,11 @@ export default function TeamsAppActivityPage() {
 
   // Filter to show only Planner and Loop apps
   const filteredAppData = useMemo(() => {
-    return appData.filter(app => 
-      app.app_name === 'Planner' || app.app_name === 'Loop'
-    )
+    return appData.filter(app => TRACKED_APPS.includes(app.app_name))
   }, [appData])
 
   const filteredCompareData = useMemo(() => {
-    return compareData.filter(app => 
-      app.app_name === 'Planner' || app.app_name === 'Loop'
-    )
+    return compareData.filter(app => TRACKED_APPS.includes(app.app_name))
   }, [compareData])
 
   // Merge data for comparison
@@ -1,6 +1,6 @@
 import { useState, useMemo, useRef } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
-import { listTeamsFiles, listEmployeeFiles, getTeamsUserActivity, getTeamsFunctionActivity, getTeamsCompanyActivity, getTeamsCXOActivity, listCXOUsers, listEmployeesWithCXOStatus, markEmployeeAsCXO, unmarkEmployeeAsCXO } from '../../lib/api'
+import { listTeamsFiles, listEmployeeFiles, getTeamsUserActivity, getTeamsActivityCube, getTeamsCXOActivity, listCXOUsers, listEmployeesWithCXOStatus, markEmployeeAsCXO, unmarkEmployeeAsCXO } from '../../lib/api'
 import { ResponsiveContainer, BarChart, Bar, XAxis, YAxis, Tooltip, Legend, CartesianGrid, LabelList, Cell } from 'recharts'
 import ActivityBar from '../../components/ActivityBar'
 import html2canvas from 'html2canvas'
@@ -64,38 +64,27 @@ export default function TeamsDashboardPage() {
     cacheTime: 10 * 60 * 1000,
   })
 
-  const { data: functionData = [], isLoading: isLoadingFunction } = useQuery({
-    queryKey: ['teams_function_activity', selectedFileId, selectedEmployeeFileId],
-    queryFn: () => getTeamsFunctionActivity(selectedFileId, selectedEmployeeFileId),
-    enabled: activeTab === 'function' && files.length > 0 && employeeFiles.length > 0,
-    staleTime: 5 * 60 * 1000,
-    cacheTime: 10 * 60 * 1000,
-  })
-
-  const { data: companyData = [], isLoading: isLoadingCompany } = useQuery({
-    queryKey: ['teams_company_activity', selectedFileId, selectedEmployeeFileId],
-    queryFn: () => getTeamsCompanyActivity(selectedFileId, selectedEmployeeFileId),
-    enabled: activeTab === 'company' && files.length > 0 && employeeFiles.length > 0,
+  // Function and company charts share one cube query (switching tabs reuses it)
+  const { data: activityCube, isLoading: isLoadingCube } = useQuery({
+    queryKey: ['teams_activity_cube', selectedFileId, selectedEmployeeFileId],
+    queryFn: () => getTeamsActivityCube(selectedFileId, selectedEmployeeFileId),
+    enabled: (activeTab === 'function' || activeTab === 'company') && files.length > 0 && employeeFiles.length > 0,
     staleTime: 5 * 60 * 1000,
     cacheTime: 10 * 60 * 1000,
   })
+  const functionData = activityCube?.function ?? []
+  const companyData = activityCube?.company ?? []
 
   // Comparison data for function/company
-  const { data: functionCompareData = [], isLoading: isLoadingFunctionCompare } = useQuery({
-    queryKey: ['teams_function_activity_compare', groupCompareFileId, selectedEmployeeFileId],
-    queryFn: () => getTeamsFunctionActivity(groupCompareFileId, selectedEmployeeFileId),
-    enabled: groupCompareMode && groupCompareFileId !== null && activeTab === 'function',
-    staleTime: 5 * 60 * 1000,
-    cacheTime: 10 * 60 * 1000,
-  })
-
-  const { data: companyCompareData = [], isLoading: isLoadingCompanyCompare } = useQuery({
-    queryKey: ['teams_company_activity_compare', groupCompareFileId, selectedEmployeeFileId],
-    queryFn: () => getTeamsCompanyActivity(groupCompareFileId, selectedEmployeeFileId),
-    enabled: groupCompareMode && groupCompareFileId !== null && activeTab === 'company',
+  const { data: activityCubeCompare, isLoading: isLoadingCubeCompare } = useQuery({
+    queryKey: ['teams_activity_cube_compare', groupCompareFileId, selectedEmployeeFileId],
+    queryFn: () => getTeamsActivityCube(groupCompareFileId, selectedEmployeeFileId),
+    enabled: groupCompareMode && groupCompareFileId !== null && (activeTab === 'function' || activeTab === 'company'),
     staleTime: 5 * 60 * 1000,
     cacheTime: 10 * 60 * 1000,
   })
+  const functionCompareData = activityCubeCompare?.function ?? []
+  const companyCompareData = activityCubeCompare?.company ?? []
 
   // CXO data queries
   const { data: cxoData = [], isLoading: isLoadingCXO } = useQuery({
@@ -247,7 +236,7 @@ export default function TeamsDashboardPage() {
     }
   })
 
-  const isLoading = isLoadingFiles || isLoadingEmployeeFiles || isLoadingData || (compareMode && isLoadingCompare) || isLoadingFunction || isLoadingCompany || isLoadingFunctionCompare || isLoadingCompanyCompare || isLoadingCXO || isLoadingCXOCompare || isLoadingCXOUsers || isLoadingEmployees
+  const isLoading = isLoadingFiles || isLoadingEmployeeFiles || isLoadingData || (compareMode && isLoadingCompare) || isLoadingCube || isLoadingCubeCompare || isLoadingCXO || isLoadingCXOCompare || isLoadingCXOUsers || isLoadingEmployees
 
   // Get unique users for dropdown
   const uniqueUsers = useMemo(() => {